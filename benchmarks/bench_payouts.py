@@ -0,0 +1,65 @@
+# benchmarks/bench_payouts.py
+"""Mede o cálculo e o pagamento de um bolão grande.
+
+Uso (na raiz do projeto):
+    python -m benchmarks.bench_payouts [--participants 10000] [--repeat 20]
+
+O pagamento roda sobre um SQLite em memória (DB_BACKEND=sqlite), então mede o bot e
+não a rede até o MongoDB.
+"""
+import argparse
+import random
+import statistics
+import time
+from utils.database import Database
+from utils.sqlite_storage import SQLiteStorage
+from utils.payouts import PARIMUTUEL, FIXED_ODDS, settle_pool
+
+def make_entries(participants: int, seed: int = 42) -> list:
+    rng = random.Random(seed)
+    return [
+        {"user_id": 10**17 + i, "team": rng.choice(("team_home", "team_away")), "amount": rng.randint(10, 5000)}
+        for i in range(participants)
+    ]
+
+def timed(fn, repeat: int) -> list:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+def report(name: str, samples: list):
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    print(f"{name:<32} mediana {statistics.median(samples):8.2f} ms   p95 {p95:8.2f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--participants", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    entries = make_entries(args.participants)
+    totals = {}
+    for e in entries:
+        totals[e["team"]] = totals.get(e["team"], 0) + e["amount"]
+    print(f"{args.participants} participantes, pote de {sum(totals.values())} FutCoins")
+
+    report("cálculo pari-mutuel", timed(lambda: settle_pool(entries, "team_home", PARIMUTUEL, totals=totals), args.repeat))
+    report("cálculo odds fixas", timed(lambda: settle_pool(entries, "team_home", FIXED_ODDS, odds={"team_home": 1.8}), args.repeat))
+    report("cálculo empate (reembolso)", timed(lambda: settle_pool(entries, None), args.repeat))
+
+    db = Database(SQLiteStorage(":memory:"))
+    settlement = settle_pool(entries, "team_home", PARIMUTUEL, totals=totals)
+    db.settle_payouts(settlement.payouts, game="bolao")  # cria as contas antes de medir
+    report("cálculo + settle_payouts (SQLite)", timed(
+        lambda: db.settle_payouts(settle_pool(entries, "team_home", PARIMUTUEL, totals=totals).payouts, game="bolao"),
+        max(1, args.repeat // 4)
+    ))
+    print(f"{len(settlement.winners)} vencedores, pago {settlement.paid}, casa {settlement.house}")
+    db.close()
+
+if __name__ == "__main__":
+    main()
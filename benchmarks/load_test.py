@@ -0,0 +1,467 @@
+# benchmarks/load_test.py
+"""Teste de carga: milhares de interações simultâneas contra os cogs, sem Discord nem MongoDB.
+
+Uso (na raiz do projeto):
+    python -m benchmarks.load_test [--users 500] [--spread 1.0] [--api-latency 50] [--scenarios bolao,mesa,economia,futebol]
+
+Os cogs de verdade (Betting, Economy, Football) recebem Interaction/Message/Webhook falsos,
+que respondem depois de --api-latency ms como se fossem o Discord, e um Database sobre
+SQLite em memória no lugar do MongoDB. A API de futebol também é falsa (mesma latência).
+Cada cenário dispara as interações dos --users usuários espalhadas em --spread segundos e
+mostra a latência dos handlers (p50/p95/p99), o atraso do event loop e as operações de
+banco e chamadas ao Discord por comando.
+"""
+import argparse
+import asyncio
+import contextvars
+import itertools
+import os
+import random
+import statistics
+import time
+import discord
+from utils import webhook_manager
+from utils.database import Database, AsyncDatabase
+from utils.sqlite_storage import SQLiteStorage
+from utils.http_client import CachedHTTPClient, CacheEntry
+
+os.environ.setdefault("API_FUTEBOL_TOKEN", "load-test")  # o cog de futebol só funciona com a chave
+
+from cogs import betting, economy, football
+
+GUILD_ID = 1
+STARTING_FUNDS = 1_000_000
+_ids = itertools.count(10**18)
+_command = contextvars.ContextVar("command", default=None)  # estatística do comando em andamento
+
+# --- Discord falso ---
+class FakeDiscord:
+    """Conta as chamadas ao "Discord" e simula o tempo de resposta delas."""
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+
+    async def call(self):
+        self.calls += 1
+        stats = _command.get()
+        if stats is not None: stats.api_calls += 1
+        await asyncio.sleep(self.latency)
+
+class FakeAsset:
+    url = "https://cdn.discordapp.com/embed/avatars/0.png"
+
+class FakeUser:
+    def __init__(self, user_id: int, name: str):
+        self.id = user_id
+        self.name = self.display_name = name
+        self.mention = f"<@{user_id}>"
+        self.display_avatar = FakeAsset()
+        self.bot = False
+        self.roles = []
+
+    def __eq__(self, other): return getattr(other, "id", None) == self.id
+    def __hash__(self): return hash(self.id)
+
+class FakeMessage:
+    def __init__(self, api: FakeDiscord, channel, content=None, embed=None, view=None):
+        self.api = api
+        self.id = next(_ids)
+        self.channel = channel
+        self.content = content
+        self.embeds = [embed] if embed is not None else []
+        self.view = view
+
+    async def edit(self, **kwargs):
+        await self.api.call()
+        if kwargs.get("embed") is not None: self.embeds = [kwargs["embed"]]
+        if "content" in kwargs: self.content = kwargs["content"]
+        if "view" in kwargs: self.view = kwargs["view"]
+        return self
+
+class FakeWebhook:
+    def __init__(self, api: FakeDiscord, channel):
+        self.api = api
+        self.channel = channel
+        self.id = next(_ids)
+        self.token = "token"
+        self.user = None
+
+    async def send(self, content=None, embed=None, view=None, **kwargs):
+        await self.api.call()
+        message = FakeMessage(self.api, self.channel, content, embed, view)
+        self.channel.messages[message.id] = message
+        return message
+
+    async def edit_message(self, message_id: int, **kwargs):
+        message = self.channel.messages.get(message_id)
+        if message is None: raise discord.NotFound(_FakeHTTPResponse(404), "Unknown Message")
+        return await message.edit(**kwargs)
+
+class _FakeHTTPResponse:
+    def __init__(self, status: int):
+        self.status = status
+        self.reason = "Not Found"
+
+class FakeChannel:
+    def __init__(self, api: FakeDiscord, channel_id: int = None):
+        self.api = api
+        self.id = channel_id or next(_ids)
+        self.mention = f"<#{self.id}>"
+        self.messages = {}
+        self.webhook = FakeWebhook(api, self)
+
+    async def send(self, content=None, embed=None, view=None, **kwargs):
+        return await self.webhook.send(content=content, embed=embed, view=view)
+
+    async def fetch_message(self, message_id: int):
+        await self.api.call()
+        message = self.messages.get(message_id)
+        if message is None: raise discord.NotFound(_FakeHTTPResponse(404), "Unknown Message")
+        return message
+
+    async def webhooks(self):
+        await self.api.call()
+        return [self.webhook]
+
+    async def create_webhook(self, name: str):
+        await self.api.call()
+        return self.webhook
+
+class FakeGuild:
+    def __init__(self):
+        self.id = GUILD_ID
+        self.shard_id = 0
+        self.emojis = []
+
+class FakeResponse:
+    def __init__(self, interaction):
+        self.interaction = interaction
+        self._done = False
+        self.modal = None  # o último modal aberto, para o cenário preencher e enviar
+
+    def is_done(self) -> bool:
+        return self._done
+
+    async def _respond(self):
+        if self._done: raise discord.InteractionResponded(self.interaction)
+        self._done = True
+        await self.interaction.api.call()
+
+    async def send_message(self, content=None, embed=None, view=None, ephemeral=False, delete_after=None, **kwargs):
+        await self._respond()
+        self.interaction._original = FakeMessage(self.interaction.api, self.interaction.channel, content, embed, view)
+
+    async def defer(self, **kwargs):
+        await self._respond()
+
+    async def edit_message(self, **kwargs):
+        await self._respond()  # a resposta já é a edição: uma chamada só
+        message = self.interaction.message
+        if message is not None:
+            if kwargs.get("embed") is not None: message.embeds = [kwargs["embed"]]
+            if "view" in kwargs: message.view = kwargs["view"]
+
+    async def send_modal(self, modal):
+        await self._respond()
+        self.modal = modal
+
+class FakeFollowup:
+    def __init__(self, interaction):
+        self.interaction = interaction
+
+    async def send(self, content=None, embed=None, view=None, ephemeral=False, **kwargs):
+        await self.interaction.api.call()
+        return FakeMessage(self.interaction.api, self.interaction.channel, content, embed, view)
+
+class FakeInteraction:
+    """Interaction falsa; passa no isinstance(x, discord.Interaction) dos cogs."""
+    def __init__(self, api: FakeDiscord, user: FakeUser, channel: FakeChannel, guild: FakeGuild, message: FakeMessage = None):
+        self.api = api
+        self.user = user
+        self.channel = channel
+        self.guild = guild
+        self.message = message
+        self.response = FakeResponse(self)
+        self.followup = FakeFollowup(self)
+        self._original = None
+
+    @property
+    def __class__(self):
+        return discord.Interaction
+
+    async def original_response(self):
+        return self._original
+
+# --- Bot, banco e API de futebol falsos ---
+class CountingAsyncDatabase:
+    """AsyncDatabase que conta as operações de banco de cada comando (via contextvar)."""
+    def __init__(self, db: AsyncDatabase):
+        self._db = db
+        self.ops = 0
+
+    def __getattr__(self, name):
+        attr = getattr(self._db, name)
+        if not callable(attr): return attr
+
+        async def counted(*args, **kwargs):
+            self.ops += 1
+            stats = _command.get()
+            if stats is not None: stats.db_ops += 1
+            return await attr(*args, **kwargs)
+        return counted
+
+class FakeHTTPClient(CachedHTTPClient):
+    """Cache de verdade, mas o "download" só espera a latência e devolve dados prontos."""
+    def __init__(self, latency: float):
+        super().__init__(ttl=300)
+        self.latency = latency
+        self.requests = 0
+
+    async def _fetch(self, url: str, headers: dict = None):
+        self.requests += 1
+        await asyncio.sleep(self.latency)
+        if url.endswith("/tabela"):
+            data = [{"posicao": i, "pontos": 60 - i, "time": {"nome_popular": f"Time {i}"}} for i in range(1, 21)]
+        else:
+            data = [{"gols": 20 - i, "atleta": {"nome_popular": f"Jogador {i}"}, "time": {"nome_popular": "Time"}} for i in range(20)]
+        self._cache[url] = CacheEntry(data, self.latency, str(hash(url)))
+        return data
+
+class FakeBot:
+    def __init__(self, api: FakeDiscord, db, http_client):
+        self.api = api
+        self.db = db
+        self.http_client = http_client
+        self.user = FakeUser(next(_ids), "Ronaldin Bot")
+        self.guild = FakeGuild()
+        self.guilds = [self.guild]
+        self.channels = {}
+        self.cogs = {}
+        self.latency = api.latency
+
+    def channel(self, channel_id: int = None) -> FakeChannel:
+        channel = FakeChannel(self.api, channel_id)
+        self.channels[channel.id] = channel
+        webhook_manager._webhook_cache[channel.id] = channel.webhook
+        return channel
+
+    def get_channel(self, channel_id: int):
+        return self.channels.get(channel_id)
+
+    async def fetch_channel(self, channel_id: int):
+        await self.api.call()
+        return self.channels[channel_id]
+
+    def get_cog(self, name: str):
+        return self.cogs.get(name)
+
+    def add_view(self, view, message_id: int = None):
+        pass
+
+    async def wait_until_ready(self):
+        pass
+
+# --- Medição ---
+class CommandStats:
+    __slots__ = ("name", "started", "latency", "db_ops", "api_calls")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started = time.perf_counter()
+        self.latency = 0.0
+        self.db_ops = 0
+        self.api_calls = 0
+
+class Harness:
+    def __init__(self, args):
+        self.args = args
+        self.api = FakeDiscord(args.api_latency / 1000)
+        database = Database(SQLiteStorage(":memory:"))
+        database.ensure_indexes()
+        self.db = CountingAsyncDatabase(AsyncDatabase(database))
+        self.bot = FakeBot(self.api, self.db, FakeHTTPClient(args.api_latency / 1000))
+        self.users = [FakeUser(next(_ids), f"user{i}") for i in range(args.users)]
+        self.results = []  # [CommandStats]
+        self.lag = []      # atrasos do event loop (s)
+
+    def interaction(self, user, channel, message=None) -> FakeInteraction:
+        return FakeInteraction(self.api, user, channel, self.bot.guild, message)
+
+    async def timed(self, name: str, coro):
+        """Roda um handler medindo latência, operações de banco e chamadas ao Discord."""
+        stats = CommandStats(name)
+        token = _command.set(stats)
+        try:
+            await coro
+        except Exception as e:
+            print(f"[!] {name}: {type(e).__name__}: {e}")
+        finally:
+            stats.latency = time.perf_counter() - stats.started
+            _command.reset(token)
+            self.results.append(stats)
+
+    async def storm(self, jobs):
+        """Dispara as corrotinas-fábrica em `jobs` espalhadas em --spread segundos."""
+        async def delayed(job):
+            await asyncio.sleep(random.uniform(0, self.args.spread))
+            await job()
+        await asyncio.gather(*(delayed(job) for job in jobs))
+
+    async def sample_lag(self, interval: float = 0.005):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(interval)
+            self.lag.append(time.perf_counter() - started - interval)
+
+# --- Cenários ---
+async def scenario_bolao(h: Harness):
+    """Todo mundo aposta no mesmo bolão (clique + modal), 10% cancela, e o bolão é encerrado."""
+    cog = betting.Betting(h.bot)
+    h.bot.cogs["Betting"] = cog
+    h.bot.channel(betting.BETS_CHANNEL_ID)
+    admin = h.users[0]
+    create = h.interaction(admin, h.bot.get_channel(betting.BETS_CHANNEL_ID))
+    await h.timed("bolao_criar", cog.bolao_proximo_slash.callback(cog, create, "Clássico", "Time A", "Time B"))
+    message = next(iter(h.bot.get_channel(betting.BETS_CHANNEL_ID).messages.values()))
+    view = betting.BetView(h.bot)
+
+    async def bet(user):
+        click = h.interaction(user, message.channel, message)
+        button = view.home_button if user.id % 2 else view.away_button
+        await h.timed("bolao_clique", button.callback(click))
+        modal = click.response.modal
+        if modal is None: return
+        modal.amount._value = str(random.randint(10, 500))
+        await h.timed("bolao_apostar", modal.on_submit(h.interaction(user, message.channel, message)))
+        if random.random() < 0.1:
+            await h.timed("bolao_cancelar", view.cancel_button.callback(h.interaction(user, message.channel, message)))
+
+    await h.storm([lambda u=u: bet(u) for u in h.users])
+    await h.timed("bolao_resultado", cog.bolao_resultado_slash.callback(cog, h.interaction(admin, message.channel), str(message.id), "Time A"))
+    betting.bet_embeds.cancel_all()
+
+async def scenario_mesa(h: Harness):
+    """Mesas de blackjack ao vivo com 5 jogadores: apostas, compras/paradas e uma rodada inteira."""
+    async def open_table(players):
+        channel = h.bot.channel()
+        table = economy.LiveBlackjackTable(h.bot, channel)
+        table.view = economy.LiveBlackjackView(table)
+        table.message = await channel.send(embed=discord.Embed(title="Mesa"), view=table.view)
+        for user in players:
+            await table.add_player(user)
+        return table
+    tables = await asyncio.gather(*(open_table(h.users[i:i + 5]) for i in range(0, len(h.users), 5)))
+
+    async def bet(table, user):
+        click = h.interaction(user, table.channel, table.message)
+        await table.view.interaction_check(click)
+        await h.timed("mesa_clique", table.view.bet.callback(click))
+        modal = click.response.modal
+        if modal is None: return
+        modal.amount._value = str(random.randint(10, 500))
+        await h.timed("mesa_apostar", modal.on_submit(h.interaction(user, table.channel, table.message)))
+
+    await h.storm([lambda t=t, u=p.member: bet(t, u) for t in tables for p in list(t.players.values())])
+    async def deal(table):
+        await table.next_state()  # fecha as apostas e distribui
+        await table.update_embed()
+    await h.storm([lambda t=t: h.timed("mesa_distribuir", deal(t)) for t in tables])
+
+    async def act(table, player):
+        while player.status == 'playing' and player.hand.value < 17:
+            await h.timed("mesa_acao", table.view.hit.callback(h.interaction(player.member, table.channel, table.message)))
+        if player.status == 'playing':
+            await h.timed("mesa_acao", table.view.stand.callback(h.interaction(player.member, table.channel, table.message)))
+
+    await h.storm([lambda t=t, p=p: act(t, p) for t in tables for p in t.players.values()])
+
+    async def finish(table):
+        await table.next_state()  # vez do dealer
+        await table.next_state()  # pagamentos
+        await table.update_embed()
+    await h.storm([lambda t=t: h.timed("mesa_fechar_rodada", finish(t)) for t in tables])
+
+async def scenario_economia(h: Harness):
+    """Comandos avulsos: saldo, diário, cara ou coroa e blackjack solo até o fim."""
+    cog = economy.Economy(h.bot)
+    channel = h.bot.channel()
+
+    async def play(user):
+        await h.timed("saldo", cog.saldo_slash.callback(cog, h.interaction(user, channel), None))
+        await h.timed("diario", cog.diario_slash.callback(cog, h.interaction(user, channel)))
+        await h.timed("caraoucoroa", cog.coinflip_slash.callback(cog, h.interaction(user, channel), random.choice(["cara", "coroa"]), 50))
+        start = h.interaction(user, channel)
+        await h.timed("blackjack_solo", cog.blackjack_solo.callback(cog, start, 50))
+        message = start._original
+        view = message.view if message is not None else None
+        if view is None or view.is_finished() or view.hit.disabled: return
+        while view.player_hand.value < 17:
+            await h.timed("blackjack_solo_acao", view.hit.callback(h.interaction(user, channel, message)))
+            if view.player_hand.value > 21: return
+        await h.timed("blackjack_solo_acao", view.stand.callback(h.interaction(user, channel, message)))
+
+    await h.storm([lambda u=u: play(u) for u in h.users])
+    cog.cog_unload()
+
+async def scenario_futebol(h: Harness):
+    """/tabela e /artilheiros ao mesmo tempo: uma busca na API por endpoint, o resto do cache."""
+    cog = football.Football(h.bot)
+    h.bot.cogs["Football"] = cog
+    channel = h.bot.channel()
+
+    async def ask(user):
+        command = cog.tabela_slash if user.id % 2 else cog.artilheiros_slash
+        await h.timed(command.name, command.callback(cog, h.interaction(user, channel)))
+
+    await h.storm([lambda u=u: ask(u) for u in h.users])
+    cog.cog_unload()
+
+SCENARIOS = {"bolao": scenario_bolao, "mesa": scenario_mesa, "economia": scenario_economia, "futebol": scenario_futebol}
+
+# --- Relatório ---
+def percentile(sorted_values: list, p: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p))] if sorted_values else 0.0
+
+def report(name: str, h: Harness, elapsed: float):
+    print(f"\n== {name}: {len(h.results)} comandos em {elapsed:.2f}s")
+    print(f"{'comando':<22}{'n':>6}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'máx ms':>9}{'banco/cmd':>11}{'discord/cmd':>13}")
+    by_name = {}
+    for stats in h.results:
+        by_name.setdefault(stats.name, []).append(stats)
+    for command, runs in by_name.items():
+        latencies = sorted(s.latency * 1000 for s in runs)
+        print(f"{command:<22}{len(runs):>6}{percentile(latencies, .5):>9.1f}{percentile(latencies, .95):>9.1f}"
+              f"{percentile(latencies, .99):>9.1f}{latencies[-1]:>9.1f}"
+              f"{statistics.mean(s.db_ops for s in runs):>11.1f}{statistics.mean(s.api_calls for s in runs):>13.1f}")
+    lag = sorted(x * 1000 for x in h.lag)
+    print(f"atraso do event loop: p50 {percentile(lag, .5):.1f} ms, p99 {percentile(lag, .99):.1f} ms, máx {lag[-1] if lag else 0:.1f} ms")
+
+async def run(args):
+    for name in args.scenarios.split(","):
+        h = Harness(args)
+        for user in h.users:
+            await h.db.set_balance(user.id, STARTING_FUNDS)
+        sampler = asyncio.create_task(h.sample_lag())
+        started = time.perf_counter()
+        await SCENARIOS[name](h)
+        elapsed = time.perf_counter() - started
+        sampler.cancel()
+        report(name, h, elapsed)
+        await h.bot.http_client.close()
+        await h.db.close()
+        webhook_manager._webhook_cache.clear()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--spread", type=float, default=1.0, help="segundos em que as interações de cada onda se espalham")
+    parser.add_argument("--api-latency", type=float, default=50, help="ms de cada chamada ao Discord/API falsos")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    random.seed(args.seed)
+    print(f"{args.users} usuários, interações espalhadas em {args.spread}s, latência do Discord {args.api_latency:.0f} ms")
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+# benchmarks/sim_games.py
+"""Simulação Monte-Carlo dos jogos do cassino: RTP, variância e rodadas por segundo.
+
+Uso (na raiz do projeto):
+    python -m benchmarks.sim_games [--rounds 1000000] [--workers 4] [--seed 1]
+    python -m benchmarks.sim_games --check            # falha se o RTP mudar
+    python -m benchmarks.sim_games --check --check-speed   # ...ou se ficar mais lento nesta máquina
+    python -m benchmarks.sim_games --save-baseline    # grava a referência do --check
+    python -m benchmarks.sim_games --numpy            # soma linhas vetorizadas (NumPy, opcional)
+
+Todos os jogos rodam o caminho do bot: SeededRNG por rodada (utils/rng), sapato e mão
+(utils/cards) e pagamentos (utils/games), com o jogador de blackjack seguindo a estratégia
+básica de só comprar/parar. Assim uma mudança nas regras ou no gerador aparece no RTP do
+--check. Com --numpy, Bac Bo e cara ou coroa também rodam vetorizados para um RTP com
+muito mais rodadas; essas linhas têm o sufixo ":numpy" e referência própria. O blackjack
+não tem versão vetorizada (cada compra depende das cartas anteriores) e roda sempre em
+Python puro. Tudo sai da --seed; com --workers > 1 cada processo recebe uma semente derivada.
+
+A referência versionada (sim_baseline.json) guarda só RTP, erro-padrão e variância. A
+velocidade depende da máquina: --save-baseline também grava as rodadas/s em
+sim_speed.local.json (fora do git), e --check-speed compara com esse arquivo.
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from utils.cards import Hand, Shoe, VALUES, SOLO_SHOE_DECKS
+from utils.games import WIN_PAYOUT, BACBO_TIE_PAYOUT, BACBO_CHOICES, COIN_SIDES, dealer_play, blackjack_credit, bacbo_winner, bacbo_credit, coinflip_credit
+from utils.rng import SeededRNG, SEED_BYTES
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+BET = 100  # aposta de cada rodada; inteira, como no bot (int(aposta * 2.5) arredonda)
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "sim_baseline.json")
+SPEED_PATH = os.path.join(os.path.dirname(__file__), "sim_speed.local.json")
+# --check: o RTP pode se afastar da referência em até tantos erros-padrão...
+RTP_SIGMAS = 4
+# ...e, com --check-speed, a velocidade pode cair até esta fração antes de reprovar.
+MIN_SPEED_RATIO = 0.7
+
+# RTP exato dos jogos de dados/moeda, para o --check não depender só da referência gravada.
+_SUMS = [sum(1 for a in range(1, 7) for b in range(1, 7) if a + b == s) / 36 for s in range(13)]
+_P_TIE = sum(p * p for p in _SUMS)
+EXACT_RTP = {
+    "bacbo_jogador": WIN_PAYOUT * (1 - _P_TIE) / 2,
+    "bacbo_banca": WIN_PAYOUT * (1 - _P_TIE) / 2,
+    "bacbo_empate": BACBO_TIE_PAYOUT * _P_TIE,
+    "caraoucoroa": WIN_PAYOUT / 2,
+}
+NUMPY_SUFFIX = ":numpy"
+
+def seeder(seed: int) -> SeededRNG:
+    """Gerador-mãe da simulação; as sementes de cada rodada/sapato saem dele."""
+    return SeededRNG(seed.to_bytes(SEED_BYTES, "big"))
+
+class Tally:
+    """Soma de uma aposta ao longo das rodadas: quanto entrou, quanto voltou e a variância do líquido."""
+    __slots__ = ("rounds", "wagered", "returned", "net_sq")
+
+    def __init__(self, rounds=0, wagered=0, returned=0, net_sq=0):
+        self.rounds, self.wagered, self.returned, self.net_sq = rounds, wagered, returned, net_sq
+
+    def add(self, credit: int):
+        net = credit - BET
+        self.rounds += 1
+        self.wagered += BET
+        self.returned += credit
+        self.net_sq += net * net
+
+    def merge(self, other: "Tally"):
+        self.rounds += other.rounds
+        self.wagered += other.wagered
+        self.returned += other.returned
+        self.net_sq += other.net_sq
+
+    @property
+    def rtp(self) -> float:
+        return self.returned / self.wagered if self.wagered else 0.0
+
+    @property
+    def variance(self) -> float:
+        """Variância do resultado líquido por rodada, em unidades de aposta."""
+        if not self.rounds: return 0.0
+        mean = (self.returned - self.wagered) / self.rounds / BET
+        return self.net_sq / self.rounds / (BET * BET) - mean * mean
+
+    @property
+    def stderr(self) -> float:
+        """Erro-padrão do RTP."""
+        return math.sqrt(self.variance / self.rounds) if self.rounds else 0.0
+
+# --- Blackjack ---
+def player_hits(hand: Hand, dealer_up: int) -> bool:
+    """Estratégia básica sem dobrar nem dividir (o bot só tem comprar e parar)."""
+    up = VALUES[dealer_up]
+    if hand.aces:  # mão soft
+        return hand.value <= 17 or (hand.value == 18 and up >= 9)
+    if hand.value <= 11: return True
+    if hand.value == 12: return up not in (4, 5, 6)
+    if hand.value <= 16: return up >= 7
+    return False
+
+def sim_blackjack(rounds: int, seed: int) -> Tally:
+    """Regras do /blackjack solo: natural paga na hora, senão joga e o dealer compra até 17."""
+    shoe = Shoe(SOLO_SHOE_DECKS, seeder=seeder(seed))
+    tally = Tally()
+    for _ in range(rounds):
+        shoe.shuffle()
+        player, dealer = Hand(), Hand()
+        player.add_card(shoe.deal()); player.add_card(shoe.deal())
+        dealer.add_card(shoe.deal()); dealer.add_card(shoe.deal())
+        if player.value == 21:
+            tally.add(blackjack_credit(BET, player, dealer, natural=True))
+            continue
+        up = dealer.cards[0]
+        while player_hits(player, up):
+            player.add_card(shoe.deal())
+        if player.value <= 21:
+            dealer_play(dealer, shoe)
+        tally.add(blackjack_credit(BET, player, dealer))
+    return tally
+
+# --- Bac Bo e cara ou coroa ---
+def sim_bacbo(rounds: int, seed: int) -> dict:
+    """Como o /bacbo: um SeededRNG por rodada, 4 dados e uma aposta em cada lado."""
+    tallies = {choice: Tally() for choice in BACBO_CHOICES}
+    seeds = seeder(seed)
+    for _ in range(rounds):
+        player_d1, player_d2, banker_d1, banker_d2 = seeds.spawn().randints(1, 6, 4)
+        winner = bacbo_winner(player_d1 + player_d2, banker_d1 + banker_d2)
+        for choice in BACBO_CHOICES:
+            tallies[choice].add(bacbo_credit(choice, winner, BET))
+    return tallies
+
+def sim_coinflip(rounds: int, seed: int) -> Tally:
+    """Como o /caraoucoroa: um SeededRNG por jogada."""
+    seeds = seeder(seed)
+    tally = Tally()
+    for _ in range(rounds):
+        tally.add(coinflip_credit(COIN_SIDES[0], seeds.spawn().choice(COIN_SIDES), BET))
+    return tally
+
+# --- Versões vetorizadas (--numpy): só o sorteio, para um RTP com muitas rodadas ---
+def _vector_tally(credits) -> Tally:
+    credits = credits.astype(np.int64)
+    net = credits - BET
+    return Tally(int(credits.size), int(credits.size) * BET, int(credits.sum()), int((net * net).sum()))
+
+def sim_bacbo_numpy(rounds: int, seed: int) -> dict:
+    dice = np.random.default_rng(seed).integers(1, 7, size=(rounds, 4), dtype=np.int8)
+    player, banker = dice[:, 0] + dice[:, 1], dice[:, 2] + dice[:, 3]
+    wins = {"Jogador": player > banker, "Banca": banker > player, "Empate": player == banker}
+    return {choice: _vector_tally(wins[choice] * bacbo_credit(choice, choice, BET)) for choice in BACBO_CHOICES}
+
+def sim_coinflip_numpy(rounds: int, seed: int) -> Tally:
+    return _vector_tally(np.random.default_rng(seed).integers(0, 2, size=rounds) * coinflip_credit(COIN_SIDES[0], COIN_SIDES[0], BET))
+
+# --- Execução ---
+def run_chunk(game: str, rounds: int, seed: int) -> dict:
+    """Roda um pedaço num processo; devolve {aposta: Tally} e o tempo gasto."""
+    started = time.perf_counter()
+    if game == "blackjack":
+        tallies = {"blackjack": sim_blackjack(rounds, seed)}
+    elif game == "bacbo":
+        tallies = {f"bacbo_{choice.lower()}": t for choice, t in sim_bacbo(rounds, seed).items()}
+    elif game == "bacbo" + NUMPY_SUFFIX:
+        tallies = {f"bacbo_{choice.lower()}{NUMPY_SUFFIX}": t for choice, t in sim_bacbo_numpy(rounds, seed).items()}
+    elif game == "caraoucoroa" + NUMPY_SUFFIX:
+        tallies = {"caraoucoroa" + NUMPY_SUFFIX: sim_coinflip_numpy(rounds, seed)}
+    else:
+        tallies = {"caraoucoroa": sim_coinflip(rounds, seed)}
+    return tallies, time.perf_counter() - started
+
+def simulate(game: str, rounds: int, workers: int, seed: int) -> tuple:
+    """({aposta: Tally}, rodadas/s no total, rodadas/s por processo) dividindo entre `workers` processos."""
+    chunks = [rounds // workers + (1 if i < rounds % workers else 0) for i in range(workers)]
+    started = time.perf_counter()
+    if workers == 1:
+        results = [run_chunk(game, rounds, seed)]
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            results = list(pool.map(run_chunk, [game] * workers, chunks, [seed * 1000 + i for i in range(workers)]))
+    elapsed = time.perf_counter() - started
+    merged = {}
+    for tallies, _ in results:
+        for name, tally in tallies.items():
+            merged.setdefault(name, Tally()).merge(tally)
+    return merged, rounds / elapsed, rounds / sum(seconds for _, seconds in results)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=1_000_000, help="rodadas por jogo")
+    parser.add_argument("--workers", type=int, default=1, help="processos (0 = um por CPU)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--games", default="blackjack,bacbo,caraoucoroa")
+    parser.add_argument("--numpy", action="store_true", help="roda também Bac Bo e cara ou coroa vetorizados")
+    parser.add_argument("--check", action="store_true", help="compara com a referência e sai com erro se piorou")
+    parser.add_argument("--check-speed", action="store_true", help="no --check, compara também a velocidade com a desta máquina")
+    parser.add_argument("--save-baseline", action="store_true", help="grava o resultado como referência do --check")
+    args = parser.parse_args()
+    workers = args.workers or os.cpu_count() or 1
+    games = args.games.split(",")
+    if args.numpy:
+        if np is None:
+            print("NumPy não está instalado; --numpy ignorado.")
+        else:
+            games += [game + NUMPY_SUFFIX for game in games if game in ("bacbo", "caraoucoroa")]
+
+    print(f"{args.rounds} rodadas por jogo, {workers} processo(s)")
+    print(f"{'aposta':<22}{'RTP':>9}{'± erro':>9}{'casa':>9}{'variância':>11}{'rodadas/s':>13}")
+    results, speeds = {}, {}
+    for game in games:
+        tallies, speed, per_process = simulate(game, args.rounds, workers, args.seed)
+        for name, t in tallies.items():
+            results[name] = {"rtp": t.rtp, "stderr": t.stderr, "variance": t.variance}
+            speeds[name] = per_process
+            print(f"{name:<22}{t.rtp:>9.4f}{t.stderr:>9.4f}{1 - t.rtp:>9.2%}{t.variance:>11.3f}{speed:>13,.0f}")
+
+    if args.save_baseline:
+        # Junta com a referência existente: as linhas :numpy só são gravadas quando rodam
+        save_json(BASELINE_PATH, {**load_json(BASELINE_PATH), **results})
+        save_json(SPEED_PATH, {**load_json(SPEED_PATH), **speeds})
+        print(f"Referência gravada em {BASELINE_PATH} (velocidade em {SPEED_PATH}).")
+    if args.check:
+        sys.exit(0 if check(results, speeds if args.check_speed else None) else 1)
+
+def load_json(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+def save_json(path: str, data: dict):
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+
+def check(results: dict, speeds: dict = None) -> bool:
+    """Confere o RTP (contra o valor exato ou a referência) e, com `speeds`, as rodadas/s por
+    processo contra as gravadas nesta máquina."""
+    baseline = load_json(BASELINE_PATH)
+    local_speeds = load_json(SPEED_PATH) if speeds is not None else {}
+    ok = True
+    for name, r in results.items():
+        ref = baseline.get(name)
+        exact = EXACT_RTP.get(name.removesuffix(NUMPY_SUFFIX))
+        expected = exact if exact is not None else ref["rtp"] if ref else None
+        if expected is None:
+            print(f"[?] {name}: sem referência de RTP (rode com --save-baseline).")
+            continue
+        tolerance = RTP_SIGMAS * math.hypot(r["stderr"], ref["stderr"] if ref and exact is None else 0)
+        if abs(r["rtp"] - expected) > tolerance:
+            print(f"[!] {name}: RTP {r['rtp']:.4f}, esperado {expected:.4f} ± {tolerance:.4f}.")
+            ok = False
+        if speeds is None: continue
+        if name not in local_speeds:
+            print(f"[?] {name}: sem velocidade gravada nesta máquina (rode com --save-baseline).")
+        elif speeds[name] < local_speeds[name] * MIN_SPEED_RATIO:
+            print(f"[!] {name}: {speeds[name]:,.0f} rodadas/s por processo, referência {local_speeds[name]:,.0f}.")
+            ok = False
+    print("OK." if ok else "Regressão encontrada.")
+    return ok
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 from utils.webhook_manager import send_webhook
+from utils.metrics import metrics
 
 # <<<< IMPORTANTE >>>>
 # Coloque seu ID de usuário do Discord aqui para ter acesso aos comandos de dono.
@@ -24,7 +25,7 @@ class Admin(commands.Cog):
         if quantia < 0:
             return await interaction.response.send_message("A quantia não pode ser negativa.", ephemeral=True)
         
-        self.bot.db.set_balance(membro.id, quantia)
+        await self.bot.db.set_balance(membro.id, quantia, ref=interaction.user.id)
         await interaction.response.send_message(f"✅ O saldo de {membro.mention} foi definido para **{quantia}** FutCoins.", ephemeral=True)
 
     @commands.command(name="setfutcoins")
@@ -35,9 +36,31 @@ class Admin(commands.Cog):
         if quantia < 0:
             return await ctx.send("A quantia não pode ser negativa.")
             
-        self.bot.db.set_balance(membro.id, quantia)
+        await self.bot.db.set_balance(membro.id, quantia, ref=ctx.author.id)
         await ctx.send(f"✅ O saldo de {membro.mention} foi definido para **{quantia}** FutCoins.")
 
+    @app_commands.command(name="metrics", description="[Dono] Atraso do event loop e tempos dos comandos, do banco e dos webhooks.")
+    @app_commands.check(is_owner)
+    async def metrics_slash(self, interaction: discord.Interaction):
+        def ms(seconds): return f"{seconds * 1000:.1f}"
+        def table(rows, limit=8):
+            # As séries mais lentas primeiro (p95), com p50/p95/p99/máx em ms
+            rows = sorted(rows, key=lambda r: r[1].percentile(0.95), reverse=True)[:limit]
+            if not rows: return "Sem dados ainda."
+            lines = [f"{name[:26]:<26} {h.count:>6} {ms(h.percentile(0.5)):>6} {ms(h.percentile(0.95)):>6} {ms(h.percentile(0.99)):>6} {ms(h.max):>7}" for name, h in rows]
+            return "```\n" + f"{'':<26} {'n':>6} {'p50':>6} {'p95':>6} {'p99':>6} {'máx':>7}\n" + "\n".join(lines) + "\n```"
+
+        embed = discord.Embed(title="📈 Métricas", color=discord.Color.blurple())
+        lag = metrics.series("loop_lag")
+        if lag:
+            h = lag[0][1]
+            embed.description = f"Atraso do event loop (ms): p50 `{ms(h.percentile(0.5))}` • p99 `{ms(h.percentile(0.99))}` • máx `{ms(h.max)}`"
+        embed.add_field(name="Comandos", value=table([(f"{l['command']} ({l['status']})", h) for l, h in metrics.series("command")]), inline=False)
+        embed.add_field(name="Banco de dados", value=table([(l["method"], h) for l, h in metrics.series("db")]), inline=False)
+        embed.add_field(name="Webhooks", value=table([(l["op"], h) for l, h in metrics.series("webhook")]), inline=False)
+        embed.set_footer(text="Tempos em ms sobre as últimas amostras de cada série. Histórico completo no endpoint /metrics (Prometheus).")
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
     @app_commands.command(name="estatisticasusuario", description="[Admin] Mostra as estatísticas de um usuário.")
     @app_commands.checks.has_permissions(manage_guild=True)
     async def userstats_slash(self, interaction: discord.Interaction, membro: discord.Member):
@@ -51,7 +74,7 @@ class Admin(commands.Cog):
         await self._handle_userstats(ctx, membro)
 
     async def _handle_userstats(self, ctx_or_i, membro: discord.Member):
-        user_data = self.bot.db.get_user_data(membro.id)
+        user_data = await self.bot.db.get_user_data(membro.id)
         stats = user_data.get("stats", {})
 
         embed = discord.Embed(title=f"Estatísticas de {membro.display_name}", color=membro.color)
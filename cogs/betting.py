@@ -1,17 +1,47 @@
 # cogs/betting.py
+import asyncio
+import os
+import time
+from datetime import datetime, timedelta
 import discord
 from discord import app_commands, ui
 from discord.ext import commands
 from utils.webhook_manager import send_webhook, edit_webhook
+from utils.storage import BET_TEAMS, BET_CLOSED
+from utils.scheduler import Scheduler
+from utils.cluster import IS_PRIMARY, MULTI_PROCESS
+from utils.payouts import PARIMUTUEL, FIXED_ODDS, DEFAULT_PAYOUT_MODE, DEFAULT_RAKE, DEFAULT_ODDS, settle_pool
+from cogs.football import parse_kickoff, match_kickoff
 
 BET_CREATOR_ROLE_ID = 1408073200310423652
 BETS_CHANNEL_ID = 1408074183493156985
 BET_NOTIFICATION_ROLE_ID = 1408120231703875755
 
+# Intervalo mínimo (s) entre duas edições do embed de um mesmo bolão.
+BET_EMBED_INTERVAL = 2.0
+# Quantos apostadores de cada time aparecem no embed; o resto vira só uma contagem.
+BET_EMBED_TOP_N = int(os.getenv("BOLAO_TOP_N", "15"))
+# Limite de caracteres do valor de um campo de embed no Discord.
+FIELD_LIMIT = 1024
+
+# Bolões ligados a uma partida: quando começar a olhar o resultado, de quanto em quanto tempo e até quando.
+MATCH_DURATION = timedelta(minutes=115)
+RESULT_POLL = timedelta(minutes=5)
+RESULT_GIVE_UP = timedelta(hours=8)
+# Status da partida na api-futebol em que o bolão é cancelado e as apostas devolvidas.
+VOID_MATCH_STATUS = ("cancelado", "adiado", "suspenso")
+
+def betting_open(bet_doc: dict) -> bool:
+    """O bolão aceita apostas: está aberto e, se tem horário, a partida ainda não começou."""
+    if not bet_doc or bet_doc.get("status") != "open": return False
+    kickoff = bet_doc.get("kickoff_ts")
+    return kickoff is None or time.time() < kickoff
+
 class BetModal(ui.Modal, title='Faça sua Aposta no Bolão'):
-    def __init__(self, bot, team_name: str):
+    def __init__(self, bot, team_type: str, team_name: str):
         super().__init__()
         self.bot = bot
+        self.team_type = team_type
         self.team_name = team_name
 
     amount = ui.TextInput(label='Valor em FutCoins', placeholder='Ex: 100', style=discord.TextStyle.short)
@@ -24,30 +54,35 @@ class BetModal(ui.Modal, title='Faça sua Aposta no Bolão'):
             return await interaction.response.send_message("❌ Insira um número válido.", ephemeral=True)
 
         user_id = interaction.user.id
-        
-        # <<<< MELHORIA AQUI >>>>
-        # Lógica de reembolso ao trocar de aposta.
-        bet_doc = self.bot.db.get_bet(interaction.message.id)
-        previous_bet = next((p for p in bet_doc.get("participants", []) if p["user_id"] == user_id), None)
-        
-        refund_amount = 0
-        if previous_bet:
-            refund_amount = previous_bet['amount']
+        message_id = interaction.message.id
 
-        balance = self.bot.db.get_balance(user_id) + refund_amount
-        if balance < bet_amount:
-            return await interaction.response.send_message(f"Saldo insuficiente! Você tem {balance - refund_amount} FutCoins.", ephemeral=True)
+        # O modal pode ter sido aberto antes do início da partida
+        if not betting_open(await self.bot.db.get_bet(message_id)):
+            return await interaction.response.send_message("As apostas deste bolão já foram encerradas.", ephemeral=True)
 
-        # Devolve o dinheiro antigo e debita o novo
-        if refund_amount > 0:
-            self.bot.db.update_balance(user_id, refund_amount)
-        
-        self.bot.db.update_balance(user_id, -bet_amount)
-        self.bot.db.update_user_stats(user_id, bets_made_inc=1, wagered_inc=bet_amount)
-        self.bot.db.add_participant_bet(interaction.message.id, user_id, self.team_name, bet_amount)
+        # <<<< MELHORIA AQUI >>>>
+        # Lógica de reembolso ao trocar de aposta.
+        previous_bet = await self.bot.db.get_bet_entry(message_id, user_id)
+        refund_amount = previous_bet['amount'] if previous_bet else 0
+
+        # Devolve o dinheiro antigo e debita o novo numa única operação atômica
+        ok, balance = await self.bot.db.try_debit(user_id, bet_amount - refund_amount, game="bolao", ref=message_id)
+        if not ok:
+            return await interaction.response.send_message(f"Saldo insuficiente! Você tem {balance} FutCoins.", ephemeral=True)
+
+        replaced = await self.bot.db.place_bet_entry(message_id, user_id, self.team_type, bet_amount)
+        if replaced is BET_CLOSED:
+            # O bolão fechou entre a checagem e a gravação: a aposta não entrou, devolve o débito
+            await self.bot.db.update_balance(user_id, bet_amount - refund_amount, reason="reembolso", game="bolao", ref=message_id)
+            return await interaction.response.send_message("As apostas deste bolão já foram encerradas.", ephemeral=True)
+        await self.bot.db.update_user_stats(user_id, bets_made_inc=1, wagered_inc=bet_amount)
+        # Se outra aposta do mesmo usuário entrou no meio, acerta a diferença do reembolso
+        replaced_amount = replaced['amount'] if replaced else 0
+        if replaced_amount != refund_amount:
+            await self.bot.db.update_balance(user_id, replaced_amount - refund_amount, reason="reembolso", game="bolao", ref=message_id)
         
         await interaction.response.send_message(f"✅ Aposta de **{bet_amount}** FutCoins registrada para **{self.team_name}**!", ephemeral=True)
-        await update_bet_embed(interaction.message, self.bot)
+        bet_embeds.request(interaction.message, self.bot)
 
 
 class BetView(ui.View):
@@ -56,12 +91,12 @@ class BetView(ui.View):
         self.bot = bot
 
     async def handle_bet(self, interaction: discord.Interaction, team_type: str):
-        bet_doc = self.bot.db.get_bet(interaction.message.id)
-        if not bet_doc or bet_doc.get("status") == "closed":
+        bet_doc = await self.bot.db.get_bet(interaction.message.id)
+        if not betting_open(bet_doc):
             return await interaction.response.send_message("Este bolão está encerrado.", ephemeral=True)
         
         team_name = bet_doc[team_type]
-        await interaction.response.send_modal(BetModal(self.bot, team_name))
+        await interaction.response.send_modal(BetModal(self.bot, team_type, team_name))
 
     @ui.button(label="Apostar Time A", style=discord.ButtonStyle.primary, custom_id="bet_home_team")
     async def home_button(self, i: discord.Interaction, b: ui.Button): await self.handle_bet(i, "team_home")
@@ -72,63 +107,279 @@ class BetView(ui.View):
     @ui.button(label="Cancelar Aposta", style=discord.ButtonStyle.danger, custom_id="bet_cancel")
     async def cancel_button(self, interaction: discord.Interaction, button: ui.Button):
         user_id = interaction.user.id
-        bet_doc = self.bot.db.get_bet(interaction.message.id)
-        if not bet_doc or bet_doc.get("status") == "closed":
+        bet_doc = await self.bot.db.get_bet(interaction.message.id)
+        if not betting_open(bet_doc):
             return await interaction.response.send_message("Este bolão está encerrado.", ephemeral=True)
 
-        user_bet = next((p for p in bet_doc.get("participants", []) if p["user_id"] == user_id), None)
-
+        # Remove a aposta de forma atômica; um segundo clique não acha nada e não reembolsa de novo
+        user_bet = await self.bot.db.remove_bet_entry(interaction.message.id, user_id)
+        if user_bet is BET_CLOSED:
+            # O bolão fechou (ou começou a ser pago) depois da checagem acima
+            return await interaction.response.send_message("Este bolão está encerrado.", ephemeral=True)
         if not user_bet:
             return await interaction.response.send_message("Você não tem uma aposta registrada neste bolão.", ephemeral=True)
 
-        # Devolve o dinheiro e remove a aposta do DB
+        # Devolve o dinheiro
         refund_amount = user_bet['amount']
-        self.bot.db.update_balance(user_id, refund_amount)
-        self.bot.db.add_participant_bet(interaction.message.id, user_id, "", -1) # Gambiarra para remover com pull/push
+        await self.bot.db.update_balance(user_id, refund_amount, reason="reembolso", game="bolao", ref=interaction.message.id)
 
         await interaction.response.send_message(f"✅ Sua aposta de {refund_amount} FutCoins foi cancelada e o valor devolvido.", ephemeral=True)
-        await update_bet_embed(interaction.message, self.bot)
-
+        bet_embeds.request(interaction.message, self.bot)
+
+
+def _team_field(entries: list, total: int, count: int) -> str:
+    """Texto do campo de um time: total, os maiores apostadores e quantos ficaram de fora."""
+    if not count: return "Nenhuma aposta"
+    header = f"**Total: {total} FutCoins** • {count} apostador(es)"
+    lines = [f"<@{e['user_id']}> ({e['amount']})" for e in entries]
+    while True:
+        hidden = count - len(lines)
+        text = "\n".join([header] + lines + ([f"… e mais {hidden}"] if hidden > 0 else []))
+        if len(text) <= FIELD_LIMIT or not lines: return text
+        lines.pop()
+
+async def _fill_bet_fields(embed: discord.Embed, bet_doc: dict, bot):
+    """Redesenha os campos do bolão a partir dos totais do documento e dos maiores apostadores."""
+    embed.clear_fields()
+    for team in BET_TEAMS:
+        entries = await bot.db.get_bet_entries(bet_doc["message_id"], team, limit=BET_EMBED_TOP_N)
+        embed.add_field(name=f"Apostas em {bet_doc[team]}", value=_team_field(entries, bet_doc["totals"][team], bet_doc["counts"][team]), inline=True)
 
 async def update_bet_embed(message: discord.Message, bot):
-    bet_doc = bot.db.get_bet(message.id)
-    if not bet_doc: return
+    bet_doc = await bot.db.get_bet(message.id)
+    if not bet_doc or bet_doc.get("status") != "open": return
 
     embed = message.embeds[0]
-    embed.clear_fields()
+    await _fill_bet_fields(embed, bet_doc, bot)
+    # Sem `view`, a edição mantém os botões que já estão na mensagem
+    await edit_webhook(message.channel, message.id, embed, bot_user=bot.user)
+
+
+class BetEmbedRefresher:
+    """Junta as atualizações do embed de cada bolão.
 
-    home_bets = [p for p in bet_doc.get("participants", []) if p["bet_on"] == bet_doc["team_home"]]
-    away_bets = [p for p in bet_doc.get("participants", []) if p["bet_on"] == bet_doc["team_away"]]
-    total_home = sum(b['amount'] for b in home_bets)
-    total_away = sum(b['amount'] for b in away_bets)
-    home_text = f"**Total: {total_home} FutCoins**\n" + "\n".join([f"<@{b['user_id']}> ({b['amount']})" for b in home_bets]) if home_bets else "Nenhuma aposta"
-    away_text = f"**Total: {total_away} FutCoins**\n" + "\n".join([f"<@{b['user_id']}> ({b['amount']})" for b in away_bets]) if away_bets else "Nenhuma aposta"
+    Cada aposta só marca o bolão como "sujo"; uma Task por bolão edita a mensagem no
+    máximo uma vez a cada BET_EMBED_INTERVAL segundos, sempre com o estado mais recente.
+    """
+    def __init__(self, interval: float = BET_EMBED_INTERVAL):
+        self.interval = interval
+        self._dirty = {}      # {message_id: (Message mais recente, bot)}
+        self._tasks = {}      # {message_id: Task}
+        self._last_edit = {}  # {message_id: time.monotonic() da última edição}
 
-    embed.add_field(name=f"Apostas em {bet_doc['team_home']}", value=home_text, inline=True)
-    embed.add_field(name=f"Apostas em {bet_doc['team_away']}", value=away_text, inline=True)
-    
-    view = BetView(bot)
-    view.children[0].label = bet_doc["team_home"]
-    view.children[1].label = bet_doc["team_away"]
-    await edit_webhook(message.channel, message.id, embed, view=view, bot_user=bot.user)
+    def request(self, message: discord.Message, bot):
+        self._dirty[message.id] = (message, bot)
+        if message.id not in self._tasks:
+            self._tasks[message.id] = asyncio.create_task(self._run(message.id))
+
+    async def _run(self, message_id: int):
+        try:
+            while message_id in self._dirty:
+                wait = self._last_edit.get(message_id, 0) + self.interval - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                message, bot = self._dirty.pop(message_id)
+                self._last_edit[message_id] = time.monotonic()
+                try:
+                    await update_bet_embed(message, bot)
+                except Exception as e:
+                    print(f"Erro ao atualizar o embed do bolão {message_id}: {e}")
+        finally:
+            self._tasks.pop(message_id, None)
+
+    def cancel(self, message_id: int):
+        """Descarta a atualização pendente (ex.: o bolão foi encerrado)."""
+        self._dirty.pop(message_id, None)
+        self._last_edit.pop(message_id, None)
+        task = self._tasks.pop(message_id, None)
+        if task is not None:
+            task.cancel()
+
+    def cancel_all(self):
+        for message_id in list(self._tasks):
+            self.cancel(message_id)
+
+bet_embeds = BetEmbedRefresher()
 
 
 class Betting(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.bot.add_view(BetView(bot))
+        self.scheduler = Scheduler(bot.db)
+        self.scheduler.register("bolao_close", self._close_betting)
+        self.scheduler.register("bolao_settle", self._poll_result)
+
+    async def cog_load(self):
+        # A agenda é global: só o cluster principal a executa (os outros só gravam tarefas no banco)
+        if IS_PRIMARY:
+            await self.scheduler.start(sync=MULTI_PROCESS)
+
+    async def _bets_channel(self):
+        """Canal dos bolões; via API se o servidor dele estiver num shard de outro processo."""
+        return self.bot.get_channel(BETS_CHANNEL_ID) or await self.bot.fetch_channel(BETS_CHANNEL_ID)
+
+    def cog_unload(self):
+        self.scheduler.stop()
+        bet_embeds.cancel_all()
+
+    async def _mark_bet_message(self, bet_doc: dict, note: str):
+        """Acrescenta `note` à descrição da mensagem do bolão, com os totais finais nos campos."""
+        try:
+            bets_channel = await self._bets_channel()
+            original_message = await bets_channel.fetch_message(bet_doc["message_id"])
+            original_embed = original_message.embeds[0]
+            original_embed.description += f"\n\n{note}"
+            await _fill_bet_fields(original_embed, bet_doc, self.bot)
+            await edit_webhook(bets_channel, bet_doc["message_id"], original_embed, view=None, bot_user=self.bot.user)
+        except Exception as e:
+            print(f"Não foi possível editar a mensagem original do bolão: {e}")
+
+    async def settle_bet(self, bet_doc: dict, winning_team: str, result_text: str, channel=None) -> bool:
+        """Paga e encerra o bolão. `winning_team` None (empate, partida cancelada) devolve todas as apostas.
+
+        Retorna False se o bolão já estava sendo encerrado por outro caminho (manual x automático).
+        """
+        message_id = bet_doc["message_id"]
+        previous_status = bet_doc["status"]
+        if not await self.bot.db.set_bet_status(message_id, "settling", only_if=previous_status):
+            return False
+        bet_embeds.cancel(message_id)
+
+        try:
+            # Bolões de antes dos modos de pagamento prometiam aposta × 2
+            entries = await self.bot.db.get_bet_entries(message_id)
+            settlement = settle_pool(
+                entries, winning_team, bet_doc.get("payout_mode", FIXED_ODDS),
+                rake=bet_doc.get("rake", DEFAULT_RAKE), odds=bet_doc.get("odds")
+            )
+
+            result_desc = f"O bolão **'{bet_doc.get('title', 'N/A')}'** foi encerrado!\n{result_text}"
+            if settlement.refunded:
+                result_desc += "\n\nTodas as apostas foram devolvidas."
+            elif not settlement.winners:
+                result_desc += "\n\nNinguém acertou o palpite."
+            else:
+                winner_lines = [f"🏅 <@{user_id}> ganhou **{credit}** FutCoins!" for user_id, _, credit in settlement.winners[:BET_EMBED_TOP_N]]
+                hidden = len(settlement.winners) - len(winner_lines)
+                if hidden > 0: winner_lines.append(f"… e mais {hidden} vencedor(es).")
+                result_desc += "\n\n**Vencedores:**\n" + "\n".join(winner_lines)
+                result_desc += f"\n\n💰 Pote: **{settlement.pool}** • Pago: **{settlement.paid}** FutCoins"
+
+            # Encerra o bolão e paga todos os vencedores de uma vez
+            await self.bot.db.settle_payouts(settlement.payouts, close_bet=message_id, reason="reembolso" if settlement.refunded else "premio", game="bolao")
+        except Exception:
+            # Nada foi pago (o encerramento é atômico): volta o status para o bolão poder ser pago de novo
+            await self.bot.db.set_bet_status(message_id, previous_status, only_if="settling")
+            raise
+        for kind in ("bolao_close", "bolao_settle"):
+            await self.scheduler.cancel(f"{kind}:{message_id}")
+
+        result_embed = discord.Embed(title="🏁 Bolão Encerrado!", description=result_desc)
+        try:
+            await send_webhook(channel or await self._bets_channel(), result_embed, bot_user=self.bot.user)
+        except discord.HTTPException as e:
+            print(f"Erro ao anunciar o resultado do bolão {message_id}: {e}")
+        await self._mark_bet_message(bet_doc, "**APOSTAS ENCERRADAS**")
+        return True
+
+    # --- Tarefas agendadas ---
+    async def _close_betting(self, data: dict):
+        """No início da partida: fecha as apostas (o pagamento vem depois, em `_poll_result`)."""
+        await self.bot.wait_until_ready()
+        message_id = data["message_id"]
+        if not await self.bot.db.set_bet_status(message_id, "locked", only_if="open"):
+            return None
+        bet_embeds.cancel(message_id)
+        bet_doc = await self.bot.db.get_bet(message_id)
+        await self._mark_bet_message(bet_doc, "🔒 **Apostas fechadas: a partida começou!**")
+        return None
+
+    async def _poll_result(self, data: dict):
+        """Depois do apito final previsto: busca o placar e paga o bolão, ou tenta de novo mais tarde."""
+        await self.bot.wait_until_ready()
+        bet_doc = await self.bot.db.get_bet(data["message_id"])
+        if not bet_doc or bet_doc["status"] not in ("open", "locked"):
+            return None
+        retry_at = datetime.utcnow() + RESULT_POLL
+        if time.time() - bet_doc.get("kickoff_ts", time.time()) > RESULT_GIVE_UP.total_seconds():
+            print(f"Sem resultado da partida {bet_doc['match_id']} para o bolão {bet_doc['message_id']}; use /bolao resultado.")
+            return None
+
+        football = self.bot.get_cog("Football")
+        if football is None:
+            return retry_at
+        match, error = await football.get_match(bet_doc["match_id"], fresh=True)
+        if error:
+            print(error)
+            return retry_at
+
+        status = (match.get("status") or "").lower()
+        if status == "finalizado":
+            home, away = int(match.get("placar_mandante") or 0), int(match.get("placar_visitante") or 0)
+            winning_team = "team_home" if home > away else "team_away" if away > home else None
+            score = f"Placar final: **{bet_doc['team_home']} {home} x {away} {bet_doc['team_away']}**."
+            await self.settle_bet(bet_doc, winning_team, score + ("" if winning_team else " Deu empate!"))
+            return None
+        if status in VOID_MATCH_STATUS:
+            await self.settle_bet(bet_doc, None, f"A partida foi {status}.")
+            return None
+        return retry_at
 
     bolao_group = app_commands.Group(name="bolao", description="Comandos para criar e gerenciar bolões.")
 
     @bolao_group.command(name="proximo", description="Cria um novo bolão de aposta para o próximo jogo.")
+    @app_commands.describe(
+        partida_id="ID da partida na api-futebol: fecha as apostas no início e paga sozinho no fim",
+        data_hora="Início da partida no horário de Brasília (ex.: 13/04/2025 18:30)",
+        modo="Pari-mutuel: quem acerta divide o lado perdedor. Odds: aposta × odd do time",
+        odd_a="Odd do time A no modo odds (padrão 2.0)",
+        odd_b="Odd do time B no modo odds (padrão 2.0)"
+    )
+    @app_commands.choices(modo=[
+        app_commands.Choice(name="Pari-mutuel", value=PARIMUTUEL),
+        app_commands.Choice(name="Odds fixas", value=FIXED_ODDS),
+    ])
     @app_commands.checks.has_role(BET_CREATOR_ROLE_ID)
-    async def bolao_proximo_slash(self, interaction: discord.Interaction, titulo: str, time_a: str, time_b: str, campeonato: str = None, data_hora: str = None):
-        bets_channel = self.bot.get_channel(BETS_CHANNEL_ID)
-        if not bets_channel:
+    async def bolao_proximo_slash(self, interaction: discord.Interaction, titulo: str, time_a: str = None, time_b: str = None, campeonato: str = None, data_hora: str = None, partida_id: int = None, modo: str = None, odd_a: app_commands.Range[float, 1.01, 100.0] = None, odd_b: app_commands.Range[float, 1.01, 100.0] = None):
+        try:
+            bets_channel = await self._bets_channel()
+        except discord.HTTPException:
             return await interaction.response.send_message("Canal de apostas não encontrado.", ephemeral=True)
+        await interaction.response.defer(ephemeral=True)
+
+        if partida_id is not None:
+            football = self.bot.get_cog("Football")
+            if football is None:
+                return await interaction.followup.send("O módulo de futebol não está carregado.", ephemeral=True)
+            match, error = await football.get_match(partida_id)
+            if error:
+                return await interaction.followup.send(error, ephemeral=True)
+            time_a = time_a or match.get("time_mandante", {}).get("nome_popular")
+            time_b = time_b or match.get("time_visitante", {}).get("nome_popular")
+            campeonato = campeonato or match.get("campeonato", {}).get("nome")
+            kickoff = match_kickoff(match)
+        else:
+            kickoff = parse_kickoff(data_hora)
+
+        if not time_a or not time_b:
+            return await interaction.followup.send("Informe os dois times ou o `partida_id`.", ephemeral=True)
+        if kickoff is not None and kickoff <= datetime.utcnow():
+            return await interaction.followup.send("Essa partida já começou.", ephemeral=True)
 
         description = f"Quem vence a partida entre **{time_a}** e **{time_b}**?"
-        if data_hora: description = f"🗓️ **Data:** {data_hora}\n" + description
+        if kickoff is not None:
+            kickoff_ts = int((kickoff - datetime(1970, 1, 1)).total_seconds())
+            description = f"🗓️ **Data:** <t:{kickoff_ts}:F> (<t:{kickoff_ts}:R>)\n" + description + "\n⏱️ As apostas fecham no início da partida."
+        elif data_hora:
+            description = f"🗓️ **Data:** {data_hora}\n" + description
+
+        modo = modo or DEFAULT_PAYOUT_MODE
+        if modo == FIXED_ODDS:
+            odds = {"team_home": odd_a or DEFAULT_ODDS, "team_away": odd_b or DEFAULT_ODDS}
+            description += f"\n💰 **Odds:** {time_a} x{odds['team_home']:g} • {time_b} x{odds['team_away']:g}"
+        else:
+            description += f"\n💰 **Pari-mutuel:** quem acertar divide as apostas do outro lado (taxa da casa: {DEFAULT_RAKE:.0%})."
         
         embed = discord.Embed(title=f"🏆 Bolão: {titulo}", description=description)
         if campeonato: embed.set_author(name=campeonato)
@@ -142,51 +393,41 @@ class Betting(commands.Cog):
             content=f"<@&{BET_NOTIFICATION_ROLE_ID}>"
         )
 
-        bet_data = {"message_id": message.id, "title": titulo, "team_home": time_a, "team_away": time_b, "status": "open", "participants": []}
-        self.bot.db.create_bet(bet_data)
+        bet_data = {"message_id": message.id, "title": titulo, "team_home": time_a, "team_away": time_b, "status": "open", "payout_mode": modo}
+        if modo == FIXED_ODDS: bet_data["odds"] = odds
+        else: bet_data["rake"] = DEFAULT_RAKE
+        if partida_id is not None: bet_data["match_id"] = partida_id
+        if kickoff is not None: bet_data["kickoff_ts"] = kickoff_ts
+        await self.bot.db.create_bet(bet_data)
+
+        if kickoff is not None:
+            await self.scheduler.schedule(f"bolao_close:{message.id}", kickoff, "bolao_close", {"message_id": message.id})
+            if partida_id is not None:
+                await self.scheduler.schedule(f"bolao_settle:{message.id}", kickoff + MATCH_DURATION, "bolao_settle", {"message_id": message.id})
         
         await update_bet_embed(message, self.bot)
-        await interaction.response.send_message(f"Bolão criado com sucesso em {bets_channel.mention}!", ephemeral=True)
+        await interaction.followup.send(f"Bolão criado com sucesso em {bets_channel.mention}!", ephemeral=True)
 
     @bolao_group.command(name="resultado", description="[Admin] Define o resultado de um bolão.")
+    @app_commands.describe(vencedor="Nome de um dos times, ou 'empate' para devolver as apostas")
     @app_commands.checks.has_role(BET_CREATOR_ROLE_ID)
     async def bolao_resultado_slash(self, interaction: discord.Interaction, id_da_mensagem: str, vencedor: str):
         try: message_id = int(id_da_mensagem)
         except ValueError: return await interaction.response.send_message("ID da mensagem inválido.", ephemeral=True)
 
-        bet_doc = self.bot.db.get_bet(message_id)
-        if not bet_doc or bet_doc['status'] == 'closed':
+        bet_doc = await self.bot.db.get_bet(message_id)
+        if not bet_doc or bet_doc['status'] not in ('open', 'locked'):
             return await interaction.response.send_message("Bolão não encontrado ou já encerrado.", ephemeral=True)
 
-        self.bot.db.close_bet(message_id)
-        winners = [p for p in bet_doc.get("participants", []) if p["bet_on"].lower() == vencedor.lower()]
-        
-        result_desc = f"O bolão **'{bet_doc.get('title', 'N/A')}'** foi encerrado!\nO vencedor foi **{vencedor}**."
-        
-        if not winners:
-            result_desc += "\n\nNinguém acertou o palpite."
-        else:
-            winner_lines = []
-            for winner in winners:
-                payout = winner['amount'] * 2
-                self.bot.db.update_balance(winner['user_id'], payout)
-                self.bot.db.update_user_stats(winner['user_id'], bets_won_inc=1, won_inc=payout)
-                winner_lines.append(f"🏅 <@{winner['user_id']}> ganhou **{payout}** FutCoins!")
-            result_desc += "\n\n**Vencedores:**\n" + "\n".join(winner_lines)
-
-        result_embed = discord.Embed(title="🏁 Bolão Encerrado!", description=result_desc)
-        await send_webhook(interaction.channel, result_embed, bot_user=self.bot.user)
-        
-        try:
-            bets_channel = self.bot.get_channel(BETS_CHANNEL_ID)
-            original_message = await bets_channel.fetch_message(message_id)
-            original_embed = original_message.embeds[0]
-            original_embed.description += "\n\n**APOSTAS ENCERRADAS**"
-            await edit_webhook(bets_channel, message_id, original_embed, view=None, bot_user=self.bot.user)
-        except Exception as e:
-            print(f"Não foi possível editar a mensagem original do bolão: {e}")
+        winning_team = next((team for team in BET_TEAMS if bet_doc[team].lower() == vencedor.lower()), None)
+        if winning_team is None and vencedor.lower() != "empate":
+            return await interaction.response.send_message(f"O vencedor deve ser **{bet_doc['team_home']}**, **{bet_doc['team_away']}** ou **empate**.", ephemeral=True)
 
-        await interaction.response.send_message("Resultado processado!", ephemeral=True)
+        await interaction.response.defer(ephemeral=True)
+        result_text = f"O vencedor foi **{bet_doc[winning_team]}**." if winning_team else "A partida terminou empatada."
+        if not await self.settle_bet(bet_doc, winning_team, result_text, channel=interaction.channel):
+            return await interaction.followup.send("Esse bolão já está sendo encerrado.", ephemeral=True)
+        await interaction.followup.send("Resultado processado!", ephemeral=True)
 
 
 async def setup(bot: commands.Bot):
@@ -1,17 +1,21 @@
 # cogs/economy.py
 import discord
-import random
 import asyncio
+import time
 from discord import app_commands, ui
 from discord.ext import commands, tasks
 from utils.webhook_manager import send_webhook
+from utils.edit_scheduler import EditScheduler
+from utils.cards import Hand, Shoe, LABELS, TABLE_DECKS, shared_shoe
+from utils.rng import SeededRNG
+from utils.games import BLACKJACK_PAYOUT, COIN_SIDES, dealer_play, blackjack_credit, bacbo_winner, bacbo_credit, coinflip_credit
+from utils.cluster import MULTI_PROCESS
 from datetime import datetime, timedelta
 from enum import Enum
 
-# --- LÓGICA BASE DO BLACKJACK ---
-suits = ('Copas ♥', 'Ouros ♦', 'Paus ♣', 'Espadas ♠')
-ranks = ('2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A')
-values = {'2': 2, '3': 3, '4': 4, '5': 5, '6': 6, '7': 7, '8': 8, '9': 9, '10': 10, 'J': 10, 'Q': 10, 'K': 10, 'A': 11}
+# De quanto em quanto tempo o ranking em memória é recarregado do banco. Com vários
+# processos, cada um só vê as próprias mudanças no meio-tempo, então recarrega mais vezes.
+LEADERBOARD_RELOAD_MINUTES = 1 if MULTI_PROCESS else 10
 
 # --- CONFIGURAÇÃO DE EMOJIS (IMPORTANTE!) ---
 DICE_EMOJI_NAMES = {
@@ -27,43 +31,6 @@ DICE_EMOJI_NAMES = {
     "rolling_red": "game_dice_rolling_red"
 }
 
-class Card:
-    def __init__(self, suit, rank):
-        self.suit = suit
-        self.rank = rank
-    def __str__(self):
-        return f'`{self.rank}{self.suit[-1]}`'
-
-class Deck:
-    def __init__(self):
-        self.deck = [Card(suit, rank) for suit in suits for rank in ranks]
-        self.shuffle()
-    def shuffle(self):
-        random.shuffle(self.deck)
-        if len(self.deck) < 20: # Recria o baralho se estiver acabando
-             self.deck = [Card(suit, rank) for suit in suits for rank in ranks]
-             random.shuffle(self.deck)
-    def deal(self):
-        return self.deck.pop()
-
-class Hand:
-    def __init__(self):
-        self.cards = []
-        self.value = 0
-        self.aces = 0
-    def add_card(self, card):
-        self.cards.append(card)
-        self.value += values[card.rank]
-        if card.rank == 'A':
-            self.aces += 1
-        self.adjust_for_ace()
-    def adjust_for_ace(self):
-        while self.value > 21 and self.aces:
-            self.value -= 10
-            self.aces -= 1
-    def __str__(self):
-        return ", ".join(str(card) for card in self.cards)
-
 # --- LÓGICA DO JOGO DA VELHA ---
 
 class TicTacToeView(ui.View):
@@ -101,15 +68,14 @@ class TicTacToeView(ui.View):
             # Paga o vencedor e encerra o jogo
             winner_user = self.challenger if winner == 1 else self.opponent
             payout = self.bet * 2
-            self.bot.db.update_balance(winner_user.id, payout)
+            await self.bot.db.update_balance(winner_user.id, payout, reason="premio", game="jogodavelha")
             status = f"🏆 **{winner_user.mention}** venceu e ganhou **{payout}** FutCoins!"
             await self.end_game(interaction, status)
             return
 
         if all(cell != 0 for cell in self.board):
             # Devolve o dinheiro em caso de empate
-            self.bot.db.update_balance(self.challenger.id, self.bet)
-            self.bot.db.update_balance(self.opponent.id, self.bet)
+            await self.bot.db.settle_payouts([(self.challenger.id, self.bet, None), (self.opponent.id, self.bet, None)], reason="reembolso", game="jogodavelha")
             status = f"🤝 Deu velha! O valor de **{self.bet}** FutCoins foi devolvido a ambos."
             await self.end_game(interaction, status)
             return
@@ -175,8 +141,15 @@ class ConfirmChallengeView(ui.View):
     @ui.button(label="Aceitar", style=discord.ButtonStyle.green)
     async def confirm(self, interaction: discord.Interaction, button: ui.Button):
         # Debita o valor dos jogadores
-        self.bot.db.update_balance(self.challenger.id, -self.bet)
-        self.bot.db.update_balance(self.opponent.id, -self.bet)
+        ok, _ = await self.bot.db.try_debit(self.challenger.id, self.bet, game="jogodavelha")
+        if not ok:
+            await interaction.response.edit_message(content=f"❌ {self.challenger.mention} não tem mais saldo para este desafio.", embed=None, view=None)
+            return self.stop()
+        ok, _ = await self.bot.db.try_debit(self.opponent.id, self.bet, game="jogodavelha")
+        if not ok:
+            await self.bot.db.update_balance(self.challenger.id, self.bet, reason="reembolso", game="jogodavelha")
+            await interaction.response.edit_message(content=f"❌ {self.opponent.mention} não tem mais saldo para este desafio.", embed=None, view=None)
+            return self.stop()
 
         # Inicia o jogo
         game_view = TicTacToeView(self.bot, self.challenger, self.opponent, self.bet)
@@ -206,12 +179,19 @@ class GameState(Enum):
     DEALER_TURN = 4
     PAYOUTS = 5
 
+# Intervalo (s) entre as atualizações de cada mesa e tempo máximo esperando uma edição da mensagem
+TABLE_TICK = 1.0
+TABLE_EDIT_TIMEOUT = 5.0
+
 class LiveBlackjackPlayer:
     def __init__(self, member: discord.Member):
         self.member = member
         self.hand = Hand()
         self.bet = 0
         self.status = 'playing'  # playing, stand, busted, blackjack
+        self.leaving = False     # saiu no meio da rodada: fica na mesa só até o acerto
+        # Um envio de aposta por vez: o delta do débito depende da aposta anterior
+        self.bet_lock = asyncio.Lock()
 
 class LiveBlackjackTable:
     def __init__(self, bot, channel: discord.TextChannel):
@@ -219,30 +199,92 @@ class LiveBlackjackTable:
         self.channel = channel
         self.message: discord.WebhookMessage = None
         self.view: LiveBlackjackView = None
+        self.editor: EditScheduler = None
         self.state = GameState.WAITING_FOR_BETS
-        self.countdown = 20
-        self.deck = Deck()
+        self.set_countdown(20)
+        self.deck = Shoe(TABLE_DECKS)
         self.dealer_hand = Hand()
         self.players = {}  # {member_id: LiveBlackjackPlayer}
         self.spectators = set()
         self.active = True
+        self.task: asyncio.Task = None
+        self.round_id = self._new_round_id()
+
+    def _new_round_id(self) -> str:
+        return f"blackjack:{self.channel.id}:{time.time_ns()}"
+
+    def bets(self) -> dict:
+        return {player.member.id: player.bet for player in self.players.values() if player.bet > 0}
+
+    def credits(self) -> dict:
+        """Quanto volta para cada jogador com aposta, depois que o dealer jogou."""
+        return {
+            player.member.id: blackjack_credit(player.bet, player.hand, self.dealer_hand, natural=player.status == 'blackjack')
+            for player in self.players.values() if player.bet > 0
+        }
+
+    async def journal(self):
+        """Grava a rodada no diário, para ser resolvida se o bot reiniciar no meio dela.
+
+        Depois do dealer o resultado vai junto, e a rodada é paga em vez de reembolsada.
+        """
+        credits = self.credits() if self.state == GameState.PAYOUTS else None
+        await self.bot.db.save_round(self.round_id, "blackjack", self.channel.id, self.state.name, self.bets(), credits)
+
+    def start(self) -> asyncio.Task:
+        """Roda a mesa na sua própria task, sem depender do ritmo das outras mesas."""
+        self.task = asyncio.create_task(self.run())
+        return self.task
+
+    async def run(self):
+        next_tick = time.monotonic()
+        while self.active:
+            try:
+                await self.tick()
+            except Exception as e:
+                print(f"Erro no loop da mesa de Blackjack (canal {self.channel.id}): {e}")
+                self.active = False
+                break
+            # Acorda no próximo tick ou no fim da fase, o que vier primeiro
+            next_tick = max(next_tick + TABLE_TICK, time.monotonic())
+            await asyncio.sleep(max(0.0, min(next_tick, self.deadline) - time.monotonic()))
+        # A mesa acabou no meio de uma rodada. Se o dealer já jogou (ou ia jogar), o resultado vale
+        # e a rodada é paga; antes disso, as apostas de quem ainda estava nela são devolvidas.
+        if self.state == GameState.DEALER_TURN:
+            dealer_play(self.dealer_hand, self.deck)
+            self.state = GameState.PAYOUTS
+        if self.state == GameState.PAYOUTS:
+            await self.process_payouts()
+        else:
+            await self.bot.db.refund_round(self.round_id, self.bets(), game="blackjack")
 
     async def tick(self):
         if not self.active: return
-        self.countdown -= 1
-        if self.countdown <= 0:
+        if time.monotonic() >= self.deadline:
+            previous_state = self.state
             await self.next_state()
+            if self.state != previous_state and self.bets():
+                await self.journal()
         
         try:
-            await self.update_embed()
+            # Uma edição presa no rate limit não pode segurar o relógio da mesa
+            await asyncio.wait_for(self.update_embed(), timeout=TABLE_EDIT_TIMEOUT)
+        except asyncio.TimeoutError:
+            pass
         except discord.NotFound:
             print(f"Mensagem da mesa de Blackjack no canal {self.channel.id} não encontrada. Encerrando mesa.")
             self.active = False
 
+    def set_countdown(self, seconds: int):
+        # O prazo é contado pelo relógio monotônico, então atrasos no loop não acumulam
+        self.deadline = time.monotonic() + seconds
+        # Mostrado como timestamp relativo do Discord, que o próprio cliente vai contando
+        self.phase_ends_at = int(time.time() + seconds)
+
     async def next_state(self):
         if self.state == GameState.WAITING_FOR_BETS:
             if not any(p.bet > 0 for p in self.players.values()):
-                self.countdown = 20
+                self.set_countdown(20)
                 return
             self.state = GameState.DEALING_CARDS
             await self.next_state()
@@ -262,7 +304,7 @@ class LiveBlackjackTable:
                 if player.bet > 0 and player.hand.value == 21:
                     player.status = 'blackjack'
             self.state = GameState.PLAYER_ACTIONS
-            self.countdown = 20
+            self.set_countdown(20)
 
         elif self.state == GameState.PLAYER_ACTIONS:
             for player in self.players.values():
@@ -272,50 +314,45 @@ class LiveBlackjackTable:
             await self.next_state()
 
         elif self.state == GameState.DEALER_TURN:
-            while self.dealer_hand.value < 17:
-                self.dealer_hand.add_card(self.deck.deal())
+            dealer_play(self.dealer_hand, self.deck)
             self.state = GameState.PAYOUTS
-            self.countdown = 15
+            self.set_countdown(15)
 
         elif self.state == GameState.PAYOUTS:
             await self.process_payouts()
             self.state = GameState.WAITING_FOR_BETS
-            self.countdown = 20
+            self.set_countdown(20)
             for player in self.players.values():
                 player.bet = 0
+            self.round_id = self._new_round_id()
+            for user_id in [uid for uid, p in self.players.items() if p.leaving]:
+                del self.players[user_id]
+            await self.close_if_empty()
     
     async def process_payouts(self):
-        dealer_val = self.dealer_hand.value
-        for player in self.players.values():
-            if player.bet == 0: continue
-            if player.status == 'blackjack':
-                payout = int(player.bet * 2.5)
-                self.bot.db.update_balance(player.member.id, payout)
-            elif player.status == 'busted': continue
-            elif dealer_val > 21 or player.hand.value > dealer_val:
-                payout = player.bet * 2
-                self.bot.db.update_balance(player.member.id, payout)
-            elif player.hand.value == dealer_val:
-                payout = player.bet
-                self.bot.db.update_balance(player.member.id, payout)
+        payouts = [(user_id, credit, None) for user_id, credit in self.credits().items() if credit]
+        # Paga e tira a rodada do diário na mesma operação
+        await self.bot.db.settle_payouts(payouts, close_round=self.round_id, game="blackjack")
 
     async def update_embed(self):
         state_map = {
-            GameState.WAITING_FOR_BETS: (f"Apostas Abertas! ({self.countdown}s)", discord.Color.gold()),
-            GameState.PLAYER_ACTIONS: (f"Façam suas jogadas! ({self.countdown}s)", discord.Color.blue()),
-            GameState.PAYOUTS: (f"Resultados! Próxima rodada em {self.countdown}s", discord.Color.green()),
-            GameState.DEALER_TURN: ("Vez do Dealer...", discord.Color.purple()),
-            GameState.DEALING_CARDS: ("Distribuindo cartas...", discord.Color.orange())
+            GameState.WAITING_FOR_BETS: ("Apostas Abertas!", discord.Color.gold(), "Apostas encerram"),
+            GameState.PLAYER_ACTIONS: ("Façam suas jogadas!", discord.Color.blue(), "Jogadas encerram"),
+            GameState.PAYOUTS: ("Resultados!", discord.Color.green(), "Próxima rodada"),
+            GameState.DEALER_TURN: ("Vez do Dealer...", discord.Color.purple(), None),
+            GameState.DEALING_CARDS: ("Distribuindo cartas...", discord.Color.orange(), None)
         }
-        title, color = state_map.get(self.state, ("Carregando...", discord.Color.default()))
+        title, color, timer_text = state_map.get(self.state, ("Carregando...", discord.Color.default(), None))
         embed = discord.Embed(title=f"Mesa de Blackjack - {title}", color=color)
 
         dealer_hand_str = ""
         if self.state in [GameState.PLAYER_ACTIONS, GameState.DEALING_CARDS] and self.dealer_hand.cards:
-            dealer_hand_str = f"{str(self.dealer_hand.cards[0])}, `?`  **(?)**"
+            dealer_hand_str = f"{LABELS[self.dealer_hand.cards[0]]}, `?`  **(?)**"
         else:
             dealer_hand_str = f"{str(self.dealer_hand)}  **({self.dealer_hand.value})**"
         embed.description = f"**Dealer:** {dealer_hand_str}\n\n"
+        if timer_text:
+            embed.description += f"⏱️ {timer_text} <t:{self.phase_ends_at}:R>\n"
 
         player_list = "\n".join(self.format_player_line(p) for p in self.players.values())
         spectator_list = ", ".join(f"{s.display_name}" for s in self.spectators)
@@ -323,14 +360,21 @@ class LiveBlackjackTable:
         embed.add_field(name="Jogadores", value=player_list or "Nenhum jogador na mesa.", inline=False)
         if self.spectators:
             embed.add_field(name="Espectadores", value=spectator_list, inline=False)
+        # Compromisso do sapato atual e semente do anterior, para conferir o embaralhamento
+        footer = f"Sapato de {self.deck.decks} baralho(s), {self.deck.remaining} cartas • sha256 {self.deck.commitment}"
+        if self.deck.last_seed: footer += f"\nSemente do sapato anterior: {self.deck.last_seed}"
+        embed.set_footer(text=footer)
         
-        await self.message.edit(embed=embed, view=self.view)
+        # Só edita quando algo mudou de verdade, respeitando o limite de edições do canal
+        if self.editor is None:
+            self.editor = EditScheduler(self.message)
+        await self.editor.submit(embed=embed, view=self.view)
 
     def format_player_line(self, player: LiveBlackjackPlayer):
         status_emoji = {'playing': '▶️', 'stand': '⏹️', 'busted': '💥', 'blackjack': '👑', 'spectating': '👀'}
         if player.bet > 0:
             hand_str = f"{str(player.hand)} **({player.hand.value})**"
-            return f"{status_emoji.get(player.status, '')} **{player.member.display_name}**: {hand_str} | Aposta: `{player.bet}`"
+            return f"{status_emoji.get(player.status, '')} **{player.member.display_name}**{' (saiu)' if player.leaving else ''}: {hand_str} | Aposta: `{player.bet}`"
         else:
             return f"👀 **{player.member.display_name}**: `(Aguardando para apostar)`"
 
@@ -343,11 +387,27 @@ class LiveBlackjackTable:
              self.spectators.add(member)
 
     async def remove_player(self, member: discord.Member):
-        if member.id in self.players:
-            del self.players[member.id]
+        player = self.players.get(member.id)
+        if player is not None:
+            async with player.bet_lock:
+                stake = player.bet
+                if stake > 0 and self.state != GameState.WAITING_FOR_BETS:
+                    # A aposta já está em jogo: o jogador para onde está e sai depois do acerto
+                    player.leaving = True
+                    if player.status == 'playing': player.status = 'stand'
+                else:
+                    del self.players[member.id]
+                    player.bet = 0
+                    if stake > 0:
+                        # Ainda nas apostas: devolve o valor antes de tirá-lo do diário
+                        await self.bot.db.update_balance(member.id, stake, reason="reembolso", game="blackjack", ref=self.round_id)
+                        await self.journal()
         if member in self.spectators:
             self.spectators.remove(member)
-        if not self.players and not self.spectators:
+        await self.close_if_empty()
+
+    async def close_if_empty(self):
+        if self.active and not self.players and not self.spectators:
             self.active = False
             await self.message.edit(content="Mesa encerrada por falta de jogadores.", embed=None, view=None)
 
@@ -355,12 +415,21 @@ class LiveBlackjackTable:
         user = interaction.user
         player = self.players.get(user.id)
         if not player: return await interaction.response.send_message("Você não está na mesa como jogador.", ephemeral=True)
-        balance = self.bot.db.get_balance(user.id)
-        if balance < amount: return await interaction.response.send_message("Saldo insuficiente.", ephemeral=True)
-        if player.bet > 0: self.bot.db.update_balance(user.id, player.bet)
-        self.bot.db.update_balance(user.id, -amount)
-        player.bet = amount
-        player.status = 'playing'
+        # O modal pode ter sido aberto nas apostas e enviado depois de as cartas saírem
+        if self.state != GameState.WAITING_FOR_BETS:
+            return await interaction.response.send_message("As apostas desta rodada já foram encerradas.", ephemeral=True)
+        async with player.bet_lock:
+            delta = amount - player.bet
+            # Devolve a aposta anterior e debita a nova numa única operação atômica
+            ok, _ = await self.bot.db.try_debit(user.id, delta, game="blackjack", ref=self.round_id)
+            if not ok: return await interaction.response.send_message("Saldo insuficiente.", ephemeral=True)
+            if self.state != GameState.WAITING_FOR_BETS or self.players.get(user.id) is not player:
+                # As cartas saíram (ou o jogador saiu) enquanto o débito era feito: desfaz
+                await self.bot.db.update_balance(user.id, delta, reason="reembolso", game="blackjack", ref=self.round_id)
+                return await interaction.response.send_message("As apostas desta rodada já foram encerradas.", ephemeral=True)
+            player.bet = amount
+            player.status = 'playing'
+            await self.journal()
         await interaction.response.send_message(f"✅ Aposta de `{amount}` FutCoins registrada!", ephemeral=True)
 
     async def player_action(self, interaction: discord.Interaction, action: str):
@@ -440,8 +509,12 @@ class ConfirmPaymentView(ui.View):
         return True
     @ui.button(label="Confirmar", style=discord.ButtonStyle.green)
     async def confirm(self, interaction: discord.Interaction, button: ui.Button):
-        self.bot.db.update_balance(self.from_user.id, -self.amount)
-        self.bot.db.update_balance(self.to_user.id, self.amount)
+        ok, balance = await self.bot.db.try_debit(self.from_user.id, self.amount, reason="transferencia", ref=self.to_user.id)
+        if not ok:
+            embed = discord.Embed(description=f"❌ Saldo insuficiente! Você tem {balance} FutCoins.")
+            await interaction.response.edit_message(embed=embed, view=None)
+            return self.stop()
+        await self.bot.db.update_balance(self.to_user.id, self.amount, reason="transferencia", ref=self.from_user.id)
         embed = discord.Embed(description=f"✅ **{self.from_user.mention}** transferiu **{self.amount}** FutCoins para **{self.to_user.mention}**.")
         await interaction.response.edit_message(embed=embed, view=None)
         self.stop()
@@ -456,8 +529,10 @@ class BlackjackSoloView(ui.View):
         self.bot = bot
         self.player = player
         self.bet = bet
-        self.deck = Deck()
+        self.deck = shared_shoe
         self.deck.shuffle()
+        # Compromisso do sapato compartilhado nesta partida (o mesmo que aparece no /saldo)
+        self.commitment = self.deck.commitment
         self.player_hand = Hand()
         self.dealer_hand = Hand()
         self.message = None
@@ -466,24 +541,23 @@ class BlackjackSoloView(ui.View):
         self.player_hand.add_card(self.deck.deal())
         self.dealer_hand.add_card(self.deck.deal())
         self.dealer_hand.add_card(self.deck.deal())
-        self.player_hand.adjust_for_ace()
-        self.dealer_hand.adjust_for_ace()
     def create_embed(self, game_over=False, result_text=""):
         embed = discord.Embed(title=f"Blackjack - Aposta: {self.bet} FutCoins", color=discord.Color.green())
         embed.set_author(name=self.player.display_name, icon_url=self.player.display_avatar.url)
-        player_cards = ", ".join(str(card) for card in self.player_hand.cards)
-        embed.add_field(name=f"Sua Mão ({self.player_hand.value})", value=player_cards, inline=False)
+        embed.add_field(name=f"Sua Mão ({self.player_hand.value})", value=self.player_hand.text, inline=False)
         if game_over:
-            dealer_cards = ", ".join(str(card) for card in self.dealer_hand.cards)
-            embed.add_field(name=f"Mão do Dealer ({self.dealer_hand.value})", value=dealer_cards, inline=False)
+            embed.add_field(name=f"Mão do Dealer ({self.dealer_hand.value})", value=self.dealer_hand.text, inline=False)
             embed.description = result_text
         else:
-            embed.add_field(name="Mão do Dealer (?)", value=f"{self.dealer_hand.cards[0]}, [CARTA OCULTA]", inline=False)
+            embed.add_field(name="Mão do Dealer (?)", value=f"{LABELS[self.dealer_hand.cards[0]]}, [CARTA OCULTA]", inline=False)
+        footer = f"Sapato compartilhado • sha256 {self.commitment}"
+        if self.deck.last_seed: footer += f"\nSemente do sapato anterior: {self.deck.last_seed}"
+        embed.set_footer(text=footer)
         return embed
     async def end_game(self, interaction: discord.Interaction, result_text: str, payout: int):
         for item in self.children:
             item.disabled = True
-        self.bot.db.update_balance(self.player.id, payout)
+        if payout: await self.bot.db.update_balance(self.player.id, payout, reason="premio", game="blackjack_solo")
         embed = self.create_embed(game_over=True, result_text=result_text)
         await interaction.response.edit_message(embed=embed, view=self)
         self.stop()
@@ -492,7 +566,6 @@ class BlackjackSoloView(ui.View):
         if interaction.user.id != self.player.id:
             return await interaction.response.send_message("Esta não é a sua mesa de jogo.", ephemeral=True)
         self.player_hand.add_card(self.deck.deal())
-        self.player_hand.adjust_for_ace()
         if self.player_hand.value > 21:
             await self.end_game(interaction, f"Você estourou com {self.player_hand.value}! Perdeu {self.bet} FutCoins.", 0)
         else:
@@ -502,13 +575,11 @@ class BlackjackSoloView(ui.View):
     async def stand(self, interaction: discord.Interaction, button: ui.Button):
         if interaction.user.id != self.player.id:
             return await interaction.response.send_message("Esta não é a sua mesa de jogo.", ephemeral=True)
-        while self.dealer_hand.value < 17:
-            self.dealer_hand.add_card(self.deck.deal())
-            self.dealer_hand.adjust_for_ace()
-        if self.dealer_hand.value > 21 or self.player_hand.value > self.dealer_hand.value:
-            payout = self.bet * 2
+        dealer_play(self.dealer_hand, self.deck)
+        payout = blackjack_credit(self.bet, self.player_hand, self.dealer_hand)
+        if payout > self.bet:
             await self.end_game(interaction, f"Você ganhou! Recebeu {payout} FutCoins.", payout)
-        elif self.player_hand.value < self.dealer_hand.value:
+        elif payout == 0:
             await self.end_game(interaction, f"O Dealer ganhou! Você perdeu {self.bet} FutCoins.", 0)
         else:
             await self.end_game(interaction, "Empate! Você recebeu sua aposta de volta.", self.bet)
@@ -527,14 +598,20 @@ class BacBoBetModal(ui.Modal, title="Aposte no Bac Bo"):
             return await interaction.response.send_message("Insira um número válido.", ephemeral=True)
         user_id = interaction.user.id
         view = self.parent_view
+        # O modal pode ter sido aberto antes do fim das apostas e enviado depois
+        if view.closed:
+            return await interaction.response.send_message("As apostas desta rodada já foram encerradas.", ephemeral=True)
         refund_amount = 0
         if user_id in view.bets: refund_amount = view.bets[user_id]['amount']
-        balance = self.bot.db.get_balance(user_id) + refund_amount
-        if balance < bet_amount:
-            return await interaction.response.send_message(f"Saldo insuficiente! Você tem {balance - refund_amount} FutCoins.", ephemeral=True)
-        if refund_amount > 0: self.bot.db.update_balance(user_id, refund_amount)
-        self.bot.db.update_balance(user_id, -bet_amount)
+        ok, balance = await self.bot.db.try_debit(user_id, bet_amount - refund_amount, game="bacbo", ref=view.round_id)
+        if not ok:
+            return await interaction.response.send_message(f"Saldo insuficiente! Você tem {balance} FutCoins.", ephemeral=True)
+        if view.closed:
+            # As apostas fecharam enquanto o débito era feito: desfaz e não mexe mais na rodada
+            await self.bot.db.update_balance(user_id, bet_amount - refund_amount, reason="reembolso", game="bacbo", ref=view.round_id)
+            return await interaction.response.send_message("As apostas desta rodada já foram encerradas.", ephemeral=True)
         view.bets[user_id] = {"choice": self.choice, "amount": bet_amount}
+        await view.journal()
         await interaction.response.send_message(f"✅ Aposta de {bet_amount} em **{self.choice}** registrada!", ephemeral=True)
         await view.update_embed()
 class BacBoView(ui.View):
@@ -544,6 +621,22 @@ class BacBoView(ui.View):
         self.bets = {}
         self.message = None
         self.emojis = {}
+        self.closed = False   # apostas encerradas (fim do tempo); nada mais entra na rodada
+        self.settled = False
+        # O sha256 da semente aparece ao abrir as apostas; a semente, no resultado
+        self.rng = SeededRNG()
+
+    @property
+    def round_id(self) -> str:
+        return f"bacbo:{self.message.id}"
+
+    def bet_amounts(self) -> dict:
+        return {user_id: bet['amount'] for user_id, bet in self.bets.items()}
+
+    async def journal(self, state: str = "betting", credits: dict = None):
+        """Grava as apostas da rodada no diário, para serem devolvidas (ou pagas, com `credits`) se o bot reiniciar."""
+        if self.settled: return
+        await self.bot.db.save_round(self.round_id, "bacbo", self.message.channel.id, state, self.bet_amounts(), credits)
     def load_emojis(self, guild):
         for color, dice in DICE_EMOJI_NAMES.items():
             if isinstance(dice, dict):
@@ -553,12 +646,16 @@ class BacBoView(ui.View):
             else:
                 self.emojis[color] = discord.utils.get(guild.emojis, name=dice) or "🎲"
     async def on_timeout(self):
+        self.closed = True
         for item in self.children: item.disabled = True
         if self.message:
             try:
                 await self.message.edit(view=self)
                 await self.reveal_result()
-            except discord.NotFound: print("Mensagem do BacBo não encontrada para finalizar.")
+            except discord.NotFound:
+                print("Mensagem do BacBo não encontrada para finalizar.")
+                if not self.settled and self.bets:
+                    await self.bot.db.refund_round(self.round_id, self.bet_amounts(), game="bacbo")
     async def update_embed(self):
         if not self.message: return
         embed = self.message.embeds[0]
@@ -578,8 +675,7 @@ class BacBoView(ui.View):
         embed.description = (f"**Jogador:** {rolling_blue} {rolling_blue}\n" f"**Banca:** {rolling_red} {rolling_red}\n\n" "Boa sorte!")
         await self.message.edit(embed=embed)
         await asyncio.sleep(2)
-        player_d1, player_d2 = random.randint(1, 6), random.randint(1, 6)
-        banker_d1, banker_d2 = random.randint(1, 6), random.randint(1, 6)
+        player_d1, player_d2, banker_d1, banker_d2 = self.rng.randints(1, 6, 4)
         player_total, banker_total = player_d1 + player_d2, banker_d1 + banker_d2
         dice_blue_1, dice_blue_2 = self.emojis.get("blue", {}).get(player_d1, "🎲"), self.emojis.get("blue", {}).get(player_d2, "🎲")
         dice_red_1, dice_red_2 = self.emojis.get("red", {}).get(banker_d1, "🎲"), self.emojis.get("red", {}).get(banker_d2, "🎲")
@@ -590,20 +686,26 @@ class BacBoView(ui.View):
         await self.reveal_step(3, dice_blue_1, dice_blue_2, dice_red_1, rolling_red)
         await asyncio.sleep(2)
         await self.reveal_step(4, dice_blue_1, dice_blue_2, dice_red_1, dice_red_2, player_total, banker_total)
-        if player_total > banker_total: winner = 'Jogador'
-        elif banker_total > player_total: winner = 'Banca'
-        else: winner = 'Empate'
+        winner = bacbo_winner(player_total, banker_total)
         result_embed = self.message.embeds[0]
         result_embed.title = "🎲 Bac Bo - Resultados!"
         result_embed.description += f"\n\nO vencedor é **{winner}**!"
         winners_text = ""
+        payouts = []
         for user_id, bet_info in self.bets.items():
-            if bet_info['choice'] == winner:
-                payout = bet_info['amount'] * 8 if winner == 'Empate' else bet_info['amount'] * 2
-                self.bot.db.update_balance(user_id, payout)
+            payout = bacbo_credit(bet_info['choice'], winner, bet_info['amount'])
+            if payout:
+                payouts.append((user_id, payout, None))
                 winners_text += f"🏅 <@{user_id}> ganhou **{payout}** FutCoins!\n"
+        if self.bets:
+            # O resultado vai para o diário antes de pagar: um reinício aqui paga em vez de reembolsar
+            await self.journal("payouts", {user_id: payout for user_id, payout, _ in payouts})
+            # Paga e tira a rodada do diário na mesma operação
+            await self.bot.db.settle_payouts(payouts, close_round=self.round_id, game="bacbo")
+        self.settled = True
         if not winners_text: winners_text = "Ninguém ganhou desta vez."
         result_embed.add_field(name="Vencedores", value=winners_text, inline=False)
+        result_embed.set_footer(text=f"Semente: {self.rng.reveal()} • sha256 {self.rng.commitment}")
         await self.message.edit(embed=result_embed)
     async def reveal_step(self, step, d_b1, d_b2, d_r1, d_r2, p_total=None, b_total=None):
         player_score = f"= **{p_total}**" if p_total is not None else ""
@@ -623,28 +725,29 @@ class Economy(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.active_tables = {} # {channel_id: LiveBlackjackTable}
-        self.blackjack_table_updater.start()
+        # Gerador da próxima cara ou coroa de cada usuário: o compromisso aparece antes da aposta
+        self.coinflip_rngs = {} # {user_id: SeededRNG}
+        self.leaderboard_refresher.start()
 
     def cog_unload(self):
-        self.blackjack_table_updater.cancel()
+        for table in self.active_tables.values():
+            table.active = False
+            if table.task: table.task.cancel()
+        self.leaderboard_refresher.cancel()
 
-    @tasks.loop(seconds=1)
-    async def blackjack_table_updater(self):
-        if not self.active_tables:
-            return
-        for table in list(self.active_tables.values()):
-            if not table.active:
-                del self.active_tables[table.channel.id]
-                continue
-            try:
-                await table.tick()
-            except Exception as e:
-                print(f"Erro no loop da mesa de Blackjack (canal {table.channel.id}): {e}")
-                table.active = False
+    def _forget_table(self, table):
+        # Chamado quando a task da mesa termina
+        if self.active_tables.get(table.channel.id) is table:
+            del self.active_tables[table.channel.id]
 
-    @blackjack_table_updater.before_loop
-    async def before_blackjack_updater(self):
-        await self.bot.wait_until_ready()
+    def _next_coinflip(self, user_id: int) -> SeededRNG:
+        return self.coinflip_rngs.setdefault(user_id, SeededRNG())
+
+    def _fairness_text(self, user_id: int) -> str:
+        """Compromissos das próximas jogadas do usuário, mostrados antes de ele apostar."""
+        text = f"Próxima cara ou coroa: `{self._next_coinflip(user_id).commitment}`\nSapato do blackjack solo: `{shared_shoe.commitment}`"
+        if shared_shoe.last_seed: text += f"\nSemente do sapato anterior: `{shared_shoe.last_seed}`"
+        return text
 
     async def _send_response(self, ctx_or_i, content=None, embed=None, view=None, ephemeral=False, delete_after=None):
         if isinstance(ctx_or_i, discord.Interaction):
@@ -670,8 +773,8 @@ class Economy(commands.Cog):
             return await interaction.response.send_message("O valor da aposta deve ser positivo.", ephemeral=True)
 
         # Verifica o saldo de ambos
-        saldo_desafiante = self.bot.db.get_balance(desafiante.id)
-        saldo_oponente = self.bot.db.get_balance(oponente.id)
+        saldo_desafiante = await self.bot.db.get_balance(desafiante.id)
+        saldo_oponente = await self.bot.db.get_balance(oponente.id)
 
         if saldo_desafiante < valor:
             return await interaction.response.send_message(f"Você não tem saldo suficiente! Seu saldo: {saldo_desafiante} FutCoins.", ephemeral=True)
@@ -691,15 +794,17 @@ class Economy(commands.Cog):
     @commands.command(name="saldo")
     async def saldo_prefix(self, ctx: commands.Context, membro: discord.Member = None):
         user = membro or ctx.author
-        data = self.bot.db.get_user_data(user.id)
+        data = await self.bot.db.get_user_data(user.id)
         embed = discord.Embed(title=f"💰 Saldo de {user.display_name}", description=f"Possui **{data.get('balance', 0)}** FutCoins.")
+        if user == ctx.author: embed.add_field(name="🔐 Compromissos", value=self._fairness_text(user.id), inline=False)
         await send_webhook(ctx.channel, embed, bot_user=self.bot.user)
 
     @app_commands.command(name="saldo", description="Verifica seu saldo ou o de outro membro.")
     async def saldo_slash(self, i: discord.Interaction, membro: discord.Member = None):
         user = membro or i.user
-        data = self.bot.db.get_user_data(user.id)
+        data = await self.bot.db.get_user_data(user.id)
         embed = discord.Embed(title=f"💰 Saldo de {user.display_name}", description=f"Possui **{data.get('balance', 0)}** FutCoins.")
+        if user == i.user: embed.add_field(name="🔐 Compromissos", value=self._fairness_text(user.id), inline=False)
         await i.response.send_message(embed=embed, ephemeral=True)
 
     @commands.command(name="perfil")
@@ -713,7 +818,7 @@ class Economy(commands.Cog):
         await self._handle_userstats(i, user)
 
     async def _handle_userstats(self, ctx_or_i, membro: discord.Member):
-        user_data = self.bot.db.get_user_data(membro.id)
+        user_data = await self.bot.db.get_user_data(membro.id)
         stats = user_data.get("stats", {})
         embed = discord.Embed(title=f"Perfil de {membro.display_name}", color=membro.color)
         embed.set_thumbnail(url=membro.display_avatar.url)
@@ -737,8 +842,6 @@ class Economy(commands.Cog):
         sender = ctx_or_i.author if isinstance(ctx_or_i, commands.Context) else ctx_or_i.user
         if sender.id == membro.id: return await self._send_response(ctx_or_i, "Você não pode pagar a si mesmo.", ephemeral=True)
         if quantia <= 0: return await self._send_response(ctx_or_i, "A quantia deve ser positiva.", ephemeral=True)
-        sender_balance = self.bot.db.get_balance(sender.id)
-        if sender_balance < quantia: return await self._send_response(ctx_or_i, f"Saldo insuficiente! Você tem {sender_balance} FutCoins.", ephemeral=True)
         embed = discord.Embed(title="Confirmar Transferência", description=f"Você tem certeza que deseja transferir **{quantia}** FutCoins para **{membro.mention}**?")
         view = ConfirmPaymentView(sender, membro, quantia, self.bot)
         await self._send_response(ctx_or_i, embed=embed, view=view, ephemeral=True)
@@ -760,31 +863,60 @@ class Economy(commands.Cog):
 
     async def _handle_collect(self, ctx_or_i, type, amount, delta):
         user = ctx_or_i.author if isinstance(ctx_or_i, commands.Context) else ctx_or_i.user
-        user_data = self.bot.db.get_user_data(user.id)
-        last_collect = user_data.get("cooldowns", {}).get(type)
-        if last_collect and (datetime.utcnow() - last_collect) < delta:
+        # Marca o cooldown antes de pagar, numa operação só: dois cliques (ou dois clusters) não coletam duas vezes
+        ok, last_collect = await self.bot.db.claim_cooldown(user.id, type, delta)
+        if not ok:
             remaining = (last_collect + delta) - datetime.utcnow()
             return await self._send_response(ctx_or_i, f"Você já coletou seu prêmio {type}. Tente novamente em {str(remaining).split('.')[0]}.", ephemeral=True)
-        self.bot.db.update_balance(user.id, amount)
-        self.bot.db.update_cooldown(user.id, type)
+        await self.bot.db.update_balance(user.id, amount, reason="coleta", ref=type)
         await self._send_response(ctx_or_i, f"🎉 Você coletou **{amount}** FutCoins!", ephemeral=True)
 
     @commands.command(name="top")
-    async def top_prefix(self, ctx: commands.Context): await self._handle_top(ctx)
+    async def top_prefix(self, ctx: commands.Context, pagina: int = 1): await self._handle_top(ctx, pagina)
     @app_commands.command(name="top", description="Mostra o ranking dos mais ricos do servidor.")
-    async def top_slash(self, i: discord.Interaction): await self._handle_top(i)
+    @app_commands.describe(pagina="Página do ranking (10 por página).")
+    async def top_slash(self, i: discord.Interaction, pagina: int = 1): await self._handle_top(i, pagina)
 
-    async def _handle_top(self, ctx_or_i):
+    async def _handle_top(self, ctx_or_i, pagina: int = 1):
         guild = ctx_or_i.guild
-        top_users_data = self.bot.db.get_top_users(guild.members, 10)
-        embed = discord.Embed(title=f"🏆 Top 10 Ricos - {guild.name}")
-        desc = ""
-        for i, user_data in enumerate(top_users_data):
-            member = guild.get_member(user_data["user_id"])
-            if member: desc += f"**{i+1}º** {member.mention} - `{user_data['balance']}` FutCoins\n"
-        embed.description = desc or "Ninguém no ranking ainda."
+        user = ctx_or_i.author if isinstance(ctx_or_i, commands.Context) else ctx_or_i.user
+        pagina = max(pagina, 1)
+        board = self.bot.db.leaderboard
+        if not board.loaded:
+            await self.bot.db.load_leaderboard()
+
+        # Ranking só com os membros deste servidor, montado uma vez e mantido pelos eventos de entrada/saída
+        if not board.has_scope(guild.id):
+            board.ensure_scope(guild.id, (member.id for member in guild.members))
+        entries = board.top(limit=10, offset=(pagina - 1) * 10, scope=guild.id)
+        title = f"🏆 Top 10 Ricos - {guild.name}" if pagina == 1 else f"🏆 Ranking de Ricos - {guild.name} (página {pagina})"
+        embed = discord.Embed(title=title)
+        embed.description = "\n".join(f"**{pos}º** <@{user_id}> - `{balance}` FutCoins" for pos, user_id, balance in entries) or "Ninguém no ranking ainda."
+        rank = board.rank(user.id, scope=guild.id)
+        if rank: embed.add_field(name="Sua posição", value=f"**{rank}º**", inline=False)
         await self._send_response(ctx_or_i, embed=embed)
 
+    @tasks.loop(minutes=LEADERBOARD_RELOAD_MINUTES)
+    async def leaderboard_refresher(self):
+        # Carrega o ranking e o recarrega de tempos em tempos para corrigir alterações feitas fora do bot
+        await self.bot.db.load_leaderboard()
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member):
+        self.bot.db.leaderboard.add_member(member.guild.id, member.id)
+
+    @commands.Cog.listener()
+    async def on_member_remove(self, member: discord.Member):
+        self.bot.db.leaderboard.remove_member(member.guild.id, member.id)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        self.bot.db.leaderboard.drop_scope(guild.id)
+
+    @leaderboard_refresher.before_loop
+    async def before_leaderboard_refresher(self):
+        await self.bot.wait_until_ready()
+
     @commands.command(name="caraoucoroa")
     async def coinflip_prefix(self, ctx: commands.Context, lado: str = None, quantia: int = None):
         if lado is None or quantia is None: return await ctx.send(f"Uso correto: `{ctx.prefix}caraoucoroa <cara/coroa> <quantia>`")
@@ -798,17 +930,22 @@ class Economy(commands.Cog):
     async def _handle_coinflip(self, ctx_or_i, lado: str, quantia: int):
         user = ctx_or_i.author if isinstance(ctx_or_i, commands.Context) else ctx_or_i.user
         lado = lado.lower()
-        if lado not in ['cara', 'coroa']: return await self._send_response(ctx_or_i, "Escolha inválida. Use 'cara' ou 'coroa'.", ephemeral=True)
+        if lado not in COIN_SIDES: return await self._send_response(ctx_or_i, "Escolha inválida. Use 'cara' ou 'coroa'.", ephemeral=True)
         if quantia <= 0: return await self._send_response(ctx_or_i, "A quantia deve ser positiva.", ephemeral=True)
-        balance = self.bot.db.get_balance(user.id)
-        if balance < quantia: return await self._send_response(ctx_or_i, f"Saldo insuficiente! Você tem {balance} FutCoins.", ephemeral=True)
-        resultado = random.choice(['cara', 'coroa'])
+        # Usa o gerador cujo compromisso já foi mostrado (no /saldo ou na jogada anterior)
+        rng = self.coinflip_rngs.pop(user.id, None) or SeededRNG()
+        resultado = rng.choice(COIN_SIDES)
+        # Aposta e prêmio numa única operação: o débito só acontece se o saldo cobrir
+        ok, balance = await self.bot.db.try_debit(user.id, quantia, credit=coinflip_credit(lado, resultado, quantia), game="caraoucoroa", ref=rng.commitment)
+        if not ok:
+            # Jogada não aconteceu: o mesmo gerador (ainda secreto) vale para a próxima
+            self.coinflip_rngs.setdefault(user.id, SeededRNG(rng.seed))
+            return await self._send_response(ctx_or_i, f"Saldo insuficiente! Você tem {balance} FutCoins.", ephemeral=True)
         if lado == resultado:
-            self.bot.db.update_balance(user.id, quantia)
             msg = f"🎉 Deu **{resultado}**! Você ganhou **{quantia}** FutCoins!"
         else:
-            self.bot.db.update_balance(user.id, -quantia)
             msg = f"😢 Deu **{resultado}**! Você perdeu **{quantia}** FutCoins."
+        msg += f"\n-# Semente: `{rng.reveal()}` (sha256 `{rng.commitment}`) • próxima jogada: sha256 `{self._next_coinflip(user.id).commitment}`"
         await self._send_response(ctx_or_i, msg)
 
     blackjack_group = app_commands.Group(name="blackjack", description="Jogue Blackjack solo ou em uma mesa.")
@@ -818,14 +955,13 @@ class Economy(commands.Cog):
     async def blackjack_solo(self, interaction: discord.Interaction, quantia: int):
         user = interaction.user
         if quantia <= 0: return await interaction.response.send_message("A aposta deve ser positiva.", ephemeral=True)
-        balance = self.bot.db.get_balance(user.id)
-        if balance < quantia: return await interaction.response.send_message(f"Saldo insuficiente! Você tem {balance} FutCoins.", ephemeral=True)
-        self.bot.db.update_balance(user.id, -quantia)
         view = BlackjackSoloView(self.bot, user, quantia)
         await view.start_game()
-        if view.player_hand.value == 21:
-            payout = int(quantia * 2.5)
-            self.bot.db.update_balance(user.id, payout)
+        # Um blackjack natural já é pago na mesma operação do débito da aposta
+        payout = int(quantia * BLACKJACK_PAYOUT) if view.player_hand.value == 21 else 0
+        ok, balance = await self.bot.db.try_debit(user.id, quantia, credit=payout, game="blackjack_solo")
+        if not ok: return await interaction.response.send_message(f"Saldo insuficiente! Você tem {balance} FutCoins.", ephemeral=True)
+        if payout:
             result_text = f"BLACKJACK! Você ganhou {payout} FutCoins!"
             for item in view.children: item.disabled = True
             embed = view.create_embed(game_over=True, result_text=result_text)
@@ -847,6 +983,7 @@ class Economy(commands.Cog):
         message = await interaction.channel.send(embed=initial_embed, view=view)
         table.message = message
         self.active_tables[channel_id] = table
+        table.start().add_done_callback(lambda _: self._forget_table(table))
         await table.add_player(interaction.user)
 
     @commands.command(name="bacbo")
@@ -858,6 +995,7 @@ class Economy(commands.Cog):
         view = BacBoView(self.bot)
         view.load_emojis(ctx_or_i.guild)
         embed = discord.Embed(title="🎲 Bac Bo - Façam suas apostas!", description=f"Apostas abertas por {view.timeout} segundos! Escolha entre Jogador, Banca ou Empate (paga 8x).")
+        embed.set_footer(text=f"Compromisso (sha256 da semente): {view.rng.commitment}")
         message = await self._send_response(ctx_or_i, embed=embed, view=view)
         view.message = message
 
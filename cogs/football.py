@@ -1,37 +1,140 @@
 # cogs/football.py
 import os
 import discord
-import requests
-from discord.ext import commands
+from discord.ext import commands, tasks
+from datetime import datetime, timedelta, timezone
 from utils.webhook_manager import send_webhook
 
 # --- CONSTANTES ---
 BRASILEIRAO_ID = 10
 API_BASE_URL = "https://api.api-futebol.com.br/v1/"
 
+# Endpoints mantidos sempre atualizados em segundo plano
+PREFETCH_ENDPOINTS = (f"campeonatos/{BRASILEIRAO_ID}/tabela", f"campeonatos/{BRASILEIRAO_ID}/artilharia")
+PREFETCH_FAST = 60     # segundos entre atualizações durante as janelas de jogos
+PREFETCH_SLOW = 1800   # segundos entre atualizações fora delas
+
+# Janelas em que costuma ter jogo do Brasileirão, no horário de Brasília: {dia_da_semana: (hora_inicio, hora_fim)}
+BRT = timezone(timedelta(hours=-3))
+MATCH_WINDOWS = {0: (19, 24), 2: (19, 24), 3: (19, 24), 5: (15, 24), 6: (11, 24)}  # seg, qua, qui, sáb, dom
+
+def in_match_window(now: datetime = None) -> bool:
+    now = (now or datetime.now(timezone.utc)).astimezone(BRT)
+    start, end = MATCH_WINDOWS.get(now.weekday(), (0, 0))
+    return start <= now.hour < end
+
+def seconds_until_match_window(now: datetime = None) -> float:
+    """Segundos até a próxima janela de jogos começar (0 se já estiver numa)."""
+    now = (now or datetime.now(timezone.utc)).astimezone(BRT)
+    if in_match_window(now): return 0.0
+    for days in range(8):
+        day = now + timedelta(days=days)
+        window = MATCH_WINDOWS.get(day.weekday())
+        if window is None: continue
+        start = day.replace(hour=window[0], minute=0, second=0, microsecond=0)
+        if start > now:
+            return (start - now).total_seconds()
+    return float("inf")
+
+def parse_kickoff(text: str) -> datetime:
+    """Converte o horário de uma partida para datetime UTC (sem tzinfo, como o resto do banco).
+
+    Aceita o `data_realizacao_iso` da API ("2024-04-13T18:30:00-0300") ou, digitado à mão
+    no horário de Brasília, "13/04/2024 18:30" / "13/04 18:30". Retorna None se não entender.
+    """
+    if not text: return None
+    text = text.strip()
+    try:
+        return datetime.strptime(text, "%Y-%m-%dT%H:%M:%S%z").astimezone(timezone.utc).replace(tzinfo=None)
+    except ValueError:
+        pass
+    for fmt in ("%d/%m/%Y %H:%M", "%d/%m/%Y %Hh%M", "%d/%m %H:%M", "%d/%m %Hh%M"):
+        try:
+            parsed = datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+        if "%Y" not in fmt:
+            parsed = parsed.replace(year=datetime.now(BRT).year)
+        return parsed.replace(tzinfo=BRT).astimezone(timezone.utc).replace(tzinfo=None)
+    return None
+
+def match_kickoff(match: dict) -> datetime:
+    """Início de uma partida de `partidas/{id}` em UTC."""
+    kickoff = parse_kickoff(match.get("data_realizacao_iso"))
+    if kickoff is None and match.get("data_realizacao") and match.get("hora_realizacao"):
+        kickoff = parse_kickoff(f"{match['data_realizacao']} {match['hora_realizacao']}")
+    return kickoff
+
 class Football(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.api_key = os.getenv('API_FUTEBOL_TOKEN')
         self.api_headers = {'Authorization': f'Bearer {self.api_key}'}
 
+        self.refresh_log = {}  # {endpoint: {"at", "duration", "ok"}} da última atualização em segundo plano
+        self.rendered_embeds = {}  # {endpoint: (hash_do_conteúdo, embed.to_dict())}
+
         if not self.api_key:
             print("[!] AVISO: API_FUTEBOL_TOKEN não encontrada. O módulo de futebol não funcionará.")
+        else:
+            self.prefetcher.start()
+
+    def cog_unload(self):
+        self.prefetcher.cancel()
+
+    @tasks.loop(seconds=PREFETCH_SLOW)
+    async def prefetcher(self):
+        """Atualiza a tabela e a artilharia antes de alguém pedir, mais rápido durante os jogos."""
+        for endpoint in PREFETCH_ENDPOINTS:
+            started = datetime.utcnow()
+            try:
+                await self.bot.http_client.refresh(API_BASE_URL + endpoint, self.api_headers)
+                entry = self.bot.http_client.peek(API_BASE_URL + endpoint)
+                self.refresh_log[endpoint] = {"at": entry.updated_at, "duration": entry.duration, "ok": True}
+            except Exception:
+                # A falha já é registrada pelo http_client; aqui só fica no histórico
+                self.refresh_log[endpoint] = {"at": started, "duration": (datetime.utcnow() - started).total_seconds(), "ok": False}
+
+        # Fora das janelas, acorda no início da próxima em vez de esperar o PREFETCH_SLOW inteiro
+        interval = max(PREFETCH_FAST, min(PREFETCH_SLOW, seconds_until_match_window()))
+        if self.prefetcher.seconds != interval:
+            self.prefetcher.change_interval(seconds=interval)
 
-    def _make_api_request(self, endpoint):
-        """Função auxiliar para fazer requisições à API com tratamento de erros."""
+    @prefetcher.before_loop
+    async def before_prefetcher(self):
+        await self.bot.wait_until_ready()
+
+    async def _make_api_request(self, endpoint):
+        """Função auxiliar para fazer requisições à API com tratamento de erros e cache."""
+        if not self.api_key:
+            return None, "A chave da API de futebol não foi configurada pelo desenvolvedor."
+        # Endpoints do prefetcher são lidos sempre do snapshot; a API só é chamada se ainda não houver um
+        ttl = float("inf") if endpoint in PREFETCH_ENDPOINTS and self.prefetcher.is_running() else None
+        return await self.bot.http_client.get(API_BASE_URL + endpoint, headers=self.api_headers, ttl=ttl)
+
+    async def get_match(self, match_id: int, fresh: bool = False):
+        """(dados, erro) de `partidas/{match_id}`; `fresh` espera uma resposta nova da API em vez do cache."""
         if not self.api_key:
             return None, "A chave da API de futebol não foi configurada pelo desenvolvedor."
+        url = API_BASE_URL + f"partidas/{match_id}"
+        if not fresh:
+            return await self.bot.http_client.get(url, headers=self.api_headers)
         try:
-            response = requests.get(API_BASE_URL + endpoint, headers=self.api_headers, timeout=15)
-            response.raise_for_status()
-            return response.json(), None
-        except requests.exceptions.Timeout:
-            return None, "A API demorou muito para responder (timeout)."
-        except requests.exceptions.HTTPError as e:
-            return None, f"Ocorreu um erro ao contatar a API (Código: {e.response.status_code})."
-        except requests.exceptions.RequestException as e:
-            return None, f"Ocorreu um erro de conexão com a API."
+            return await self.bot.http_client.refresh(url, self.api_headers), None
+        except Exception as e:
+            return None, f"Erro ao buscar a partida {match_id}: {e}"
+
+    def _get_embed(self, endpoint, data, render) -> discord.Embed:
+        """Embed do endpoint, renderizado de novo só quando o hash do conteúdo da API muda."""
+        entry = self.bot.http_client.peek(API_BASE_URL + endpoint)
+        digest = entry.digest if entry else None
+        cached = self.rendered_embeds.get(endpoint)
+        if cached is None or digest is None or cached[0] != digest:
+            cached = (digest, render(data).to_dict())
+            self.rendered_embeds[endpoint] = cached
+        embed = discord.Embed.from_dict(cached[1])
+        if entry: embed.timestamp = entry.updated_at.replace(tzinfo=timezone.utc)
+        return embed
 
     # --- COMANDO TABELA ---
     @commands.command(name="tabela", aliases=['classificacao'])
@@ -44,12 +147,16 @@ class Football(commands.Cog):
 
     async def _handle_tabela_command(self, context):
         """Lógica central para o comando de tabela."""
-        data, error = self._make_api_request(f"campeonatos/{BRASILEIRAO_ID}/tabela")
+        data, error = await self._make_api_request(f"campeonatos/{BRASILEIRAO_ID}/tabela")
         if error:
             embed = discord.Embed(title="Erro ao buscar Tabela", description=error)
             await send_webhook(context.channel, embed, bot_user=self.bot.user)
             return
         
+        embed = self._get_embed(f"campeonatos/{BRASILEIRAO_ID}/tabela", data, self._render_tabela)
+        await send_webhook(context.channel, embed, bot_user=self.bot.user)
+
+    def _render_tabela(self, data) -> discord.Embed:
         embed = discord.Embed(title="Tabela do Brasileirão Série A")
         description_lines = []
         for team in data:
@@ -66,7 +173,7 @@ class Football(commands.Cog):
             description_lines.append(f"**{pos}º** {nome} {emoji} - `{pts}` pts")
         
         embed.description = "\n".join(description_lines)
-        await send_webhook(context.channel, embed, bot_user=self.bot.user)
+        return embed
 
     # --- COMANDO ARTILHEIROS ---
     @commands.command(name="artilheiros", aliases=['goleadores'])
@@ -79,12 +186,16 @@ class Football(commands.Cog):
 
     async def _handle_artilheiros_command(self, context):
         """Lógica central para o comando de artilheiros."""
-        data, error = self._make_api_request(f"campeonatos/{BRASILEIRAO_ID}/artilharia")
+        data, error = await self._make_api_request(f"campeonatos/{BRASILEIRAO_ID}/artilharia")
         if error:
             embed = discord.Embed(title="Erro ao buscar Artilharia", description=error)
             await send_webhook(context.channel, embed, bot_user=self.bot.user)
             return
 
+        embed = self._get_embed(f"campeonatos/{BRASILEIRAO_ID}/artilharia", data, self._render_artilheiros)
+        await send_webhook(context.channel, embed, bot_user=self.bot.user)
+
+    def _render_artilheiros(self, data) -> discord.Embed:
         embed = discord.Embed(title="Artilharia - Brasileirão Série A")
         description_lines = []
         for i, artilheiro in enumerate(data[:10]): # Pega os 10 primeiros
@@ -94,7 +205,7 @@ class Football(commands.Cog):
             description_lines.append(f"**{i+1}º** {nome} ({time}) - `{gols}` gols")
         
         embed.description = "\n".join(description_lines)
-        await send_webhook(context.channel, embed, bot_user=self.bot.user)
+        return embed
 
 
 async def setup(bot: commands.Bot):
@@ -0,0 +1,78 @@
+# cogs/status.py
+import math
+import discord
+from discord import app_commands
+from discord.ext import commands, tasks
+from datetime import datetime, timedelta
+from utils.cluster import CLUSTER_ID, SHARDED
+
+# De quanto em quanto tempo cada processo grava a situação dos seus shards no banco.
+HEARTBEAT_MINUTES = 1
+# Shard sem batimento há mais tempo que isso aparece como fora do ar.
+STALE_AFTER = timedelta(minutes=3)
+
+class Status(commands.Cog):
+    """Situação dos shards de todos os clusters, guardada no banco por cada processo."""
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.heartbeat.start()
+
+    def cog_unload(self):
+        self.heartbeat.cancel()
+
+    def _local_shards(self) -> list:
+        """[{shard_id, cluster, latency, guilds, updated_at}] dos shards deste processo."""
+        guilds = {}
+        for guild in self.bot.guilds:
+            guilds[guild.shard_id] = guilds.get(guild.shard_id, 0) + 1
+        latencies = self.bot.latencies if SHARDED else [(self.bot.shard_id or 0, self.bot.latency)]
+        now = datetime.utcnow()
+        return [
+            {"shard_id": shard_id, "cluster": CLUSTER_ID, "latency": latency if math.isfinite(latency) else None,
+             "guilds": guilds.get(shard_id, 0), "updated_at": now}
+            for shard_id, latency in latencies
+        ]
+
+    @tasks.loop(minutes=HEARTBEAT_MINUTES)
+    async def heartbeat(self):
+        try:
+            await self.bot.db.save_shard_status(self._local_shards())
+        except Exception as e:
+            print(f"Erro ao gravar a situação dos shards: {e}")
+
+    @heartbeat.before_loop
+    async def before_heartbeat(self):
+        await self.bot.wait_until_ready()
+
+    @app_commands.command(name="shards", description="Mostra a latência e os servidores de cada shard do bot.")
+    async def shards_slash(self, interaction: discord.Interaction):
+        try:
+            statuses = await self.bot.db.get_shard_status()
+        except Exception as e:
+            print(f"Erro ao ler a situação dos shards: {e}")
+            statuses = []
+        # Os shards deste processo vão sempre com os números de agora
+        local = {s["shard_id"]: s for s in self._local_shards()}
+        statuses = sorted({**{s["shard_id"]: s for s in statuses}, **local}.values(), key=lambda s: s["shard_id"])
+
+        now = datetime.utcnow()
+        lines = []
+        for s in statuses:
+            if now - s["updated_at"] > STALE_AFTER:
+                state = "🔴 sem sinal"
+            elif s["latency"] is None:
+                state = "🟡 conectando"
+            else:
+                state = f"🟢 {s['latency'] * 1000:.0f} ms"
+            here = " ← você" if interaction.guild is not None and interaction.guild.shard_id == s["shard_id"] else ""
+            lines.append(f"`#{s['shard_id']:>3}` cluster {s['cluster']} • {state} • {s['guilds']} servidor(es){here}")
+
+        description = "\n".join(lines)
+        if len(description) > 4000:  # limite da descrição do embed é 4096
+            description = description[:description.rfind("\n", 0, 4000)] + "\n…"
+        embed = discord.Embed(title="📡 Shards", description=description or "Nenhum shard registrado.", color=discord.Color.blue())
+        embed.set_footer(text=f"Total: {sum(s['guilds'] for s in statuses)} servidor(es) em {len(statuses)} shard(s)")
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(Status(bot))
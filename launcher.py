@@ -0,0 +1,136 @@
+# launcher.py
+"""Abre o bot em vários processos (clusters), cada um com uma parte dos shards.
+
+Uso (na raiz do projeto):
+    python launcher.py [--clusters 4] [--shards 16]
+
+Sem --shards usa SHARD_COUNT do .env ou, se vazio, a quantidade recomendada pelo Discord.
+Sem --clusters usa CLUSTERS do .env ou um processo por CPU (nunca mais processos que shards).
+Cada processo roda o main.py com SHARD_COUNT, SHARD_IDS, CLUSTER_ID e CLUSTER_COUNT no
+ambiente; o cluster 0 é o principal (agenda dos bolões e sincronização dos slash commands).
+Um processo que cai é reaberto, esperando mais a cada queda seguida.
+"""
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+from dotenv import load_dotenv
+
+GATEWAY_URL = "https://discord.com/api/v10/gateway/bot"
+# Espera antes de reabrir um processo que caiu: dobra a cada queda seguida, até o máximo.
+RESTART_DELAY = 5
+MAX_RESTART_DELAY = 300
+# Um processo que ficou de pé por esse tempo zera a contagem de quedas.
+STABLE_AFTER = 600
+
+def recommended_shards(token: str) -> int:
+    """Quantidade de shards que o Discord recomenda para o bot."""
+    request = urllib.request.Request(GATEWAY_URL, headers={"Authorization": f"Bot {token}", "User-Agent": "RonaldinBot launcher"})
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return json.load(response)["shards"]
+
+def split_shards(shard_count: int, clusters: int) -> list:
+    """Divide os shards 0..shard_count-1 em `clusters` faixas seguidas, do tamanho mais parecido possível."""
+    size, extra = divmod(shard_count, clusters)
+    groups, start = [], 0
+    for cluster_id in range(clusters):
+        end = start + size + (1 if cluster_id < extra else 0)
+        groups.append(list(range(start, end)))
+        start = end
+    return groups
+
+class Cluster:
+    def __init__(self, cluster_id: int, cluster_count: int, shard_count: int, shard_ids: list):
+        self.cluster_id = cluster_id
+        self.env = {
+            **os.environ,
+            "SHARD_COUNT": str(shard_count),
+            "SHARD_IDS": ",".join(map(str, shard_ids)),
+            "CLUSTER_ID": str(cluster_id),
+            "CLUSTER_COUNT": str(cluster_count),
+        }
+        self.shard_ids = shard_ids
+        self.process = None
+        self.started_at = 0
+        self.failures = 0
+        self.restart_at = None
+
+    def start(self):
+        print(f"[launcher] Abrindo o cluster {self.cluster_id} (shards {self.env['SHARD_IDS']}).")
+        self.process = subprocess.Popen([sys.executable, "main.py"], env=self.env)
+        self.started_at = time.monotonic()
+        self.restart_at = None
+
+    def check(self):
+        """Reabre o processo se ele caiu e a espera já passou."""
+        if self.restart_at is not None:
+            if time.monotonic() >= self.restart_at:
+                self.start()
+            return
+        code = self.process.poll()
+        if code is None:
+            return
+        self.failures = 1 if time.monotonic() - self.started_at >= STABLE_AFTER else self.failures + 1
+        delay = min(MAX_RESTART_DELAY, RESTART_DELAY * 2 ** (self.failures - 1))
+        print(f"[launcher] Cluster {self.cluster_id} saiu com código {code}; reabrindo em {delay}s.")
+        self.restart_at = time.monotonic() + delay
+
+    def signal(self, signum):
+        if self.process is not None and self.process.poll() is None:
+            self.process.send_signal(signum)
+
+    def wait(self, timeout: float):
+        if self.process is None: return
+        try:
+            self.process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            print(f"[launcher] Cluster {self.cluster_id} não fechou a tempo; encerrando à força.")
+            self.process.kill()
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clusters", type=int, default=int(os.getenv("CLUSTERS") or 0) or os.cpu_count() or 1)
+    parser.add_argument("--shards", type=int, default=int(os.getenv("SHARD_COUNT") or 0))
+    args = parser.parse_args()
+
+    token = os.getenv("DISCORD_TOKEN")
+    if not token:
+        sys.exit("ERRO CRÍTICO: DISCORD_TOKEN não encontrado no arquivo .env.")
+    shard_count = args.shards or recommended_shards(token)
+    clusters = max(1, min(args.clusters, shard_count))
+    print(f"[launcher] {shard_count} shard(s) em {clusters} cluster(s).")
+
+    processes = [Cluster(i, clusters, shard_count, ids) for i, ids in enumerate(split_shards(shard_count, clusters))]
+    stopping = []
+
+    def stop(signum, frame):
+        if not stopping:
+            print("[launcher] Encerrando os clusters...")
+        stopping.append(signum)
+        for cluster in processes:
+            cluster.signal(signum)
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    for cluster in processes:
+        cluster.start()
+        # O Discord limita quantos shards se identificam por vez; espaçar os processos evita filas no gateway
+        time.sleep(5)
+        if stopping: break
+
+    while not stopping:
+        for cluster in processes:
+            cluster.check()
+        time.sleep(1)
+
+    for cluster in processes:
+        cluster.wait(30)
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,60 @@
 # main.py
 import os
+import time
 import discord
 from discord.ext import commands
 from dotenv import load_dotenv
-from utils.database import Database
 
 # --- CONFIGURAÇÃO INICIAL ---
+# Antes dos imports de utils/cogs, que leem o ambiente ao serem importados
 load_dotenv()
+
+from utils import cluster
+from utils.database import AsyncDatabase
+from utils.http_client import CachedHTTPClient
+from utils.webhook_manager import setup_webhook_cache, invalidate_webhook
+from utils.metrics import metrics, METRICS_PORT
+
 intents = discord.Intents.default()
 intents.members = True
 intents.message_content = True
 
-class RonaldinBot(commands.Bot):
+# Com shards, cada processo do launcher.py abre só os shards que recebeu em SHARD_IDS
+BaseBot = commands.AutoShardedBot if cluster.SHARDED else commands.Bot
+
+class TimedCommandTree(discord.app_commands.CommandTree):
+    """Marca o início de cada slash command; o fim é registrado no on_app_command_completion ou no erro."""
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        interaction.extras["started"] = time.perf_counter()
+        return True
+
+def _observe_app_command(interaction: discord.Interaction, status: str):
+    started = interaction.extras.get("started")
+    if started is not None:
+        command = interaction.command.qualified_name if interaction.command else "?"
+        metrics.observe("command", time.perf_counter() - started, command=f"/{command}", status=status)
+
+class RonaldinBot(BaseBot):
     def __init__(self):
-        super().__init__(command_prefix="r!", intents=intents)
-        self.db = Database()
+        super().__init__(command_prefix="r!", intents=intents, tree_cls=TimedCommandTree, **(cluster.shard_kwargs() if cluster.SHARDED else {}))
+        self.db = AsyncDatabase()
+        # Sessão HTTP compartilhada pelos cogs, com cache das respostas da API de futebol
+        self.http_client = CachedHTTPClient(ttl=int(os.getenv("API_CACHE_TTL", "300")))
 
     async def setup_hook(self):
+        # Atraso do event loop e endpoint Prometheus; cada cluster numa porta (METRICS_PORT + CLUSTER_ID)
+        await metrics.start(METRICS_PORT + cluster.CLUSTER_ID if METRICS_PORT else 0)
+        await self.db.ensure_indexes()
+        await setup_webhook_cache(self)
+
+        # Rodadas interrompidas por um reinício: pagas se o resultado já saiu, senão reembolsadas (só as deste cluster)
+        try:
+            refunded = await self.db.refund_open_rounds()
+            if refunded:
+                print(f"{len(refunded)} rodada(s) interrompida(s) paga(s) ou reembolsada(s).")
+        except Exception as e:
+            print(f"Erro ao reembolsar rodadas interrompidas: {e}")
+
         print("Carregando módulos (Cogs)...")
         cogs_folder = "./cogs"
         for filename in os.listdir(cogs_folder):
@@ -29,8 +67,11 @@ class RonaldinBot(commands.Bot):
         
         # <<<< CORREÇÃO AQUI >>>>
         # Lógica para limpar comandos antigos e evitar duplicação.
+        # Os slash commands são do bot todo, então só o cluster principal sincroniza.
         guild_id = os.getenv("GUILD_ID")
-        if guild_id:
+        if not cluster.IS_PRIMARY:
+            print("Slash commands sincronizados pelo cluster principal.")
+        elif guild_id:
             guild = discord.Object(id=int(guild_id))
             self.tree.clear_commands(guild=guild) # Limpa comandos antigos
             self.tree.copy_global_to(guild=guild)
@@ -39,13 +80,37 @@ class RonaldinBot(commands.Bot):
         else:
             print("AVISO: GUILD_ID não definido no .env. Slash commands podem demorar para aparecer.")
 
+    async def close(self):
+        await super().close()
+        await self.http_client.close()
+        await metrics.stop()
+        await self.db.close()
+
+    async def on_webhooks_update(self, channel):
+        # Algum webhook do canal mudou; o próximo envio confere de novo qual usar
+        invalidate_webhook(channel.id)
+
+    async def on_app_command_completion(self, interaction: discord.Interaction, command):
+        _observe_app_command(interaction, "ok")
+
     async def on_ready(self):
         print('------')
-        print(f'Bot Online: {self.user.name}')
+        print(f'Bot Online: {self.user.name} ({cluster.describe()})')
         print('------')
 
 bot = RonaldinBot()
 
+# --- TEMPO DOS COMANDOS DE PREFIXO ---
+@bot.before_invoke
+async def start_command_timer(ctx: commands.Context):
+    ctx.started = time.perf_counter()
+
+@bot.after_invoke
+async def stop_command_timer(ctx: commands.Context):
+    # Roda mesmo se o comando falhar; ctx.command_failed diz como terminou
+    status = "error" if ctx.command_failed else "ok"
+    metrics.observe("command", time.perf_counter() - ctx.started, command=f"r!{ctx.command.qualified_name}", status=status)
+
 # --- TRATAMENTO DE ERRO GLOBAL ---
 @bot.event
 async def on_command_error(ctx: commands.Context, error: commands.CommandError):
@@ -59,6 +124,7 @@ async def on_command_error(ctx: commands.Context, error: commands.CommandError):
 
 @bot.tree.error
 async def on_app_command_error(interaction: discord.Interaction, error: discord.app_commands.AppCommandError):
+    _observe_app_command(interaction, "error")
     # Trata o erro de permissão de forma mais amigável
     if isinstance(error, discord.app_commands.MissingRole):
         await interaction.response.send_message(f"Você não tem o cargo necessário para usar este comando.", ephemeral=True)
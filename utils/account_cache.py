@@ -0,0 +1,161 @@
+# utils/account_cache.py
+import os
+import time
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from utils.cluster import MULTI_PROCESS
+
+CACHE_MAX_SIZE = int(os.getenv("DB_CACHE_SIZE", "5000"))
+# Com vários processos, outro cluster pode mudar a conta a qualquer momento: o TTL padrão é bem menor.
+CACHE_TTL = float(os.getenv("DB_CACHE_TTL", "2" if MULTI_PROCESS else "30"))
+
+def apply_inc(account: dict, inc: dict) -> dict:
+    """Devolve uma cópia da conta com os deltas de `inc` (em notação de ponto) aplicados."""
+    account = dict(account)
+    for path, delta in inc.items():
+        parent, _, key = path.rpartition(".")
+        if parent:
+            sub = account[parent] = dict(account.get(parent) or {})
+        else:
+            sub = account
+        sub[key] = (sub.get(key) or 0) + delta
+    return account
+
+class AccountCache:
+    """LRU com TTL das contas da economia, com fila opcional de escrita atrasada (write-behind).
+
+    Contas com deltas ainda não gravados ficam "presas" no cache: não expiram nem são
+    removidas até o flush terminar, então uma leitura que não acha a conta no cache
+    sempre pode confiar no que está no banco.
+    """
+    def __init__(self, max_size: int = CACHE_MAX_SIZE, ttl: float = CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # {user_id: (expira_em, conta)}
+        self._pending = {}             # {user_id: {caminho: delta}} ainda não enviados
+        self._inflight = {}            # {user_id: {caminho: delta}} sendo gravados agora
+        self._held = {}                # {user_id: [lock, usuários]} contas em débito agora
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def _pinned(self, user_id: int) -> bool:
+        return user_id in self._pending or user_id in self._inflight
+
+    def get(self, user_id: int):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or (entry[0] < time.monotonic() and not self._pinned(user_id)):
+                if entry is not None:
+                    del self._entries[user_id]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[1]
+
+    def version(self) -> int:
+        """Marca usada por `put` para não guardar uma leitura que ficou velha no meio do caminho."""
+        return self._version
+
+    def put(self, user_id: int, account: dict, version: int = None):
+        with self._lock:
+            self._store(user_id, account, version)
+
+    def _store(self, user_id: int, account: dict, version: int = None):
+        if account is None or (version is not None and version != self._version):
+            return
+        self._entries[user_id] = (time.monotonic() + self.ttl, account)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_size:
+            # Remove a conta menos usada que não tenha deltas pendentes
+            victim = next((uid for uid in self._entries if not self._pinned(uid)), None)
+            if victim is None: break
+            del self._entries[victim]
+
+    def refresh(self, user_id: int, account: dict, version: int) -> dict:
+        """Guarda a conta lida do banco somando os deltas que entraram na fila depois da leitura.
+
+        Devolve a conta como ficou no cache (ou só a lida, se `version` estiver velha).
+        """
+        with self._lock:
+            pending = self._pending.get(user_id)
+            if pending:
+                account = apply_inc(account, pending)
+            self._store(user_id, account, version)
+        return account
+
+    @contextmanager
+    def holding(self, user_id: int):
+        """Uma operação por vez na conta; o flush geral não leva os deltas dela enquanto isso."""
+        with self._lock:
+            held = self._held.setdefault(user_id, [threading.Lock(), 0])
+            held[1] += 1
+        try:
+            with held[0]:
+                yield
+        finally:
+            with self._lock:
+                held[1] -= 1
+                if not held[1]:
+                    del self._held[user_id]
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            self._version += 1
+            if not self._pinned(user_id):
+                self._entries.pop(user_id, None)
+
+    def invalidate_many(self, user_ids):
+        with self._lock:
+            self._version += 1
+            for user_id in user_ids:
+                if not self._pinned(user_id):
+                    self._entries.pop(user_id, None)
+
+    # --- Write-behind ---
+    def add_delta(self, user_id: int, inc: dict) -> bool:
+        """Acumula o $inc na fila se a conta estiver no cache. Retorna False se precisar ir direto ao banco."""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return False
+            self._entries[user_id] = (entry[0], apply_inc(entry[1], inc))
+            pending = self._pending.setdefault(user_id, {})
+            for path, delta in inc.items():
+                pending[path] = pending.get(path, 0) + delta
+            return True
+
+    def take_pending(self, user_ids=None) -> dict:
+        """Move os deltas pendentes (de todos ou só de `user_ids`) para a lista em gravação.
+
+        Sem `user_ids`, pula as contas em `holding`: quem segura a conta faz o próprio flush.
+        """
+        with self._lock:
+            if user_ids is None:
+                ids = [uid for uid in self._pending if uid not in self._held]
+            else:
+                ids = [uid for uid in user_ids if uid in self._pending]
+            taken = {uid: self._pending.pop(uid) for uid in ids}
+            self._inflight.update(taken)
+            return taken
+
+    def finish(self, taken: dict, ok: bool = True):
+        """Libera os deltas gravados; se a gravação falhou, devolve-os para a fila."""
+        with self._lock:
+            for user_id, inc in taken.items():
+                self._inflight.pop(user_id, None)
+                if not ok:
+                    pending = self._pending.setdefault(user_id, {})
+                    for path, delta in inc.items():
+                        pending[path] = pending.get(path, 0) + delta
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits, "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "size": len(self._entries), "pending": len(self._pending),
+        }
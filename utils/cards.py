@@ -0,0 +1,107 @@
+# utils/cards.py
+import os
+from utils.rng import SeededRNG
+
+# Uma carta é um int de 0 a 51: naipe = carta // 13, valor = carta % 13.
+# Tudo que é mostrado ou somado vem de tabelas montadas uma vez aqui, sem objetos por carta.
+SUITS = ('♥', '♦', '♣', '♠')  # Copas, Ouros, Paus, Espadas
+RANKS = ('2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A')
+DECK_SIZE = len(SUITS) * len(RANKS)
+
+LABELS = tuple(f"`{rank}{suit}`" for suit in SUITS for rank in RANKS)
+VALUES = tuple(min(10, i + 2) if rank != 'A' else 11 for _ in SUITS for i, rank in enumerate(RANKS))
+IS_ACE = tuple(rank == 'A' for _ in SUITS for rank in RANKS)
+
+# Sapato da mesa ao vivo: quantos baralhos e até onde vai a carta de corte (0.75 = 3/4 do sapato).
+TABLE_DECKS = int(os.getenv("BLACKJACK_DECKS", "6"))
+PENETRATION = float(os.getenv("BLACKJACK_PENETRATION", "0.75"))
+# Baralhos do sapato compartilhado pelas partidas solo.
+SOLO_SHOE_DECKS = 6
+
+class Shoe:
+    """Sapato de `decks` baralhos num bytearray, embaralhado no lugar e distribuído por um índice.
+
+    Cada embaralhamento tem um `SeededRNG` novo e parte da ordem de fábrica, então a ordem do
+    sapato sai só da semente: `commitment` vale para o sapato atual e `last_seed` é a semente
+    revelada do anterior. A carta de corte fica em `penetration` do sapato; ao passar por ela,
+    o próximo `shuffle` (antes de uma rodada) recolhe tudo. `deal` nunca falha: se as cartas
+    acabarem no meio de uma mão, embaralha ali mesmo. Com `seeder`, as sementes saem dele
+    (`SeededRNG.spawn`) em vez do `secrets`, e a sequência de sapatos é reprodutível.
+    """
+    __slots__ = ("cards", "pos", "cut", "rng", "seeder", "last_seed", "_fresh")
+
+    def __init__(self, decks: int = 1, penetration: float = PENETRATION, seeder: SeededRNG = None):
+        self._fresh = bytes(range(DECK_SIZE)) * decks
+        self.cards = bytearray(self._fresh)
+        self.cut = max(1, int(len(self.cards) * penetration))
+        self.rng = None
+        self.seeder = seeder
+        self.last_seed = None
+        self._reshuffle()
+
+    @property
+    def decks(self) -> int:
+        return len(self.cards) // DECK_SIZE
+
+    @property
+    def remaining(self) -> int:
+        return len(self.cards) - self.pos
+
+    @property
+    def commitment(self) -> str:
+        return self.rng.commitment
+
+    def _reshuffle(self):
+        if self.rng is not None:
+            self.last_seed = self.rng.reveal()
+        self.rng = self.seeder.spawn() if self.seeder is not None else SeededRNG()
+        self.cards[:] = self._fresh
+        self.rng.shuffle(self.cards)
+        self.pos = 0
+
+    def shuffle(self) -> bool:
+        """Antes de uma rodada: embaralha se a carta de corte já saiu. Retorna se embaralhou."""
+        if self.pos < self.cut:
+            return False
+        self._reshuffle()
+        return True
+
+    def deal(self) -> int:
+        if self.pos >= len(self.cards):
+            self._reshuffle()
+        card = self.cards[self.pos]
+        self.pos += 1
+        return card
+
+def replay_shoe(seed_hex: str, decks: int) -> bytearray:
+    """Ordem de um sapato a partir da semente revelada, para conferir as cartas que saíram."""
+    cards = bytearray(range(DECK_SIZE)) * decks
+    SeededRNG(bytes.fromhex(seed_hex)).shuffle(cards)
+    return cards
+
+class Hand:
+    """Mão de blackjack: valor e texto são atualizados a cada carta, sem refazer a mão inteira."""
+    __slots__ = ("cards", "value", "aces", "text")
+
+    def __init__(self):
+        self.cards = []
+        self.value = 0
+        self.aces = 0   # ases ainda contando 11
+        self.text = ""  # "`A♠`, `10♥`", pronto para o embed
+
+    def add_card(self, card: int):
+        self.cards.append(card)
+        self.value += VALUES[card]
+        if IS_ACE[card]:
+            self.aces += 1
+        while self.value > 21 and self.aces:
+            self.value -= 10
+            self.aces -= 1
+        self.text = LABELS[card] if not self.text else f"{self.text}, {LABELS[card]}"
+
+    def __str__(self):
+        return self.text
+
+# As partidas solo tiram cartas daqui em vez de criar um baralho cada uma. Com vários
+# baralhos e várias partidas ao mesmo tempo, ninguém consegue acompanhar o que já saiu.
+shared_shoe = Shoe(SOLO_SHOE_DECKS)
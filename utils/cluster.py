@@ -0,0 +1,31 @@
+# utils/cluster.py
+import os
+
+# Configuração de shards/clusters, preenchida pelo launcher.py (ou à mão no .env).
+#   SHARD_COUNT   total de shards do bot inteiro (vazio = sem sharding, ou automático com SHARDED=1)
+#   SHARD_IDS     shards deste processo, separados por vírgula (vazio = todos)
+#   CLUSTER_ID    índice deste processo (0 = principal)
+#   CLUSTER_COUNT quantos processos estão rodando o bot
+SHARD_COUNT = int(os.getenv("SHARD_COUNT") or 0) or None
+SHARD_IDS = [int(shard_id) for shard_id in os.getenv("SHARD_IDS", "").split(",") if shard_id.strip()] or None
+CLUSTER_ID = int(os.getenv("CLUSTER_ID", "0"))
+CLUSTER_COUNT = int(os.getenv("CLUSTER_COUNT", "1"))
+
+# AutoShardedBot quando há shards definidos ou SHARDED=1 (o Discord recomenda a quantidade).
+SHARDED = SHARD_COUNT is not None or os.getenv("SHARDED", "0") == "1"
+# Só o cluster principal roda o que é global: agenda dos bolões e sincronização dos slash commands.
+IS_PRIMARY = CLUSTER_ID == 0
+# Com mais de um processo, caches em memória de um não enxergam as mudanças feitas pelos outros.
+MULTI_PROCESS = CLUSTER_COUNT > 1
+
+def shard_kwargs() -> dict:
+    """Argumentos de shard para o AutoShardedBot deste processo."""
+    kwargs = {}
+    if SHARD_COUNT is not None: kwargs["shard_count"] = SHARD_COUNT
+    if SHARD_IDS is not None: kwargs["shard_ids"] = SHARD_IDS
+    return kwargs
+
+def describe() -> str:
+    if not SHARDED: return "processo único, sem shards"
+    shards = ",".join(map(str, SHARD_IDS)) if SHARD_IDS else "todos"
+    return f"cluster {CLUSTER_ID + 1}/{CLUSTER_COUNT}, shards {shards} de {SHARD_COUNT or 'auto'}"
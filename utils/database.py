@@ -1,104 +1,357 @@
 # utils/database.py
-import pymongo
 import os
-from datetime import datetime
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+from datetime import datetime, timedelta
+from utils.account_cache import AccountCache
+from utils.leaderboard import Leaderboard
+from utils.ledger import Ledger
+from utils.storage import BET_TEAMS, STARTING_BALANCE, Storage, open_storage
+from utils.cluster import CLUSTER_ID
+from utils.metrics import metrics
 
-STARTING_BALANCE = 500
+# Número máximo de chamadas ao banco rodando ao mesmo tempo fora do event loop.
+DB_MAX_WORKERS = int(os.getenv("DB_MAX_WORKERS", "8"))
+# Intervalo (ms) do write-behind dos $inc de saldo/estatísticas. 0 desativa.
+DB_WRITE_BEHIND_MS = int(os.getenv("DB_WRITE_BEHIND_MS", "0"))
 
 class Database:
-    def __init__(self):
-        try:
-            self.client = pymongo.MongoClient(os.getenv("MONGO_URI"))
-            self.db = self.client.get_database("RonaldinBotDB")
-            print("Conectado ao MongoDB com sucesso!")
-        except Exception as e:
-            print(f"Ocorreu um erro ao conectar ao MongoDB: {e}")
-            self.db = None
+    """Economia, bolões e afins sobre um backend de armazenamento (veja utils/storage.py).
+
+    O backend vem de `open_storage()` (DB_BACKEND); se ele não abrir, a exceção sobe e o
+    bot não inicia, em vez de seguir com todos os métodos sem fazer nada.
+    """
+    def __init__(self, storage: Storage = None):
+        self.storage = storage or open_storage()
+
+        self.cache = AccountCache()
+        self.leaderboard = Leaderboard(STARTING_BALANCE)
+        self.ledger = Ledger(self.storage.insert_ledger, on_snapshot=self.snapshot_balances)
+        self.ledger.start()
+        self.write_behind_ms = DB_WRITE_BEHIND_MS
+        self._flush_lock = threading.Lock()
+        self._closing = threading.Event()
+        if self.write_behind_ms > 0:
+            threading.Thread(target=self._write_behind_loop, name="ronaldin-db-flush", daemon=True).start()
+
+    def close(self):
+        """Para o write-behind e grava o que ainda estiver na fila."""
+        self._closing.set()
+        self.flush()
+        self.ledger.close()
+        self.storage.close()
+
+    def ensure_indexes(self):
+        """Cria os índices e roda as migrações. Chamado uma vez na inicialização.
+
+        Cada índice que falha é só avisado pelo backend; uma migração que falha levanta a
+        exceção e o bot não sobe sobre dados no formato antigo.
+        """
+        self.storage.ensure_indexes()
 
     # --- Métodos de Economia ---
     def _get_or_create_user(self, user_id: int):
-        if self.db is None: return None
-        
-        user_account = self.db.economy.find_one({"user_id": user_id})
-        if user_account is None:
-            new_account = {
-                "user_id": user_id,
-                "balance": STARTING_BALANCE,
-                "stats": {
-                    "bets_made": 0, "bets_won": 0, "total_wagered": 0, "total_won": 0
-                },
-                "cooldowns": {
-                    "daily": None, "weekly": None, "monthly": None
-                }
-            }
-            self.db.economy.insert_one(new_account)
-            return new_account
-        return user_account
+        account = self.cache.get(user_id)
+        if account is not None:
+            return account
+        version = self.cache.version()
+        account = self.storage.get_or_create_account(user_id)
+        self.cache.put(user_id, account, version)
+        self.leaderboard.set(user_id, account["balance"])
+        return account
+
+    def _queue_inc(self, user_id: int, inc: dict):
+        """Coloca o $inc na fila do write-behind ou, se não der, grava direto."""
+        if not (self.write_behind_ms > 0 and self.cache.add_delta(user_id, inc)):
+            self.storage.update_account(user_id, inc=inc)
+            self.cache.invalidate(user_id)
+        # Só depois de gravar (ou enfileirar): se o banco falhar, o ranking não fica com um saldo que não existe.
+        self.leaderboard.add(user_id, inc.get("balance", 0))
+
+    # --- Write-behind ---
+    def _write_behind_loop(self):
+        while not self._closing.wait(self.write_behind_ms / 1000):
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Erro ao gravar a fila de saldos no banco: {e}")
+
+    def flush(self, user_ids=None):
+        """Grava de uma vez os deltas acumulados (de todos ou só de `user_ids`)."""
+        with self._flush_lock:
+            taken = self.cache.take_pending(user_ids)
+            if not taken: return
+            try:
+                self.storage.apply_incs(taken)
+            except Exception:
+                self.cache.finish(taken, ok=False)
+                raise
+            self.cache.finish(taken)
+
+    def cache_stats(self) -> dict:
+        return self.cache.stats()
 
     def get_user_data(self, user_id: int) -> dict:
-        return self._get_or_create_user(user_id) or {}
+        return self._get_or_create_user(user_id)
 
     def get_balance(self, user_id: int) -> int:
-        account = self._get_or_create_user(user_id)
-        return account.get("balance", 0) if account else 0
+        return self._get_or_create_user(user_id).get("balance", 0)
 
-    def update_balance(self, user_id: int, amount: int):
-        if self.db is None: return
-        self._get_or_create_user(user_id)
-        self.db.economy.update_one({"user_id": user_id}, {"$inc": {"balance": amount}})
+    def update_balance(self, user_id: int, amount: int, reason: str = None, game: str = None, ref=None):
+        self._queue_inc(user_id, {"balance": amount})
+        self.ledger.append(user_id, delta=amount, reason=reason, game=game, ref=ref)
+
+    def try_debit(self, user_id: int, amount: int, credit: int = 0, reason: str = "aposta", game: str = None, ref=None) -> tuple:
+        """Debita `amount` somente se o saldo cobrir, em uma única operação atômica.
+
+        `credit` é somado na mesma operação (ex.: o prêmio de uma aposta já decidida).
+        Retorna (True, novo_saldo) ou (False, saldo_atual) se o saldo for insuficiente.
+        """
+        # Com a conta presa, só o write-behind mexe nela até o fim; o que ele acumular depois
+        # do flush não está na leitura do banco e é somado de volta por `refresh`.
+        with self.cache.holding(user_id):
+            self.flush([user_id])
+            for _ in range(2):
+                version = self.cache.version()
+                account = self.storage.try_debit(user_id, amount, credit)
+                if account is not None:
+                    self.cache.invalidate(user_id)
+                    account = self.cache.refresh(user_id, account, version + 1)
+                    self.leaderboard.set(user_id, account["balance"])
+                    self.ledger.append(user_id, delta=credit - amount, reason=reason, game=game, ref=ref)
+                    return True, account["balance"]
+                # Só falha de verdade se a conta existir; contas novas são criadas e tentamos de novo.
+                account = self._get_or_create_user(user_id)
+                if account["balance"] < amount:
+                    return False, account["balance"]
+            return False, account["balance"]
 
     # <<<< NOVO MÉTODO AQUI >>>>
-    def set_balance(self, user_id: int, amount: int):
+    def set_balance(self, user_id: int, amount: int, reason: str = "admin", ref=None):
         """Define o saldo de um usuário para um valor exato."""
-        if self.db is None: return
-        self._get_or_create_user(user_id)
-        self.db.economy.update_one({"user_id": user_id}, {"$set": {"balance": amount}})
+        self.flush([user_id])
+        self.storage.update_account(user_id, set_={"balance": amount})
+        self.cache.invalidate(user_id)
+        self.leaderboard.set(user_id, amount)
+        self.ledger.append(user_id, balance=amount, reason=reason, ref=ref)
 
     def update_user_stats(self, user_id: int, bets_made_inc: int = 0, bets_won_inc: int = 0, wagered_inc: int = 0, won_inc: int = 0):
-        if self.db is None: return
-        self._get_or_create_user(user_id)
-        update_doc = {"$inc": {
+        self._queue_inc(user_id, {
             "stats.bets_made": bets_made_inc, "stats.bets_won": bets_won_inc,
             "stats.total_wagered": wagered_inc, "stats.total_won": won_inc
-        }}
-        self.db.economy.update_one({"user_id": user_id}, update_doc)
+        })
+
+    def claim_cooldown(self, user_id: int, cooldown_type: str, period: timedelta) -> tuple:
+        """Marca o cooldown como usado agora, se já passou `period` desde o último, numa operação atômica.
+
+        Retorna (True, None) ou (False, horário_do_último_uso). Seguro contra cliques duplos e
+        contra dois processos do bot (clusters) atendendo o mesmo usuário.
+        """
+        self.flush([user_id])
+        result = self.storage.claim_cooldown(user_id, cooldown_type, datetime.utcnow(), period)
+        self.cache.invalidate(user_id)
+        return result
 
     def update_cooldown(self, user_id: int, cooldown_type: str):
-        if self.db is None: return
-        self._get_or_create_user(user_id)
-        self.db.economy.update_one(
-            {"user_id": user_id},
-            {"$set": {f"cooldowns.{cooldown_type}": datetime.utcnow()}}
-        )
-
-    def get_top_users(self, guild_members: list, limit: int = 10):
-        if self.db is None: return []
-        member_ids = [m.id for m in guild_members]
-        top_users = self.db.economy.find(
-            {"user_id": {"$in": member_ids}}
-        ).sort("balance", pymongo.DESCENDING).limit(limit)
-        return list(top_users)
+        self.flush([user_id])
+        self.storage.update_account(user_id, set_={f"cooldowns.{cooldown_type}": datetime.utcnow()})
+        self.cache.invalidate(user_id)
+
+    def settle_payouts(self, payouts: list, close_bet: int = None, close_round: str = None, reason: str = "premio", game: str = None, ref=None):
+        """Paga vários usuários de uma vez, numa única transação do backend.
+
+        `payouts` é uma lista de (user_id, delta_de_saldo, delta_de_stats), onde delta_de_stats
+        é um dict como {"bets_won": 1, "total_won": 200} ou None. Se `close_bet` for passado,
+        o bolão com esse message_id é encerrado na mesma transação; `close_round` faz o mesmo
+        com a rodada do diário de jogos (veja `save_round`). `reason`, `game` e `ref` vão para
+        o histórico de transações de cada pagamento.
+        """
+        incs = {}
+        for user_id, balance_delta, stats_delta in payouts:
+            inc = incs.get(user_id)
+            if inc is None:
+                inc = incs[user_id] = {"balance": 0}
+            inc["balance"] += balance_delta
+            if stats_delta:
+                for key, value in stats_delta.items():
+                    path = "stats." + key
+                    inc[path] = inc.get(path, 0) + value
+        self.flush(list(incs))
+        self.storage.settle(incs, close_bet=close_bet, close_round=close_round)
+        self.cache.invalidate_many(incs)
+        deltas = [(user_id, inc["balance"]) for user_id, inc in incs.items() if inc["balance"]]
+        self.leaderboard.add_many(deltas)
+        ref = ref if ref is not None else close_round or close_bet
+        for user_id, delta in deltas:
+            self.ledger.append(user_id, delta=delta, reason=reason, game=game, ref=ref)
+
+    def load_leaderboard(self):
+        """(Re)carrega o ranking em memória com o saldo de todas as contas."""
+        self.leaderboard.load(self.storage.balances())
+
+    # --- Histórico de transações ---
+    def snapshot_balances(self):
+        """Grava uma foto do saldo de quem teve movimentação desde a última foto (ou de todos, na primeira)."""
+        self.flush()
+        self.ledger.flush()
+        last_at = self.storage.last_snapshot_at()
+        user_ids = None if last_at is None else self.storage.ledger_users_since(last_at)
+        balances = list(self.storage.balances(user_ids))
+        # O horário vem depois da leitura: um lançamento gravado antes dele já está no saldo
+        # lido, e `get_balance_at` só soma à foto os lançamentos posteriores.
+        now = datetime.utcnow()
+        snapshots = [{"user_id": user_id, "balance": balance, "at": now} for user_id, balance in balances]
+        if snapshots:
+            self.storage.insert_snapshots(snapshots)
+
+    def get_balance_at(self, user_id: int, when: datetime) -> int:
+        """Reconstrói o saldo num instante: a última foto antes dele mais os lançamentos seguintes."""
+        self.ledger.flush()
+        snapshot = self.storage.snapshot_before(user_id, when)
+        balance = snapshot["balance"] if snapshot else STARTING_BALANCE
+        for entry in self.storage.ledger_entries(user_id, snapshot["at"] if snapshot else None, when):
+            balance = entry["balance"] if "balance" in entry else balance + entry.get("delta", 0)
+        return balance
+
+    # --- Diário de rodadas (blackjack em mesa, Bac Bo) ---
+    def save_round(self, round_id: str, game: str, channel_id: int, state: str, bets: dict, credits: dict = None):
+        """Grava o estado de uma rodada em andamento com as apostas já debitadas ({user_id: valor}).
+
+        Quando o resultado já saiu mas ainda não foi pago, `credits` ({user_id: quanto volta})
+        vai junto em cada aposta. A rodada sai do diário quando é paga (`settle_payouts(...,
+        close_round=...)`); o que sobrar depois de um reinício é resolvido por `refund_open_rounds`.
+        """
+        entries = []
+        for user_id, amount in bets.items():
+            if amount <= 0: continue
+            entry = {"user_id": user_id, "amount": amount}
+            if credits is not None:
+                entry["credit"] = credits.get(user_id, 0)
+            entries.append(entry)
+        self.storage.save_round(round_id, game, channel_id, state, entries, datetime.utcnow(), CLUSTER_ID)
+
+    def refund_round(self, round_id: str, bets: dict, game: str = None):
+        """Devolve as apostas de uma rodada que não vai terminar e a remove do diário."""
+        self.settle_payouts([(user_id, amount, None) for user_id, amount in bets.items() if amount > 0], close_round=round_id, reason="reembolso", game=game)
+
+    def refund_open_rounds(self) -> list:
+        """Resolve as rodadas que ficaram abertas (ex.: o bot caiu no meio delas).
+
+        Rodada com resultado gravado (`credits` no `save_round`) é paga como teria sido; as
+        outras ainda não tinham resultado e têm as apostas devolvidas. Só as deste cluster:
+        as dos outros processos ainda estão em andamento.
+        """
+        rounds = self.storage.get_rounds(CLUSTER_ID)
+        for round_doc in rounds:
+            entries = round_doc.get("bets", [])
+            if entries and all("credit" in b for b in entries):
+                payouts = [(b["user_id"], b["credit"], None) for b in entries if b["credit"] > 0]
+                self.settle_payouts(payouts, close_round=round_doc["round_id"], game=round_doc.get("game"))
+            else:
+                self.refund_round(round_doc["round_id"], {b["user_id"]: b["amount"] for b in entries}, game=round_doc.get("game"))
+        return rounds
 
     # --- Métodos para Bolões ---
     def create_bet(self, bet_data: dict):
-        if self.db is None: return None
-        return self.db.bets.insert_one(bet_data)
+        bet_data = {**bet_data, "totals": {team: 0 for team in BET_TEAMS}, "counts": {team: 0 for team in BET_TEAMS}}
+        return self.storage.create_bet(bet_data)
 
     def get_bet(self, message_id: int):
-        if self.db is None: return None
-        return self.db.bets.find_one({"message_id": message_id})
-
-    def add_participant_bet(self, message_id: int, user_id: int, team_choice: str, amount: int):
-        if self.db is None: return None
-        self.db.bets.update_one(
-            {"message_id": message_id},
-            {"$pull": {"participants": {"user_id": user_id}}}
-        )
-        self.db.bets.update_one(
-            {"message_id": message_id},
-            {"$push": {"participants": {"user_id": user_id, "bet_on": team_choice, "amount": amount}}}
-        )
+        return self.storage.get_bet(message_id)
 
     def close_bet(self, message_id: int):
-        if self.db is None: return None
-        return self.db.bets.update_one({"message_id": message_id}, {"$set": {"status": "closed"}})
+        return self.storage.close_bet(message_id)
+
+    def set_bet_status(self, message_id: int, status: str, only_if: str = None) -> bool:
+        return self.storage.set_bet_status(message_id, status, only_if)
+
+    def place_bet_entry(self, message_id: int, user_id: int, team: str, amount: int):
+        """Registra a aposta do usuário no lado `team` ("team_home"/"team_away"), trocando a anterior.
+
+        Retorna a aposta anterior ({user_id, team, amount}) ou None, ou BET_CLOSED se o bolão
+        já não estava aberto (aí nada foi gravado).
+        """
+        return self.storage.place_bet_entry(message_id, user_id, team, amount)
+
+    def remove_bet_entry(self, message_id: int, user_id: int):
+        """Remove a aposta do usuário; retorna a aposta removida, None se não havia (ex.: clique duplo) ou BET_CLOSED."""
+        return self.storage.remove_bet_entry(message_id, user_id)
+
+    def get_bet_entry(self, message_id: int, user_id: int):
+        return self.storage.get_bet_entry(message_id, user_id)
+
+    def get_bet_entries(self, message_id: int, team: str = None, limit: int = None) -> list:
+        return self.storage.get_bet_entries(message_id, team, limit)
+
+
+    # --- Agenda ---
+    def get_jobs(self) -> list:
+        return self.storage.get_jobs()
+
+    def save_job(self, job_id: str, run_at: datetime, kind: str, data: dict = None):
+        self.storage.save_job(job_id, run_at, kind, data or {})
+
+    def delete_job(self, job_id: str):
+        self.storage.delete_job(job_id)
+
+
+    # --- Shards ---
+    def save_shard_status(self, statuses: list):
+        self.storage.save_shard_status(statuses)
+
+    def get_shard_status(self) -> list:
+        return self.storage.get_shard_status()
+
+
+    # --- Métodos para Webhooks ---
+    def get_webhooks(self) -> list:
+        return self.storage.get_webhooks()
+
+    def save_webhook(self, channel_id: int, webhook_id: int, token: str):
+        self.storage.save_webhook(channel_id, webhook_id, token)
+
+    def delete_webhook(self, channel_id: int):
+        self.storage.delete_webhook(channel_id)
+
+
+class AsyncDatabase:
+    """Versão assíncrona do Database.
+
+    Cada método público do Database vira uma corrotina que roda num pool de threads
+    limitado, então uma resposta lenta do banco não trava o event loop do discord.py.
+    Cada chamada tem o tempo registrado em `metrics` (família db, por método).
+    A API síncrona continua disponível em `self.sync`.
+    """
+    def __init__(self, database: Database = None, max_workers: int = DB_MAX_WORKERS):
+        self.sync = database or Database()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ronaldin-db")
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        attr = getattr(self.sync, name)
+        if not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        async def runner(*args, **kwargs):
+            loop = asyncio.get_running_loop()
+            started = time.perf_counter()
+            try:
+                return await loop.run_in_executor(self._executor, functools.partial(attr, *args, **kwargs))
+            finally:
+                metrics.observe("db", time.perf_counter() - started, method=name)
+
+        # Guarda a corrotina para não recriá-la a cada chamada.
+        setattr(self, name, runner)
+        return runner
+
+    async def close(self):
+        """Espera as chamadas em andamento e fecha o Database, tudo fora do event loop."""
+        loop = asyncio.get_running_loop()
+        # Primeiro o pool: nada mais entra e o que já estava rodando termina antes do close
+        await loop.run_in_executor(None, functools.partial(self._executor.shutdown, wait=True))
+        await loop.run_in_executor(None, self.sync.close)
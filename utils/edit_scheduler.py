@@ -0,0 +1,63 @@
+# utils/edit_scheduler.py
+import time
+from collections import deque
+
+# Orçamento padrão de edições por canal: o Discord libera cerca de 5 edições a cada 5 segundos.
+EDIT_RATE = 5
+EDIT_PER = 5.0
+
+class EditScheduler:
+    """Agenda as edições de uma mensagem sem estourar o rate limit do canal.
+
+    Edições que não mudam nada em relação à última enviada são descartadas, e quando o
+    orçamento do canal acaba a edição fica pendente: só o estado mais recente é enviado
+    no próximo `flush`, em vez de uma fila de edições atrasadas.
+    """
+    _buckets = {}  # {channel_id: deque com os horários das últimas edições}, compartilhado entre mensagens
+
+    def __init__(self, message, rate: int = EDIT_RATE, per: float = EDIT_PER):
+        self.message = message
+        self.rate = rate
+        self.per = per
+        self._last_sent = None
+        self._pending = None  # (assinatura, kwargs)
+
+    @staticmethod
+    def _signature(kwargs: dict):
+        embed = kwargs.get("embed")
+        view = kwargs.get("view")
+        view_state = tuple((getattr(item, "custom_id", None), getattr(item, "label", None), getattr(item, "disabled", None)) for item in view.children) if view else None
+        return (kwargs.get("content"), embed.to_dict() if embed else None, view_state)
+
+    def _take_budget(self) -> bool:
+        bucket = self._buckets.setdefault(self.message.channel.id, deque())
+        now = time.monotonic()
+        while bucket and now - bucket[0] >= self.per:
+            bucket.popleft()
+        if len(bucket) >= self.rate:
+            return False
+        bucket.append(now)
+        return True
+
+    async def submit(self, **kwargs) -> bool:
+        """Pede uma edição com os argumentos de `message.edit`. Retorna True se ela foi enviada agora."""
+        signature = self._signature(kwargs)
+        if signature == self._last_sent:
+            self._pending = None
+            return False
+        self._pending = (signature, kwargs)
+        return await self.flush()
+
+    async def flush(self) -> bool:
+        """Envia a edição pendente se o canal ainda tiver orçamento."""
+        if self._pending is None or not self._take_budget():
+            return False
+        signature, kwargs = self._pending
+        self._pending = None
+        await self.message.edit(**kwargs)
+        self._last_sent = signature
+        return True
+
+    @property
+    def has_pending(self) -> bool:
+        return self._pending is not None
@@ -0,0 +1,40 @@
+# utils/games.py
+# Regras e pagamentos dos jogos do cassino, sem nada de Discord: usados pelos cogs e pela
+# simulação em benchmarks/sim_games.py. Os pagamentos são o total devolvido (aposta incluída).
+BLACKJACK_PAYOUT = 2.5  # blackjack natural
+WIN_PAYOUT = 2          # vitória no blackjack, Jogador/Banca no Bac Bo, cara ou coroa
+BACBO_TIE_PAYOUT = 8    # empate no Bac Bo
+DEALER_STANDS_ON = 17
+
+BACBO_CHOICES = ('Jogador', 'Banca', 'Empate')
+COIN_SIDES = ('cara', 'coroa')
+
+def dealer_play(hand, shoe):
+    """O dealer compra até chegar a 17."""
+    while hand.value < DEALER_STANDS_ON:
+        hand.add_card(shoe.deal())
+
+def blackjack_credit(bet: int, player, dealer, natural: bool = False) -> int:
+    """Quanto volta para o jogador no fim da mão (0 se perdeu)."""
+    if natural:
+        return int(bet * BLACKJACK_PAYOUT)
+    if player.value > 21:
+        return 0
+    if dealer.value > 21 or player.value > dealer.value:
+        return bet * WIN_PAYOUT
+    if player.value == dealer.value:
+        return bet
+    return 0
+
+def bacbo_winner(player_total: int, banker_total: int) -> str:
+    if player_total > banker_total: return 'Jogador'
+    if banker_total > player_total: return 'Banca'
+    return 'Empate'
+
+def bacbo_credit(choice: str, winner: str, amount: int) -> int:
+    if choice != winner:
+        return 0
+    return amount * (BACBO_TIE_PAYOUT if winner == 'Empate' else WIN_PAYOUT)
+
+def coinflip_credit(choice: str, result: str, amount: int) -> int:
+    return amount * WIN_PAYOUT if choice == result else 0
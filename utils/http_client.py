@@ -0,0 +1,96 @@
+# utils/http_client.py
+import asyncio
+import hashlib
+import json
+import time
+import aiohttp
+from datetime import datetime
+
+# Depois de uma falha, espera este tempo (s) antes de tentar atualizar a cópia antiga de novo.
+RETRY_DELAY = 30
+
+class CacheEntry:
+    def __init__(self, data, duration: float = 0.0, digest: str = None):
+        self.data = data
+        self.digest = digest               # hash do corpo da resposta, para saber se o conteúdo mudou
+        self.duration = duration           # quanto a requisição levou (s)
+        self.updated_at = datetime.utcnow()
+        self.fetched_at = time.monotonic()
+        self.checked_at = self.fetched_at
+
+class CachedHTTPClient:
+    """Cliente HTTP assíncrono com uma sessão compartilhada (keep-alive) e cache TTL por URL.
+
+    Dentro do TTL a resposta sai da memória. Depois disso a cópia antiga ainda é servida
+    na hora enquanto uma atualização roda em segundo plano (stale-while-revalidate), e se
+    a API cair o último resultado bom continua sendo usado no lugar de um erro.
+    """
+    def __init__(self, ttl: float = 300, timeout: float = 15, max_connections: int = 20):
+        self.ttl = ttl
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.max_connections = max_connections
+        self._session: aiohttp.ClientSession = None
+        self._cache = {}       # {url: CacheEntry}
+        self._refreshing = {}  # {url: Task} para não repetir a mesma requisição em paralelo
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+        return self._session
+
+    async def _fetch(self, url: str, headers: dict = None):
+        started = time.perf_counter()
+        async with self._get_session().get(url, headers=headers) as response:
+            response.raise_for_status()
+            body = await response.read()
+        data = json.loads(body)
+        self._cache[url] = CacheEntry(data, time.perf_counter() - started, hashlib.sha1(body).hexdigest())
+        return data
+
+    def refresh(self, url: str, headers: dict = None) -> asyncio.Task:
+        """Busca a URL de novo; requisições simultâneas para a mesma URL compartilham a mesma Task."""
+        task = self._refreshing.get(url)
+        if task is None:
+            task = asyncio.create_task(self._fetch(url, headers))
+            task.add_done_callback(lambda t: self._on_refresh_done(url, t))
+            self._refreshing[url] = task
+        return task
+
+    def _on_refresh_done(self, url: str, task: asyncio.Task):
+        self._refreshing.pop(url, None)
+        if task.cancelled() or task.exception() is None: return
+        # Único lugar que registra a falha, seja de um get() ou do prefetcher
+        entry = self._cache.get(url)
+        if entry is None:
+            print(f"Falha ao buscar {url}: {task.exception()}")
+        else:
+            entry.checked_at = time.monotonic() - self.ttl + RETRY_DELAY
+            print(f"Falha ao atualizar {url}, mantendo a última resposta: {task.exception()}")
+
+    def peek(self, url: str) -> CacheEntry:
+        """Entrada em cache para a URL (pode estar vencida), sem fazer requisição."""
+        return self._cache.get(url)
+
+    async def get(self, url: str, headers: dict = None, ttl: float = None):
+        """Retorna (dados, erro) como o antigo requests.get, mas sem travar o event loop."""
+        ttl = self.ttl if ttl is None else ttl
+        entry = self._cache.get(url)
+        if entry is not None:
+            if time.monotonic() - entry.checked_at >= ttl:
+                self.refresh(url, headers)
+            return entry.data, None
+        try:
+            return await asyncio.shield(self.refresh(url, headers)), None
+        except asyncio.TimeoutError:
+            return None, "A API demorou muito para responder (timeout)."
+        except aiohttp.ClientResponseError as e:
+            return None, f"Ocorreu um erro ao contatar a API (Código: {e.status})."
+        except (aiohttp.ClientError, ValueError):
+            return None, "Ocorreu um erro de conexão com a API."
+
+    async def close(self):
+        for task in list(self._refreshing.values()):
+            task.cancel()
+        if self._session is not None:
+            await self._session.close()
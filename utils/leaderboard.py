@@ -0,0 +1,125 @@
+# utils/leaderboard.py
+import bisect
+import threading
+
+class Leaderboard:
+    """Ranking de saldos mantido em memória.
+
+    Carregado uma vez do banco e atualizado a cada mudança de saldo feita pelo bot,
+    então o /top não precisa mais consultar o MongoDB. Além do ranking global, cada
+    servidor pode ter o seu (`ensure_scope`), com só os membros dele e atualizado junto;
+    assim página e posição saem por fatia e bisect, sem percorrer o ranking global.
+    """
+    def __init__(self, starting_balance: int):
+        self.starting_balance = starting_balance
+        self.loaded = False
+        self._balances = {}  # {user_id: saldo}
+        self._ranking = []   # [(-saldo, user_id)] em ordem crescente = mais ricos primeiro
+        self._scopes = {}    # {scope: [(-saldo, user_id)]} só dos membros do escopo
+        self._members = {}   # {scope: {user_id}}
+        self._lock = threading.Lock()
+
+    def load(self, accounts):
+        """Reconstrói o ranking a partir de (user_id, saldo)."""
+        balances = {user_id: balance for user_id, balance in accounts}
+        ranking = sorted((-balance, user_id) for user_id, balance in balances.items())
+        with self._lock:
+            self._balances, self._ranking = balances, ranking
+            for scope, members in self._members.items():
+                self._scopes[scope] = self._scope_ranking(members)
+            self.loaded = True
+
+    def _scope_ranking(self, members: set) -> list:
+        return [entry for entry in self._ranking if entry[1] in members]
+
+    @staticmethod
+    def _remove(ranking: list, entry: tuple):
+        index = bisect.bisect_left(ranking, entry)
+        if index < len(ranking) and ranking[index] == entry:
+            del ranking[index]
+
+    def _set(self, user_id: int, balance: int):
+        old = self._balances.get(user_id)
+        if old == balance: return
+        rankings = [self._ranking] + [self._scopes[scope] for scope, members in self._members.items() if user_id in members]
+        for ranking in rankings:
+            if old is not None:
+                self._remove(ranking, (-old, user_id))
+            bisect.insort(ranking, (-balance, user_id))
+        self._balances[user_id] = balance
+
+    def set(self, user_id: int, balance: int):
+        with self._lock:
+            self._set(user_id, balance)
+
+    def add(self, user_id: int, delta: int):
+        """Aplica um delta de saldo; contas que o ranking não conhece começam do saldo inicial."""
+        if not delta: return
+        with self._lock:
+            self._set(user_id, self._balances.get(user_id, self.starting_balance) + delta)
+
+    def add_many(self, deltas):
+        """`add` para vários (user_id, delta) de uma vez, com uma só aquisição do lock."""
+        with self._lock:
+            for user_id, delta in deltas:
+                if delta:
+                    self._set(user_id, self._balances.get(user_id, self.starting_balance) + delta)
+
+    # --- Rankings por servidor ---
+    def has_scope(self, scope) -> bool:
+        return scope in self._members
+
+    def ensure_scope(self, scope, member_ids):
+        """Monta o ranking do escopo (ex.: id do servidor) com `member_ids`, se ainda não existir."""
+        with self._lock:
+            if scope in self._members: return
+            members = set(member_ids)
+            self._members[scope] = members
+            self._scopes[scope] = self._scope_ranking(members)
+
+    def drop_scope(self, scope):
+        with self._lock:
+            self._members.pop(scope, None)
+            self._scopes.pop(scope, None)
+
+    def add_member(self, scope, user_id: int):
+        with self._lock:
+            members = self._members.get(scope)
+            if members is None or user_id in members: return
+            members.add(user_id)
+            balance = self._balances.get(user_id)
+            if balance is not None:
+                bisect.insort(self._scopes[scope], (-balance, user_id))
+
+    def remove_member(self, scope, user_id: int):
+        with self._lock:
+            members = self._members.get(scope)
+            if members is None or user_id not in members: return
+            members.discard(user_id)
+            balance = self._balances.get(user_id)
+            if balance is not None:
+                self._remove(self._scopes[scope], (-balance, user_id))
+
+    # --- Consultas ---
+    def top(self, limit: int = 10, offset: int = 0, scope=None) -> list:
+        """Retorna [(posição, user_id, saldo)] a partir de `offset`, no ranking global ou no do `scope`."""
+        with self._lock:
+            ranking = self._ranking if scope is None else self._scopes.get(scope, [])
+            page = ranking[offset:offset + limit]
+        return [(offset + i + 1, user_id, -neg_balance) for i, (neg_balance, user_id) in enumerate(page)]
+
+    def rank(self, user_id: int, scope=None):
+        """Posição do usuário (1 = mais rico) no ranking global ou no do `scope`, ou None se ele não estiver nele."""
+        with self._lock:
+            balance = self._balances.get(user_id)
+            if balance is None: return None
+            if scope is None:
+                ranking = self._ranking
+            elif user_id in self._members.get(scope, ()):
+                ranking = self._scopes[scope]
+            else:
+                return None
+            return bisect.bisect_left(ranking, (-balance, user_id)) + 1
+
+    def __len__(self):
+        return len(self._ranking)
@@ -0,0 +1,68 @@
+# utils/ledger.py
+import os
+import threading
+from datetime import datetime
+
+LEDGER_FLUSH_MS = int(os.getenv("LEDGER_FLUSH_MS", "1000"))
+LEDGER_SNAPSHOT_HOURS = float(os.getenv("LEDGER_SNAPSHOT_HOURS", "6"))
+
+class Ledger:
+    """Registro append-only de todas as mudanças de saldo.
+
+    `append` só guarda o lançamento num buffer em memória; uma thread grava o buffer em
+    lote (`write(lançamentos)`, ex.: Storage.insert_ledger) a cada LEDGER_FLUSH_MS e, a cada LEDGER_SNAPSHOT_HOURS, chama
+    `on_snapshot` para gravar fotos dos saldos. Assim o caminho quente não espera o banco.
+    """
+    def __init__(self, write, on_snapshot=None, flush_ms: int = LEDGER_FLUSH_MS, snapshot_hours: float = LEDGER_SNAPSHOT_HOURS):
+        self.write = write
+        self.on_snapshot = on_snapshot
+        self.flush_ms = flush_ms
+        self.snapshot_hours = snapshot_hours
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._closing = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="ronaldin-ledger", daemon=True)
+            self._thread.start()
+
+    def append(self, user_id: int, delta: int = None, balance: int = None, reason: str = None, game: str = None, ref=None):
+        """Registra uma mudança: `delta` para $inc ou `balance` para um saldo definido direto."""
+        entry = {"user_id": user_id, "at": datetime.utcnow(), "reason": reason}
+        if delta is not None: entry["delta"] = delta
+        if balance is not None: entry["balance"] = balance
+        if game is not None: entry["game"] = game
+        if ref is not None: entry["ref"] = ref
+        with self._lock:
+            self._buffer.append(entry)
+
+    def flush(self):
+        with self._lock:
+            batch, self._buffer = self._buffer, []
+        if not batch: return
+        try:
+            self.write(batch)
+        except Exception:
+            self._requeue(batch)
+            raise
+
+    def _requeue(self, batch: list):
+        with self._lock:
+            self._buffer[:0] = batch
+
+    def _loop(self):
+        next_snapshot = datetime.utcnow().timestamp() + self.snapshot_hours * 3600
+        while not self._closing.wait(self.flush_ms / 1000):
+            try:
+                self.flush()
+                if self.on_snapshot is not None and datetime.utcnow().timestamp() >= next_snapshot:
+                    next_snapshot += self.snapshot_hours * 3600
+                    self.on_snapshot()
+            except Exception as e:
+                print(f"Erro ao gravar o histórico de transações: {e}")
+
+    def close(self):
+        self._closing.set()
+        self.flush()
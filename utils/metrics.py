@@ -0,0 +1,133 @@
+# utils/metrics.py
+import asyncio
+import bisect
+import os
+import time
+from collections import deque
+from aiohttp import web
+
+# Endpoint Prometheus, só em localhost. Com vários clusters, cada um usa METRICS_PORT + CLUSTER_ID.
+METRICS_HOST = "127.0.0.1"
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9108"))  # 0 desliga
+# De quanto em quanto tempo (s) o monitor mede o atraso do event loop.
+LOOP_LAG_INTERVAL = 0.5
+# Limites (s) dos baldes dos histogramas, do jeito do Prometheus.
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+# Amostras recentes guardadas por série, para os percentis do /metrics.
+RECENT = 1024
+
+class Histogram:
+    """Histograma cumulativo (exportado ao Prometheus) mais as últimas RECENT amostras (percentis)."""
+    __slots__ = ("counts", "count", "sum", "max", "recent")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # o último é o +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=RECENT)
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max: self.max = seconds
+        self.recent.append(seconds)
+
+    def percentile(self, p: float) -> float:
+        if not self.recent: return 0.0
+        values = sorted(self.recent)
+        return values[min(len(values) - 1, int(len(values) * p))]
+
+class Metrics:
+    """Tempos do bot por série: {família: {rótulos: Histogram}}.
+
+    Famílias: loop_lag (atraso do event loop), command (comandos de prefixo e slash, por
+    nome e resultado), db (cada método do Database) e webhook (envios e edições).
+    """
+    HELP = {
+        "loop_lag": "Atraso do event loop em relação ao sleep pedido.",
+        "command": "Tempo dos comandos, do início ao fim do handler.",
+        "db": "Tempo das chamadas ao Database, incluindo a espera no pool de threads.",
+        "webhook": "Tempo das chamadas de webhook ao Discord.",
+    }
+
+    def __init__(self):
+        self.families = {family: {} for family in self.HELP}
+        self.started_at = time.time()
+        self._lag_task = None
+        self._runner = None
+
+    def observe(self, family: str, seconds: float, **labels):
+        key = tuple(sorted(labels.items()))
+        series = self.families[family]
+        histogram = series.get(key)
+        if histogram is None:
+            histogram = series[key] = Histogram()
+        histogram.observe(seconds)
+
+    def series(self, family: str) -> list:
+        """[(dict de rótulos, Histogram)] da família."""
+        return [(dict(key), histogram) for key, histogram in self.families[family].items()]
+
+    # --- Atraso do event loop ---
+    async def _sample_loop_lag(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(LOOP_LAG_INTERVAL)
+            self.observe("loop_lag", max(0.0, time.perf_counter() - started - LOOP_LAG_INTERVAL))
+
+    # --- Prometheus ---
+    def render(self) -> str:
+        """Texto no formato de exposição do Prometheus."""
+        lines = []
+        for family, series in self.families.items():
+            name = f"ronaldin_{family}_seconds"
+            lines.append(f"# HELP {name} {self.HELP[family]}")
+            lines.append(f"# TYPE {name} histogram")
+            for key, h in series.items():
+                labels = ",".join(f'{k}="{_escape(v)}"' for k, v in key)
+                cumulative = 0
+                for bound, count in zip(BUCKETS + ("+Inf",), h.counts):
+                    cumulative += count
+                    le = f'le="{bound}"'
+                    lines.append(f"{name}_bucket{{{labels + ',' if labels else ''}{le}}} {cumulative}")
+                suffix = f"{{{labels}}}" if labels else ""
+                lines.append(f"{name}_sum{suffix} {h.sum}")
+                lines.append(f"{name}_count{suffix} {h.count}")
+        lines.append("# HELP ronaldin_start_time_seconds Quando o processo começou a medir (unix).")
+        lines.append("# TYPE ronaldin_start_time_seconds gauge")
+        lines.append(f"ronaldin_start_time_seconds {self.started_at}")
+        return "\n".join(lines) + "\n"
+
+    async def _handle_metrics(self, request):
+        return web.Response(text=self.render(), content_type="text/plain", charset="utf-8")
+
+    async def start(self, port: int = METRICS_PORT):
+        """Liga o monitor do event loop e, se `port`, o endpoint /metrics em localhost."""
+        if self._lag_task is None:
+            self._lag_task = asyncio.create_task(self._sample_loop_lag())
+        if port and self._runner is None:
+            app = web.Application()
+            app.router.add_get("/metrics", self._handle_metrics)
+            self._runner = web.AppRunner(app, access_log=None)
+            await self._runner.setup()
+            try:
+                await web.TCPSite(self._runner, METRICS_HOST, port).start()
+                print(f"Métricas em http://{METRICS_HOST}:{port}/metrics")
+            except OSError as e:
+                print(f"Não foi possível abrir o endpoint de métricas na porta {port}: {e}")
+
+    async def stop(self):
+        if self._lag_task is not None:
+            self._lag_task.cancel()
+            self._lag_task = None
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+# Instância única do processo, usada pelo bot, pelo Database e pelo webhook_manager.
+metrics = Metrics()
@@ -0,0 +1,352 @@
+# utils/mongo_storage.py
+import pymongo
+import pymongo.errors
+from utils.storage import Storage, ACCOUNT_DEFAULTS, BET_TEAMS, BET_CLOSED, STARTING_BALANCE, new_account
+
+def _account_pipeline(inc: dict = None, set_: dict = None) -> list:
+    """Monta um update em pipeline que aplica $inc/$set e preenche os campos que faltam com o padrão.
+
+    Com upsert=True isso cria a conta e aplica a alteração na mesma operação, sem o
+    find_one + insert_one que permitia duas contas para o mesmo usuário.
+    """
+    inc = inc or {}
+    set_ = set_ or {}
+    fields = {}
+    for path in {**ACCOUNT_DEFAULTS, **inc, **set_}:
+        current = {"$ifNull": [f"${path}", ACCOUNT_DEFAULTS.get(path, 0 if path in inc else None)]}
+        if path in inc:
+            fields[path] = {"$add": [current, inc[path]]}
+        elif path in set_:
+            fields[path] = {"$literal": set_[path]}
+        else:
+            fields[path] = current
+    return [{"$set": fields}]
+
+def _inc_requests(incs: dict) -> list:
+    """Um UpdateOne com upsert para cada {user_id: {caminho: delta}}."""
+    return [pymongo.UpdateOne({"user_id": user_id}, _account_pipeline(inc), upsert=True) for user_id, inc in incs.items()]
+
+class _BetClosed(Exception):
+    """Aborta a transação de uma aposta quando o bolão já não está aberto."""
+
+class MongoStorage(Storage):
+    """Armazenamento no MongoDB (banco RonaldinBotDB)."""
+    name = "mongo"
+
+    def __init__(self, uri: str):
+        if not uri:
+            raise RuntimeError("DB_BACKEND=mongo precisa de MONGO_URI.")
+        self.client = pymongo.MongoClient(uri)
+        # O MongoClient conecta de forma preguiçosa; o ping faz um erro de conexão aparecer já na inicialização.
+        self.client.admin.command("ping")
+        self.transactions = self._supports_transactions()
+        self.db = self.client.get_database("RonaldinBotDB")
+        print("Conectado ao MongoDB com sucesso!")
+
+    # (coleção, chaves, opções) dos índices usados pelo bot
+    INDEXES = [
+        ("economy", "user_id", {"unique": True}),
+        ("economy", [("balance", pymongo.DESCENDING)], {}),
+        ("webhooks", "channel_id", {"unique": True}),
+        ("rounds", "round_id", {"unique": True}),
+        ("ledger", [("user_id", pymongo.ASCENDING), ("at", pymongo.ASCENDING)], {}),
+        ("balance_snapshots", [("user_id", pymongo.ASCENDING), ("at", pymongo.DESCENDING)], {}),
+        ("bet_entries", [("message_id", pymongo.ASCENDING), ("user_id", pymongo.ASCENDING)], {"unique": True}),
+        ("bet_entries", [("message_id", pymongo.ASCENDING), ("amount", pymongo.DESCENDING)], {}),
+        ("schedule", "job_id", {"unique": True}),
+        ("shard_status", "shard_id", {"unique": True}),
+    ]
+
+    def ensure_indexes(self):
+        # Contas duplicadas (da corrida antiga de criação) impediriam o índice único de user_id
+        self._merge_duplicate_accounts()
+        # Um índice que falha não pode impedir os outros de serem criados
+        for collection, keys, options in self.INDEXES:
+            try:
+                self.db[collection].create_index(keys, **options)
+            except pymongo.errors.PyMongoError as e:
+                print(f"Não foi possível criar o índice {collection}.{keys}: {e}")
+        # Já a migração tem que rodar: sem ela o bot trabalharia sobre dados no formato antigo
+        self._migrate_bet_participants()
+
+    def _merge_duplicate_accounts(self):
+        """Junta contas com o mesmo user_id numa só.
+
+        Cada duplicata nasceu com o saldo inicial e recebeu parte das mudanças, então a conta
+        que fica soma o que cada uma das outras ganhou ou perdeu em relação ao saldo inicial,
+        soma as estatísticas e fica com o cooldown mais recente de cada tipo.
+        """
+        duplicates = self.db.economy.aggregate([
+            {"$group": {"_id": "$user_id", "ids": {"$push": "$_id"}, "count": {"$sum": 1}}},
+            {"$match": {"count": {"$gt": 1}}},
+        ])
+        for group in duplicates:
+            docs = list(self.db.economy.find({"_id": {"$in": group["ids"]}}).sort("_id", pymongo.ASCENDING))
+            keep, others = docs[0], docs[1:]
+            inc, set_ = {}, {}
+            for doc in others:
+                inc["balance"] = inc.get("balance", 0) + doc.get("balance", STARTING_BALANCE) - STARTING_BALANCE
+                for key, value in (doc.get("stats") or {}).items():
+                    inc[f"stats.{key}"] = inc.get(f"stats.{key}", 0) + (value or 0)
+                for key, value in (doc.get("cooldowns") or {}).items():
+                    current = set_.get(f"cooldowns.{key}", (keep.get("cooldowns") or {}).get(key))
+                    if value is not None and (current is None or value > current):
+                        set_[f"cooldowns.{key}"] = value
+            update = {"$inc": inc}
+            if set_: update["$set"] = set_
+            self.db.economy.update_one({"_id": keep["_id"]}, update)
+            self.db.economy.delete_many({"_id": {"$in": [doc["_id"] for doc in others]}})
+            print(f"{len(others)} conta(s) duplicada(s) do usuário {group['_id']} juntada(s).")
+
+    def _migrate_bet_participants(self):
+        """Passa bolões antigos, com a lista `participants` no documento, para bet_entries + totais."""
+        for bet in self.db.bets.find({"participants": {"$exists": True}}):
+            totals = {team: 0 for team in BET_TEAMS}
+            counts = {team: 0 for team in BET_TEAMS}
+            requests = []
+            for p in bet["participants"]:
+                team = next((t for t in BET_TEAMS if bet.get(t) == p.get("bet_on")), None)
+                if team is None or p.get("amount", 0) <= 0: continue  # sobras do cancelamento antigo (amount=-1)
+                totals[team] += p["amount"]
+                counts[team] += 1
+                requests.append(pymongo.UpdateOne(
+                    {"message_id": bet["message_id"], "user_id": p["user_id"]},
+                    {"$set": {"team": team, "amount": p["amount"]}}, upsert=True
+                ))
+            if requests:
+                self.db.bet_entries.bulk_write(requests, ordered=False)
+            self.db.bets.update_one({"_id": bet["_id"]}, {"$set": {"totals": totals, "counts": counts}, "$unset": {"participants": ""}})
+
+    def _supports_transactions(self) -> bool:
+        """Transações só existem em replica set (setName) ou atrás de um mongos (isdbgrid)."""
+        try:
+            hello = self.client.admin.command("hello")
+        except pymongo.errors.OperationFailure:
+            hello = self.client.admin.command("isMaster")  # servidores anteriores ao 4.4.2
+        return "setName" in hello or hello.get("msg") == "isdbgrid"
+
+    def _in_transaction(self, apply):
+        """Roda `apply(session)` numa transação, ou sem sessão num servidor standalone.
+
+        O suporte é visto uma vez na conexão; se mesmo assim o servidor recusar (código 20),
+        isso fica guardado e as próximas chamadas nem abrem sessão.
+        """
+        if not self.transactions:
+            return apply()
+        try:
+            with self.client.start_session() as session:
+                return session.with_transaction(apply)
+        except pymongo.errors.OperationFailure as e:
+            if e.code != 20: raise
+            self.transactions = False
+            return apply()
+
+    def close(self):
+        self.client.close()
+
+    # --- Contas ---
+    def get_or_create_account(self, user_id: int) -> dict:
+        return self.db.economy.find_one_and_update(
+            {"user_id": user_id},
+            {"$setOnInsert": new_account()},
+            upsert=True,
+            return_document=pymongo.ReturnDocument.AFTER
+        )
+
+    def update_account(self, user_id: int, inc: dict = None, set_: dict = None):
+        self.db.economy.update_one({"user_id": user_id}, _account_pipeline(inc, set_), upsert=True)
+
+    def apply_incs(self, incs: dict):
+        if incs:
+            self.db.economy.bulk_write(_inc_requests(incs), ordered=False)
+
+    def try_debit(self, user_id: int, amount: int, credit: int = 0):
+        return self.db.economy.find_one_and_update(
+            {"user_id": user_id, "balance": {"$gte": amount}},
+            {"$inc": {"balance": credit - amount}},
+            return_document=pymongo.ReturnDocument.AFTER
+        )
+
+    def claim_cooldown(self, user_id: int, kind: str, now, period) -> tuple:
+        path = f"cooldowns.{kind}"
+        # {path: None} pega tanto o campo nulo quanto o ausente
+        claimed = self.db.economy.find_one_and_update(
+            {"user_id": user_id, "$or": [{path: None}, {path: {"$lte": now - period}}]},
+            {"$set": {path: now}}
+        )
+        if claimed is not None:
+            return True, None
+        account = self.get_or_create_account(user_id)
+        last = (account.get("cooldowns") or {}).get(kind)
+        if last is None:  # a conta acabou de ser criada
+            return self.claim_cooldown(user_id, kind, now, period)
+        return False, last
+
+    def settle(self, incs: dict, close_bet: int = None, close_round: str = None):
+        requests = _inc_requests(incs)
+
+        def apply(session=None):
+            if requests:
+                self.db.economy.bulk_write(requests, ordered=False, session=session)
+            if close_bet is not None:
+                self.db.bets.update_one({"message_id": close_bet}, {"$set": {"status": "closed"}}, session=session)
+            if close_round is not None:
+                self.db.rounds.delete_one({"round_id": close_round}, session=session)
+
+        self._in_transaction(apply)
+
+    def balances(self, user_ids=None):
+        query = {} if user_ids is None else {"user_id": {"$in": list(user_ids)}}
+        for account in self.db.economy.find(query, {"_id": 0, "user_id": 1, "balance": 1}):
+            yield account["user_id"], account.get("balance", 0)
+
+    # --- Histórico de transações ---
+    def insert_ledger(self, entries: list):
+        try:
+            self.db.ledger.insert_many(entries, ordered=False)
+        except pymongo.errors.BulkWriteError as e:
+            # Num reenvio, os lançamentos que já tinham entrado voltam como chave duplicada
+            if not all(error.get("code") == 11000 for error in e.details.get("writeErrors", [])):
+                raise
+
+    def ledger_users_since(self, when) -> list:
+        return self.db.ledger.distinct("user_id", {"at": {"$gt": when}})
+
+    def ledger_entries(self, user_id: int, after, until) -> list:
+        query = {"user_id": user_id, "at": {"$lte": until}}
+        if after is not None: query["at"]["$gt"] = after
+        return list(self.db.ledger.find(query).sort("at", pymongo.ASCENDING))
+
+    def last_snapshot_at(self):
+        last = self.db.balance_snapshots.find_one({}, sort=[("at", pymongo.DESCENDING)])
+        return last["at"] if last else None
+
+    def snapshot_before(self, user_id: int, when):
+        return self.db.balance_snapshots.find_one({"user_id": user_id, "at": {"$lte": when}}, sort=[("at", pymongo.DESCENDING)])
+
+    def insert_snapshots(self, snapshots: list):
+        if snapshots:
+            self.db.balance_snapshots.insert_many(snapshots, ordered=False)
+
+    # --- Diário de rodadas ---
+    def save_round(self, round_id: str, game: str, channel_id: int, state: str, bets: list, updated_at, cluster: int = 0):
+        self.db.rounds.update_one(
+            {"round_id": round_id},
+            {"$set": {"game": game, "channel_id": channel_id, "state": state, "bets": bets, "updated_at": updated_at, "cluster": cluster}},
+            upsert=True
+        )
+
+    def get_rounds(self, cluster: int = None) -> list:
+        if cluster is None:
+            return list(self.db.rounds.find({}))
+        # Rodadas gravadas antes dos clusters não têm o campo e ficam com o cluster 0
+        return list(self.db.rounds.find({"cluster": {"$in": [cluster, None]} if cluster == 0 else cluster}))
+
+    # --- Bolões ---
+    def create_bet(self, bet_data: dict):
+        return self.db.bets.insert_one(bet_data)
+
+    def get_bet(self, message_id: int):
+        return self.db.bets.find_one({"message_id": message_id})
+
+    def close_bet(self, message_id: int):
+        return self.db.bets.update_one({"message_id": message_id}, {"$set": {"status": "closed"}})
+
+    def set_bet_status(self, message_id: int, status: str, only_if: str = None) -> bool:
+        query = {"message_id": message_id}
+        if only_if is not None: query["status"] = only_if
+        return self.db.bets.update_one(query, {"$set": {"status": status}}).modified_count > 0
+
+    def _inc_totals(self, message_id: int, inc: dict, session=None):
+        """Ajusta os totais só se o bolão ainda estiver "open"; senão levanta _BetClosed."""
+        if self.db.bets.update_one({"message_id": message_id, "status": "open"}, {"$inc": inc}, session=session).matched_count == 0:
+            raise _BetClosed()
+
+    def _restore_entry(self, message_id: int, user_id: int, entry):
+        """Desfaz a escrita de uma aposta quando não há transação (servidor standalone)."""
+        if entry is None:
+            self.db.bet_entries.delete_one({"message_id": message_id, "user_id": user_id})
+        else:
+            self.db.bet_entries.update_one({"message_id": message_id, "user_id": user_id}, {"$set": {"team": entry["team"], "amount": entry["amount"]}}, upsert=True)
+
+    def place_bet_entry(self, message_id: int, user_id: int, team: str, amount: int):
+        def apply(session=None):
+            previous = self.db.bet_entries.find_one_and_update(
+                {"message_id": message_id, "user_id": user_id},
+                {"$set": {"team": team, "amount": amount}},
+                projection={"_id": 0}, upsert=True,
+                return_document=pymongo.ReturnDocument.BEFORE, session=session
+            )
+            inc = {f"totals.{team}": amount, f"counts.{team}": 1}
+            if previous is not None:
+                inc[f"totals.{previous['team']}"] = inc.get(f"totals.{previous['team']}", 0) - previous["amount"]
+                inc[f"counts.{previous['team']}"] = inc.get(f"counts.{previous['team']}", 0) - 1
+            try:
+                self._inc_totals(message_id, inc, session)
+            except _BetClosed:
+                if session is None: self._restore_entry(message_id, user_id, previous)
+                raise
+            return previous
+        try:
+            return self._in_transaction(apply)
+        except _BetClosed:
+            return BET_CLOSED
+
+    def remove_bet_entry(self, message_id: int, user_id: int):
+        def apply(session=None):
+            removed = self.db.bet_entries.find_one_and_delete({"message_id": message_id, "user_id": user_id}, projection={"_id": 0}, session=session)
+            if removed is not None:
+                try:
+                    self._inc_totals(message_id, {f"totals.{removed['team']}": -removed["amount"], f"counts.{removed['team']}": -1}, session)
+                except _BetClosed:
+                    if session is None: self._restore_entry(message_id, user_id, removed)
+                    raise
+            elif self.db.bets.count_documents({"message_id": message_id, "status": "open"}, limit=1, session=session) == 0:
+                raise _BetClosed()
+            return removed
+        try:
+            return self._in_transaction(apply)
+        except _BetClosed:
+            return BET_CLOSED
+
+    def get_bet_entry(self, message_id: int, user_id: int):
+        return self.db.bet_entries.find_one({"message_id": message_id, "user_id": user_id}, {"_id": 0})
+
+    def get_bet_entries(self, message_id: int, team: str = None, limit: int = None) -> list:
+        query = {"message_id": message_id}
+        if team is not None: query["team"] = team
+        return list(self.db.bet_entries.find(query, {"_id": 0}).sort("amount", pymongo.DESCENDING).limit(limit or 0))
+
+    # --- Agenda ---
+    def get_jobs(self) -> list:
+        return list(self.db.schedule.find({}, {"_id": 0}))
+
+    def save_job(self, job_id: str, run_at, kind: str, data: dict):
+        self.db.schedule.update_one({"job_id": job_id}, {"$set": {"run_at": run_at, "kind": kind, "data": data}}, upsert=True)
+
+    def delete_job(self, job_id: str):
+        self.db.schedule.delete_one({"job_id": job_id})
+
+    # --- Shards ---
+    def save_shard_status(self, statuses: list):
+        if statuses:
+            self.db.shard_status.bulk_write([
+                pymongo.UpdateOne({"shard_id": s["shard_id"]}, {"$set": s}, upsert=True) for s in statuses
+            ], ordered=False)
+
+    def get_shard_status(self) -> list:
+        return list(self.db.shard_status.find({}, {"_id": 0}).sort("shard_id", pymongo.ASCENDING))
+
+    # --- Webhooks ---
+    def get_webhooks(self) -> list:
+        return list(self.db.webhooks.find({}, {"_id": 0}))
+
+    def save_webhook(self, channel_id: int, webhook_id: int, token: str):
+        self.db.webhooks.update_one(
+            {"channel_id": channel_id},
+            {"$set": {"webhook_id": webhook_id, "token": token}},
+            upsert=True
+        )
+
+    def delete_webhook(self, channel_id: int):
+        self.db.webhooks.delete_one({"channel_id": channel_id})
@@ -0,0 +1,88 @@
+# utils/payouts.py
+import os
+
+# Modos de pagamento de um bolão.
+PARIMUTUEL = "parimutuel"  # quem acertou divide o lado perdedor, proporcional ao que apostou
+FIXED_ODDS = "odds"        # cada lado paga aposta × odd, definida na criação do bolão
+PAYOUT_MODES = (PARIMUTUEL, FIXED_ODDS)
+
+DEFAULT_PAYOUT_MODE = os.getenv("BOLAO_PAYOUT_MODE", PARIMUTUEL)
+# Parte do lado perdedor que fica com a casa no pari-mutuel (0.05 = 5%).
+DEFAULT_RAKE = float(os.getenv("BOLAO_RAKE", "0.05"))
+# Odd usada quando o bolão de odds fixas não define uma (o antigo "aposta × 2").
+DEFAULT_ODDS = 2.0
+
+class Settlement:
+    """Resultado do cálculo de um bolão, pronto para o `Database.settle_payouts`.
+
+    `payouts` tem (user_id, crédito, delta_de_stats) de todo mundo que recebe algo;
+    `winners` tem (user_id, aposta, crédito) só de quem ganhou, na ordem das entradas.
+    """
+    def __init__(self, payouts: list, winners: list, pool: int, paid: int, refunded: bool):
+        self.payouts = payouts
+        self.winners = winners
+        self.pool = pool          # total apostado
+        self.paid = paid          # total devolvido aos apostadores
+        self.refunded = refunded  # True se todas as apostas foram só devolvidas
+
+    @property
+    def house(self) -> int:
+        """O que fica com a casa (negativo se ela pagou mais do que recebeu)."""
+        return self.pool - self.paid
+
+def refund(entries: list) -> Settlement:
+    """Devolve cada aposta (empate, partida cancelada, ninguém do lado vencedor no pari-mutuel)."""
+    payouts = [(e["user_id"], e["amount"], None) for e in entries]
+    pool = sum(credit for _, credit, _ in payouts)
+    return Settlement(payouts, [], pool, pool, True)
+
+def parimutuel(entries: list, winning_team: str, totals: dict = None, rake: float = DEFAULT_RAKE) -> Settlement:
+    """Quem acertou recebe a aposta de volta mais a sua fração do lado perdedor, menos o `rake`.
+
+    Tudo em inteiros: a fração de cada um é arredondada para baixo e a sobra fica com a casa.
+    `totals` ({time: total}, como no documento do bolão) evita somar as entradas de novo.
+    """
+    if totals is None:
+        totals = {}
+        for e in entries:
+            totals[e["team"]] = totals.get(e["team"], 0) + e["amount"]
+    pool = sum(totals.values())
+    winning_total = totals.get(winning_team, 0)
+    if winning_total <= 0:
+        return refund(entries)
+
+    prize_pool = pool - winning_total
+    prize_pool -= int(prize_pool * rake)
+    payouts, winners, paid = [], [], 0
+    for e in entries:
+        if e["team"] != winning_team: continue
+        credit = e["amount"] + e["amount"] * prize_pool // winning_total
+        payouts.append((e["user_id"], credit, {"bets_won": 1, "total_won": credit}))
+        winners.append((e["user_id"], e["amount"], credit))
+        paid += credit
+    return Settlement(payouts, winners, pool, paid, False)
+
+def fixed_odds(entries: list, winning_team: str, odds: dict = None) -> Settlement:
+    """Cada aposta no lado vencedor paga aposta × odd do lado ({time: odd})."""
+    odd = (odds or {}).get(winning_team, DEFAULT_ODDS)
+    payouts, winners, pool, paid = [], [], 0, 0
+    for e in entries:
+        pool += e["amount"]
+        if e["team"] != winning_team: continue
+        credit = int(e["amount"] * odd)
+        payouts.append((e["user_id"], credit, {"bets_won": 1, "total_won": credit}))
+        winners.append((e["user_id"], e["amount"], credit))
+        paid += credit
+    return Settlement(payouts, winners, pool, paid, False)
+
+def settle_pool(entries: list, winning_team: str, mode: str = DEFAULT_PAYOUT_MODE, totals: dict = None, rake: float = DEFAULT_RAKE, odds: dict = None) -> Settlement:
+    """Calcula o pagamento de um bolão. `winning_team` None (empate) devolve todas as apostas.
+
+    É um laço simples em Python sobre as entradas, sem vetorização: os valores são moedas
+    inteiras e precisam sair exatos. Veja benchmarks/bench_payouts.py para o tempo.
+    """
+    if winning_team is None:
+        return refund(entries)
+    if mode == FIXED_ODDS:
+        return fixed_odds(entries, winning_team, odds)
+    return parimutuel(entries, winning_team, totals, rake)
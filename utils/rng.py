@@ -0,0 +1,76 @@
+# utils/rng.py
+import hashlib
+import secrets
+import struct
+
+# Tamanho da semente de cada rodada/sapato.
+SEED_BYTES = 32
+_WORDS = struct.Struct("<8Q")  # um bloco do blake2b (64 bytes) rende 8 números de 64 bits
+_2_64 = 1 << 64
+
+def commitment_of(seed: bytes) -> str:
+    """Compromisso publicado antes da rodada: sha256 da semente, em hex."""
+    return hashlib.sha256(seed).hexdigest()
+
+def verify(seed_hex: str, commitment: str) -> bool:
+    """Confere se a semente revelada é a mesma do compromisso mostrado antes."""
+    return commitment_of(bytes.fromhex(seed_hex)) == commitment
+
+class SeededRNG:
+    """Gerador de uma rodada, com semente do `secrets` e esquema commit-reveal.
+
+    A saída é um fluxo por contador: o bloco n é blake2b(n, chave=semente), e cada bloco
+    vira 8 números de 64 bits. Antes da rodada se mostra `commitment`; depois, `reveal()`
+    entrega a semente, e qualquer um refaz a rodada com `SeededRNG(bytes.fromhex(semente))`
+    chamando os mesmos métodos na mesma ordem.
+    """
+    __slots__ = ("seed", "commitment", "counter", "_words", "_pos")
+
+    def __init__(self, seed: bytes = None):
+        self.seed = seed if seed is not None else secrets.token_bytes(SEED_BYTES)
+        self.commitment = commitment_of(self.seed)
+        self.counter = 0
+        self._words = ()
+        self._pos = 0
+
+    def reveal(self) -> str:
+        return self.seed.hex()
+
+    def spawn(self) -> "SeededRNG":
+        """Gerador novo com a semente tirada deste fluxo: vários sapatos/rodadas reprodutíveis a partir de uma semente só."""
+        return SeededRNG(b"".join(self._next64().to_bytes(8, "little") for _ in range(SEED_BYTES // 8)))
+
+    def _next64(self) -> int:
+        if self._pos == len(self._words):
+            block = hashlib.blake2b(self.counter.to_bytes(8, "little"), key=self.seed, digest_size=64).digest()
+            self.counter += 1
+            self._words = _WORDS.unpack(block)
+            self._pos = 0
+        word = self._words[self._pos]
+        self._pos += 1
+        return word
+
+    def randbelow(self, n: int) -> int:
+        """Inteiro uniforme em [0, n), sem viés de módulo (descarta o pedaço que sobra no topo)."""
+        limit = _2_64 - _2_64 % n
+        while True:
+            word = self._next64()
+            if word < limit:
+                return word % n
+
+    def randint(self, a: int, b: int) -> int:
+        return a + self.randbelow(b - a + 1)
+
+    def randints(self, a: int, b: int, k: int) -> list:
+        """`k` sorteios de uma vez (ex.: os 4 dados do Bac Bo)."""
+        span = b - a + 1
+        return [a + self.randbelow(span) for _ in range(k)]
+
+    def choice(self, seq):
+        return seq[self.randbelow(len(seq))]
+
+    def shuffle(self, x):
+        """Fisher-Yates no lugar; serve para list e bytearray."""
+        for i in range(len(x) - 1, 0, -1):
+            j = self.randbelow(i + 1)
+            x[i], x[j] = x[j], x[i]
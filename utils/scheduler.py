@@ -0,0 +1,125 @@
+# utils/scheduler.py
+import asyncio
+import heapq
+from datetime import datetime, timedelta
+
+# Espera máxima (s) entre duas olhadas na agenda, para acompanhar ajustes no relógio do sistema.
+MAX_SLEEP = 60
+# Quando um handler falha, tenta de novo depois deste tempo.
+RETRY_DELAY = timedelta(minutes=1)
+
+class Scheduler:
+    """Agenda persistente de tarefas com horário (UTC), guardada no banco e num min-heap.
+
+    Cada tarefa tem um `job_id` único, um `kind` (que escolhe o handler registrado) e um
+    dict `data`. O handler é uma corrotina `handler(data)`; se ela retornar um datetime a
+    tarefa é reagendada para esse horário, senão é removida. Depois de um reinício, `start`
+    recarrega tudo do banco, e o que venceu enquanto o bot estava fora roda na hora.
+
+    Com vários processos só um roda a agenda; os outros só gravam no banco, e com
+    `start(sync=True)` ela relê o banco a cada MAX_SLEEP para pegar essas tarefas.
+    """
+    def __init__(self, db):
+        self.db = db
+        self._heap = []      # [(run_at, job_id)]; entradas de tarefas canceladas/reagendadas são puladas
+        self._jobs = {}      # {job_id: (run_at, kind, data)}
+        self._handlers = {}  # {kind: corrotina}
+        self._running = None  # job_id da tarefa cujo handler está rodando agora
+        self._running_cancelled = False
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self._sync = False
+
+    def register(self, kind: str, handler):
+        self._handlers[kind] = handler
+
+    def _push(self, job_id: str, run_at: datetime, kind: str, data: dict):
+        self._jobs[job_id] = (run_at, kind, data)
+        heapq.heappush(self._heap, (run_at, job_id))
+        self._wakeup.set()
+
+    async def start(self, sync: bool = False):
+        self._sync = sync
+        await self._reload()
+        self._task = asyncio.create_task(self._run())
+
+    async def _reload(self):
+        """Acerta a agenda em memória com a do banco (tarefas criadas ou canceladas por outro processo)."""
+        known = set(self._jobs)  # o que for agendado aqui durante a leitura não é removido
+        jobs = await self.db.get_jobs()
+        for job in jobs:
+            current = self._jobs.get(job["job_id"])
+            if job["job_id"] != self._running and (current is None or current[0] != job["run_at"]):
+                self._push(job["job_id"], job["run_at"], job["kind"], job.get("data") or {})
+        stored = {job["job_id"] for job in jobs}
+        for job_id in known - stored:
+            self._jobs.pop(job_id, None)
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+
+    async def schedule(self, job_id: str, run_at: datetime, kind: str, data: dict = None):
+        """Agenda (ou reagenda) a tarefa `job_id` para `run_at`."""
+        data = data or {}
+        await self.db.save_job(job_id, run_at, kind, data)
+        self._push(job_id, run_at, kind, data)
+
+    async def cancel(self, job_id: str):
+        self._jobs.pop(job_id, None)
+        if job_id == self._running:
+            self._running_cancelled = True
+        await self.db.delete_job(job_id)
+
+    def _next(self):
+        """(run_at, job_id) da próxima tarefa válida, descartando as entradas velhas do heap."""
+        while self._heap:
+            run_at, job_id = self._heap[0]
+            job = self._jobs.get(job_id)
+            if job is not None and job[0] == run_at:
+                return run_at, job_id
+            heapq.heappop(self._heap)
+        return None
+
+    async def _run(self):
+        while True:
+            head = self._next()
+            if head is not None and head[0] <= datetime.utcnow():
+                heapq.heappop(self._heap)
+                await self._dispatch(head[1])
+                continue
+            timeout = MAX_SLEEP if head is None else min(MAX_SLEEP, (head[0] - datetime.utcnow()).total_seconds())
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                if self._sync:
+                    try:
+                        await self._reload()
+                    except Exception as e:
+                        print(f"Erro ao recarregar a agenda do banco: {e}")
+
+    async def _dispatch(self, job_id: str):
+        run_at, kind, data = self._jobs.pop(job_id)
+        handler = self._handlers.get(kind)
+        next_run = None
+        self._running, self._running_cancelled = job_id, False
+        try:
+            if handler is None:
+                print(f"Tarefa '{job_id}' sem handler para '{kind}', descartada.")
+            else:
+                next_run = await handler(data)
+        except Exception as e:
+            print(f"Erro na tarefa agendada '{job_id}': {e}")
+            next_run = datetime.utcnow() + RETRY_DELAY
+        finally:
+            self._running = None
+        try:
+            if self._running_cancelled or job_id in self._jobs:
+                return  # cancelada ou reagendada enquanto o handler rodava
+            if next_run is not None:
+                await self.schedule(job_id, next_run, kind, data)
+            else:
+                await self.db.delete_job(job_id)
+        except Exception as e:
+            print(f"Erro ao atualizar a tarefa agendada '{job_id}': {e}")
@@ -0,0 +1,434 @@
+# utils/sqlite_storage.py
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from utils.storage import Storage, BET_TEAMS, BET_CLOSED, STARTING_BALANCE
+
+# Caminho da conta (notação de ponto) -> coluna da tabela economy.
+_COLUMNS = {
+    "balance": "balance",
+    "stats.bets_made": "bets_made", "stats.bets_won": "bets_won",
+    "stats.total_wagered": "total_wagered", "stats.total_won": "total_won",
+}
+# Os cooldowns ("cooldowns.<tipo>") ficam na tabela cooldowns, uma linha por (user_id, tipo).
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS economy (
+    user_id INTEGER PRIMARY KEY,
+    balance INTEGER NOT NULL DEFAULT {STARTING_BALANCE},
+    bets_made INTEGER NOT NULL DEFAULT 0,
+    bets_won INTEGER NOT NULL DEFAULT 0,
+    total_wagered INTEGER NOT NULL DEFAULT 0,
+    total_won INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS economy_balance ON economy (balance DESC);
+CREATE TABLE IF NOT EXISTS cooldowns (
+    user_id INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    at TEXT NOT NULL,
+    PRIMARY KEY (user_id, kind)
+);
+CREATE TABLE IF NOT EXISTS bets (
+    message_id INTEGER PRIMARY KEY,
+    status TEXT NOT NULL,
+    doc TEXT NOT NULL,
+    total_team_home INTEGER NOT NULL DEFAULT 0,
+    total_team_away INTEGER NOT NULL DEFAULT 0,
+    count_team_home INTEGER NOT NULL DEFAULT 0,
+    count_team_away INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS bet_entries (
+    message_id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    team TEXT NOT NULL,
+    amount INTEGER NOT NULL,
+    PRIMARY KEY (message_id, user_id)
+);
+CREATE INDEX IF NOT EXISTS bet_entries_amount ON bet_entries (message_id, amount DESC);
+CREATE TABLE IF NOT EXISTS rounds (
+    round_id TEXT PRIMARY KEY,
+    game TEXT,
+    channel_id INTEGER,
+    state TEXT,
+    bets TEXT NOT NULL,
+    updated_at TEXT,
+    cluster INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS schedule (
+    job_id TEXT PRIMARY KEY,
+    run_at TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS shard_status (
+    shard_id INTEGER PRIMARY KEY,
+    cluster INTEGER NOT NULL,
+    latency REAL,
+    guilds INTEGER NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS webhooks (
+    channel_id INTEGER PRIMARY KEY,
+    webhook_id INTEGER NOT NULL,
+    token TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS ledger (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    at TEXT NOT NULL,
+    reason TEXT,
+    delta INTEGER,
+    balance INTEGER,
+    game TEXT,
+    ref
+);
+CREATE INDEX IF NOT EXISTS ledger_user_at ON ledger (user_id, at);
+CREATE INDEX IF NOT EXISTS ledger_at ON ledger (at);
+CREATE TABLE IF NOT EXISTS balance_snapshots (
+    user_id INTEGER NOT NULL,
+    balance INTEGER NOT NULL,
+    at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS balance_snapshots_user_at ON balance_snapshots (user_id, at DESC);
+CREATE INDEX IF NOT EXISTS balance_snapshots_at ON balance_snapshots (at);
+"""
+
+_SELECT_ACCOUNT = "SELECT " + ", ".join(["user_id"] + list(_COLUMNS.values())) + " FROM economy WHERE user_id = ?"
+_INSERT_ACCOUNT = "INSERT INTO economy (user_id) VALUES (?) ON CONFLICT (user_id) DO NOTHING"
+_DEBIT = "UPDATE economy SET balance = balance + ? WHERE user_id = ? AND balance >= ?"
+_SET_COOLDOWN = "INSERT INTO cooldowns (user_id, kind, at) VALUES (?, ?, ?) ON CONFLICT (user_id, kind) DO UPDATE SET at = excluded.at"
+# Só grava se o cooldown anterior for de antes do 4º parâmetro; rowcount 0 = ainda em cooldown.
+_CLAIM_COOLDOWN = _SET_COOLDOWN + " WHERE cooldowns.at <= ?"
+
+# Colunas acrescentadas depois da primeira versão do esquema: (tabela, coluna, declaração).
+_ADDED_COLUMNS = [
+    ("rounds", "cluster", "INTEGER NOT NULL DEFAULT 0"),
+]
+
+def _ts(value: datetime) -> str:
+    # Sempre com microssegundos, para a ordem das strings ser a ordem das datas.
+    return value.isoformat(timespec="microseconds") if value is not None else None
+
+def _dt(value: str):
+    return datetime.fromisoformat(value) if value is not None else None
+
+def _row_to_account(row, cooldowns) -> dict:
+    account = {"user_id": row[0], "cooldowns": {kind: _dt(at) for kind, at in cooldowns}}
+    for path, value in zip(_COLUMNS, row[1:]):
+        parent, _, key = path.rpartition(".")
+        (account.setdefault(parent, {}) if parent else account)[key] = value
+    return account
+
+def _update_sql(inc: dict, set_: dict) -> tuple:
+    """UPDATE da conta para os caminhos de `inc`/`set_` (os nomes de coluna vêm só de _COLUMNS)."""
+    assignments, params = [], []
+    for path, delta in inc.items():
+        column = _COLUMNS[path]
+        assignments.append(f"{column} = {column} + ?")
+        params.append(delta)
+    for path, value in set_.items():
+        column = _COLUMNS[path]
+        assignments.append(f"{column} = ?")
+        params.append(value)
+    return f"UPDATE economy SET {', '.join(assignments)} WHERE user_id = ?", params
+
+class SQLiteStorage(Storage):
+    """Armazenamento num arquivo SQLite local em modo WAL, para deploys de um nó só.
+
+    Uma conexão compartilhada protegida por lock: o sqlite3 guarda as instruções já
+    preparadas (cached_statements) e, como todo SQL aqui usa parâmetros `?` com texto fixo,
+    cada comando é compilado uma vez só. `path=":memory:"` serve para testes locais.
+    """
+    name = "sqlite"
+
+    def __init__(self, path: str = "ronaldin.db"):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, cached_statements=256)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA busy_timeout=5000")
+        self._lock = threading.RLock()
+        self.ensure_indexes()
+        print(f"Usando o banco SQLite em {path}.")
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.conn
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+
+    def _query(self, sql: str, params=()) -> list:
+        with self._lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    def ensure_indexes(self):
+        with self._lock:
+            self.conn.executescript(_SCHEMA)
+            for table, column, declaration in _ADDED_COLUMNS:
+                if column not in {row[1] for row in self.conn.execute(f"PRAGMA table_info({table})")}:
+                    self.conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {declaration}")
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    # --- Contas ---
+    def _apply(self, conn, user_id: int, inc: dict = None, set_: dict = None):
+        conn.execute(_INSERT_ACCOUNT, (user_id,))
+        set_ = dict(set_ or {})
+        for path in [path for path in set_ if path.startswith("cooldowns.")]:
+            conn.execute(_SET_COOLDOWN, (user_id, path.partition(".")[2], _ts(set_.pop(path))))
+        if inc or set_:
+            sql, params = _update_sql(inc or {}, set_)
+            conn.execute(sql, params + [user_id])
+
+    def _load_account(self, conn, user_id: int) -> dict:
+        row = conn.execute(_SELECT_ACCOUNT, (user_id,)).fetchone()
+        return _row_to_account(row, conn.execute("SELECT kind, at FROM cooldowns WHERE user_id = ?", (user_id,)).fetchall())
+
+    def _apply_many(self, conn, incs: dict):
+        """Aplica {user_id: {caminho: delta}} com um executemany por formato de delta."""
+        conn.executemany(_INSERT_ACCOUNT, [(user_id,) for user_id in incs])
+        groups = {}
+        for user_id, inc in incs.items():
+            if inc: groups.setdefault(tuple(inc), []).append(list(inc.values()) + [user_id])
+        for paths, rows in groups.items():
+            conn.executemany(_update_sql(dict.fromkeys(paths, 0), {})[0], rows)
+
+    def get_or_create_account(self, user_id: int) -> dict:
+        with self._transaction() as conn:
+            conn.execute(_INSERT_ACCOUNT, (user_id,))
+            return self._load_account(conn, user_id)
+
+    def update_account(self, user_id: int, inc: dict = None, set_: dict = None):
+        with self._transaction() as conn:
+            self._apply(conn, user_id, inc, set_)
+
+    def apply_incs(self, incs: dict):
+        with self._transaction() as conn:
+            self._apply_many(conn, incs)
+
+    def try_debit(self, user_id: int, amount: int, credit: int = 0):
+        with self._transaction() as conn:
+            if conn.execute(_DEBIT, (credit - amount, user_id, amount)).rowcount == 0:
+                return None
+            return self._load_account(conn, user_id)
+
+    def claim_cooldown(self, user_id: int, kind: str, now: datetime, period) -> tuple:
+        with self._transaction() as conn:
+            conn.execute(_INSERT_ACCOUNT, (user_id,))
+            if conn.execute(_CLAIM_COOLDOWN, (user_id, kind, _ts(now), _ts(now - period))).rowcount:
+                return True, None
+            row = conn.execute("SELECT at FROM cooldowns WHERE user_id = ? AND kind = ?", (user_id, kind)).fetchone()
+            return False, _dt(row[0])
+
+    def settle(self, incs: dict, close_bet: int = None, close_round: str = None):
+        with self._transaction() as conn:
+            self._apply_many(conn, incs)
+            if close_bet is not None:
+                conn.execute("UPDATE bets SET status = 'closed' WHERE message_id = ?", (close_bet,))
+            if close_round is not None:
+                conn.execute("DELETE FROM rounds WHERE round_id = ?", (close_round,))
+
+    def balances(self, user_ids=None):
+        if user_ids is None:
+            return self._query("SELECT user_id, balance FROM economy")
+        result = []
+        user_ids = list(user_ids)
+        # Em blocos, abaixo do limite de parâmetros por instrução do SQLite.
+        for start in range(0, len(user_ids), 500):
+            chunk = user_ids[start:start + 500]
+            result += self._query(f"SELECT user_id, balance FROM economy WHERE user_id IN ({', '.join('?' * len(chunk))})", chunk)
+        return result
+
+    # --- Histórico de transações ---
+    def insert_ledger(self, entries: list):
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT INTO ledger (user_id, at, reason, delta, balance, game, ref) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(e["user_id"], _ts(e["at"]), e.get("reason"), e.get("delta"), e.get("balance"), e.get("game"), e.get("ref")) for e in entries]
+            )
+
+    def ledger_users_since(self, when) -> list:
+        return [row[0] for row in self._query("SELECT DISTINCT user_id FROM ledger WHERE at > ?", (_ts(when),))]
+
+    def ledger_entries(self, user_id: int, after, until) -> list:
+        rows = self._query(
+            "SELECT at, reason, delta, balance, game, ref FROM ledger WHERE user_id = ? AND at > ? AND at <= ? ORDER BY at, id",
+            (user_id, _ts(after) if after is not None else "", _ts(until))
+        )
+        entries = []
+        for at, reason, delta, balance, game, ref in rows:
+            entry = {"user_id": user_id, "at": _dt(at), "reason": reason}
+            if delta is not None: entry["delta"] = delta
+            if balance is not None: entry["balance"] = balance
+            if game is not None: entry["game"] = game
+            if ref is not None: entry["ref"] = ref
+            entries.append(entry)
+        return entries
+
+    def last_snapshot_at(self):
+        return _dt(self._query("SELECT MAX(at) FROM balance_snapshots")[0][0])
+
+    def snapshot_before(self, user_id: int, when):
+        rows = self._query("SELECT balance, at FROM balance_snapshots WHERE user_id = ? AND at <= ? ORDER BY at DESC LIMIT 1", (user_id, _ts(when)))
+        return {"user_id": user_id, "balance": rows[0][0], "at": _dt(rows[0][1])} if rows else None
+
+    def insert_snapshots(self, snapshots: list):
+        with self._transaction() as conn:
+            conn.executemany("INSERT INTO balance_snapshots (user_id, balance, at) VALUES (?, ?, ?)", [(s["user_id"], s["balance"], _ts(s["at"])) for s in snapshots])
+
+    # --- Diário de rodadas ---
+    def save_round(self, round_id: str, game: str, channel_id: int, state: str, bets: list, updated_at, cluster: int = 0):
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO rounds (round_id, game, channel_id, state, bets, updated_at, cluster) VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (round_id) DO UPDATE SET game = excluded.game, channel_id = excluded.channel_id, "
+                "state = excluded.state, bets = excluded.bets, updated_at = excluded.updated_at, cluster = excluded.cluster",
+                (round_id, game, channel_id, state, json.dumps(bets), _ts(updated_at), cluster)
+            )
+
+    def get_rounds(self, cluster: int = None) -> list:
+        if cluster is None:
+            rows = self._query("SELECT round_id, game, channel_id, state, bets, updated_at, cluster FROM rounds")
+        else:
+            rows = self._query("SELECT round_id, game, channel_id, state, bets, updated_at, cluster FROM rounds WHERE cluster = ?", (cluster,))
+        return [
+            {"round_id": round_id, "game": game, "channel_id": channel_id, "state": state, "bets": json.loads(bets), "updated_at": _dt(updated_at), "cluster": cluster}
+            for round_id, game, channel_id, state, bets, updated_at, cluster in rows
+        ]
+
+    # --- Bolões ---
+    # O documento do bolão é guardado como JSON; status e totais por time têm colunas próprias.
+    def create_bet(self, bet_data: dict):
+        doc = {k: v for k, v in bet_data.items() if k not in ("message_id", "status", "totals", "counts")}
+        with self._transaction() as conn:
+            conn.execute("INSERT INTO bets (message_id, status, doc) VALUES (?, ?, ?)", (bet_data["message_id"], bet_data.get("status", "open"), json.dumps(doc)))
+
+    def get_bet(self, message_id: int):
+        rows = self._query(
+            "SELECT status, doc, total_team_home, total_team_away, count_team_home, count_team_away FROM bets WHERE message_id = ?",
+            (message_id,)
+        )
+        if not rows: return None
+        status, doc, total_home, total_away, count_home, count_away = rows[0]
+        return {
+            "message_id": message_id, "status": status, **json.loads(doc),
+            "totals": {"team_home": total_home, "team_away": total_away},
+            "counts": {"team_home": count_home, "team_away": count_away},
+        }
+
+    def close_bet(self, message_id: int):
+        with self._transaction() as conn:
+            conn.execute("UPDATE bets SET status = 'closed' WHERE message_id = ?", (message_id,))
+
+    def set_bet_status(self, message_id: int, status: str, only_if: str = None) -> bool:
+        with self._transaction() as conn:
+            if only_if is None:
+                return conn.execute("UPDATE bets SET status = ? WHERE message_id = ?", (status, message_id)).rowcount > 0
+            return conn.execute("UPDATE bets SET status = ? WHERE message_id = ? AND status = ?", (status, message_id, only_if)).rowcount > 0
+
+    def _inc_totals(self, conn, message_id: int, team: str, amount: int, count: int):
+        if team not in BET_TEAMS: raise ValueError(f"Time inválido: {team!r}")
+        conn.execute(f"UPDATE bets SET total_{team} = total_{team} + ?, count_{team} = count_{team} + ? WHERE message_id = ?", (amount, count, message_id))
+
+    def _get_entry(self, conn, message_id: int, user_id: int):
+        row = conn.execute("SELECT team, amount FROM bet_entries WHERE message_id = ? AND user_id = ?", (message_id, user_id)).fetchone()
+        return {"message_id": message_id, "user_id": user_id, "team": row[0], "amount": row[1]} if row else None
+
+    def _bet_is_open(self, conn, message_id: int) -> bool:
+        row = conn.execute("SELECT status FROM bets WHERE message_id = ?", (message_id,)).fetchone()
+        return row is not None and row[0] == "open"
+
+    def place_bet_entry(self, message_id: int, user_id: int, team: str, amount: int):
+        with self._transaction() as conn:
+            if not self._bet_is_open(conn, message_id): return BET_CLOSED
+            previous = self._get_entry(conn, message_id, user_id)
+            conn.execute(
+                "INSERT INTO bet_entries (message_id, user_id, team, amount) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (message_id, user_id) DO UPDATE SET team = excluded.team, amount = excluded.amount",
+                (message_id, user_id, team, amount)
+            )
+            if previous is not None:
+                self._inc_totals(conn, message_id, previous["team"], -previous["amount"], -1)
+            self._inc_totals(conn, message_id, team, amount, 1)
+            return previous
+
+    def remove_bet_entry(self, message_id: int, user_id: int):
+        with self._transaction() as conn:
+            if not self._bet_is_open(conn, message_id): return BET_CLOSED
+            removed = self._get_entry(conn, message_id, user_id)
+            if removed is not None:
+                conn.execute("DELETE FROM bet_entries WHERE message_id = ? AND user_id = ?", (message_id, user_id))
+                self._inc_totals(conn, message_id, removed["team"], -removed["amount"], -1)
+            return removed
+
+    def get_bet_entry(self, message_id: int, user_id: int):
+        with self._lock:
+            return self._get_entry(self.conn, message_id, user_id)
+
+    def get_bet_entries(self, message_id: int, team: str = None, limit: int = None) -> list:
+        # LIMIT -1 = sem limite no SQLite
+        if team is None:
+            rows = self._query("SELECT user_id, team, amount FROM bet_entries WHERE message_id = ? ORDER BY amount DESC LIMIT ?", (message_id, limit or -1))
+        else:
+            rows = self._query("SELECT user_id, team, amount FROM bet_entries WHERE message_id = ? AND team = ? ORDER BY amount DESC LIMIT ?", (message_id, team, limit or -1))
+        return [{"message_id": message_id, "user_id": u, "team": t, "amount": a} for u, t, a in rows]
+
+    # --- Agenda ---
+    def get_jobs(self) -> list:
+        rows = self._query("SELECT job_id, run_at, kind, data FROM schedule")
+        return [{"job_id": job_id, "run_at": _dt(run_at), "kind": kind, "data": json.loads(data)} for job_id, run_at, kind, data in rows]
+
+    def save_job(self, job_id: str, run_at, kind: str, data: dict):
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO schedule (job_id, run_at, kind, data) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (job_id) DO UPDATE SET run_at = excluded.run_at, kind = excluded.kind, data = excluded.data",
+                (job_id, _ts(run_at), kind, json.dumps(data))
+            )
+
+    def delete_job(self, job_id: str):
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM schedule WHERE job_id = ?", (job_id,))
+
+    # --- Shards ---
+    def save_shard_status(self, statuses: list):
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT INTO shard_status (shard_id, cluster, latency, guilds, updated_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (shard_id) DO UPDATE SET cluster = excluded.cluster, latency = excluded.latency, "
+                "guilds = excluded.guilds, updated_at = excluded.updated_at",
+                [(s["shard_id"], s["cluster"], s["latency"], s["guilds"], _ts(s["updated_at"])) for s in statuses]
+            )
+
+    def get_shard_status(self) -> list:
+        rows = self._query("SELECT shard_id, cluster, latency, guilds, updated_at FROM shard_status ORDER BY shard_id")
+        return [
+            {"shard_id": shard_id, "cluster": cluster, "latency": latency, "guilds": guilds, "updated_at": _dt(updated_at)}
+            for shard_id, cluster, latency, guilds, updated_at in rows
+        ]
+
+    # --- Webhooks ---
+    def get_webhooks(self) -> list:
+        rows = self._query("SELECT channel_id, webhook_id, token FROM webhooks")
+        return [{"channel_id": c, "webhook_id": w, "token": t} for c, w, t in rows]
+
+    def save_webhook(self, channel_id: int, webhook_id: int, token: str):
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO webhooks (channel_id, webhook_id, token) VALUES (?, ?, ?) "
+                "ON CONFLICT (channel_id) DO UPDATE SET webhook_id = excluded.webhook_id, token = excluded.token",
+                (channel_id, webhook_id, token)
+            )
+
+    def delete_webhook(self, channel_id: int):
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM webhooks WHERE channel_id = ?", (channel_id,))
@@ -0,0 +1,154 @@
+# utils/storage.py
+import os
+from abc import ABC, abstractmethod
+
+STARTING_BALANCE = 500
+
+# Formato padrão de uma conta nova, em notação de ponto.
+ACCOUNT_DEFAULTS = {
+    "balance": STARTING_BALANCE,
+    "stats.bets_made": 0, "stats.bets_won": 0, "stats.total_wagered": 0, "stats.total_won": 0,
+    "cooldowns.daily": None, "cooldowns.weekly": None, "cooldowns.monthly": None,
+}
+
+# Lados de um bolão; as apostas guardam a chave, não o nome do time.
+BET_TEAMS = ("team_home", "team_away")
+# Retornado por place_bet_entry/remove_bet_entry quando o bolão já não está "open".
+BET_CLOSED = object()
+
+def new_account() -> dict:
+    """Documento de uma conta nova (sem o user_id)."""
+    account = {}
+    for path, default in ACCOUNT_DEFAULTS.items():
+        parent, _, key = path.rpartition(".")
+        (account.setdefault(parent, {}) if parent else account)[key] = default
+    return account
+
+class Storage(ABC):
+    """Interface do armazenamento usado pelo Database.
+
+    O Database cuida de cache, ranking e histórico; o backend só sabe ler e gravar.
+    Todos os métodos são síncronos e podem ser chamados de várias threads ao mesmo tempo.
+    Contas são dicts no formato de `new_account()` mais o `user_id`, e os deltas usam a
+    notação de ponto de ACCOUNT_DEFAULTS (ex.: {"balance": 10, "stats.bets_won": 1}).
+    """
+    name = "?"
+
+    @abstractmethod
+    def ensure_indexes(self): ...
+    def close(self): pass
+
+    # --- Contas ---
+    @abstractmethod
+    def get_or_create_account(self, user_id: int) -> dict: ...
+    @abstractmethod
+    def update_account(self, user_id: int, inc: dict = None, set_: dict = None):
+        """Aplica os deltas/valores na conta, criando-a com os valores padrão se não existir."""
+    @abstractmethod
+    def apply_incs(self, incs: dict):
+        """Aplica {user_id: {caminho: delta}} de uma vez (upsert)."""
+    @abstractmethod
+    def try_debit(self, user_id: int, amount: int, credit: int = 0):
+        """Soma `credit - amount` ao saldo só se ele for >= `amount`. Retorna a conta ou None."""
+    @abstractmethod
+    def claim_cooldown(self, user_id: int, kind: str, now, period) -> tuple:
+        """Grava `now` em cooldowns.<kind> só se o anterior for de antes de `now - period`, atomicamente.
+
+        Retorna (True, None) se conseguiu ou (False, horário_do_último) se ainda está em cooldown.
+        """
+    @abstractmethod
+    def settle(self, incs: dict, close_bet: int = None, close_round: str = None):
+        """`apply_incs` + encerrar o bolão/rodada, tudo na mesma transação."""
+    @abstractmethod
+    def balances(self, user_ids=None):
+        """Itera (user_id, saldo) de todas as contas ou só das de `user_ids`."""
+
+    # --- Histórico de transações ---
+    @abstractmethod
+    def insert_ledger(self, entries: list): ...
+    @abstractmethod
+    def ledger_users_since(self, when) -> list: ...
+    @abstractmethod
+    def ledger_entries(self, user_id: int, after, until) -> list:
+        """Lançamentos do usuário com `after` < at <= `until` (after pode ser None), em ordem."""
+    @abstractmethod
+    def last_snapshot_at(self): ...
+    @abstractmethod
+    def snapshot_before(self, user_id: int, when): ...
+    @abstractmethod
+    def insert_snapshots(self, snapshots: list): ...
+
+    # --- Diário de rodadas ---
+    @abstractmethod
+    def save_round(self, round_id: str, game: str, channel_id: int, state: str, bets: list, updated_at, cluster: int = 0): ...
+    @abstractmethod
+    def get_rounds(self, cluster: int = None) -> list:
+        """Rodadas abertas (de todos os clusters, ou só das do processo `cluster`)."""
+
+    # --- Bolões ---
+    # O bolão guarda os totais por time em "totals"/"counts" ({"team_home": ..., "team_away": ...});
+    # as apostas ficam em entradas separadas, uma por (message_id, user_id).
+    @abstractmethod
+    def create_bet(self, bet_data: dict): ...
+    @abstractmethod
+    def get_bet(self, message_id: int): ...
+    @abstractmethod
+    def close_bet(self, message_id: int): ...
+    @abstractmethod
+    def set_bet_status(self, message_id: int, status: str, only_if: str = None) -> bool:
+        """Muda o status do bolão (se `only_if`, só quando o status atual for esse). Retorna se mudou."""
+    @abstractmethod
+    def place_bet_entry(self, message_id: int, user_id: int, team: str, amount: int):
+        """Grava (ou troca) a aposta do usuário e ajusta os totais. Retorna a aposta anterior ou None.
+
+        A checagem de que o bolão está "open" fica na mesma transação; se não estiver, nada
+        é gravado e o retorno é BET_CLOSED.
+        """
+    @abstractmethod
+    def remove_bet_entry(self, message_id: int, user_id: int):
+        """Remove a aposta do usuário e ajusta os totais. Retorna a aposta removida, None ou BET_CLOSED."""
+    @abstractmethod
+    def get_bet_entry(self, message_id: int, user_id: int): ...
+    @abstractmethod
+    def get_bet_entries(self, message_id: int, team: str = None, limit: int = None) -> list:
+        """Apostas do bolão ({user_id, team, amount}), da maior para a menor; `limit` pega só as primeiras."""
+
+    # --- Agenda (utils/scheduler.py) ---
+    @abstractmethod
+    def get_jobs(self) -> list:
+        """Todas as tarefas agendadas: [{job_id, run_at, kind, data}]."""
+    @abstractmethod
+    def save_job(self, job_id: str, run_at, kind: str, data: dict): ...
+    @abstractmethod
+    def delete_job(self, job_id: str): ...
+
+    # --- Shards (cogs/status.py) ---
+    @abstractmethod
+    def save_shard_status(self, statuses: list):
+        """Grava [{shard_id, cluster, latency, guilds, updated_at}], um por shard."""
+    @abstractmethod
+    def get_shard_status(self) -> list: ...
+
+    # --- Webhooks ---
+    @abstractmethod
+    def get_webhooks(self) -> list: ...
+    @abstractmethod
+    def save_webhook(self, channel_id: int, webhook_id: int, token: str): ...
+    @abstractmethod
+    def delete_webhook(self, channel_id: int): ...
+
+
+def open_storage(backend: str = None) -> Storage:
+    """Abre o backend escolhido em DB_BACKEND ("mongo" ou "sqlite").
+
+    Sem DB_BACKEND, usa o MongoDB quando há MONGO_URI e o SQLite local caso contrário.
+    Um erro de conexão é propagado: o bot não deve subir com a economia desligada.
+    """
+    backend = (backend or os.getenv("DB_BACKEND") or ("mongo" if os.getenv("MONGO_URI") else "sqlite")).lower()
+    if backend == "mongo":
+        from utils.mongo_storage import MongoStorage
+        return MongoStorage(os.getenv("MONGO_URI"))
+    if backend == "sqlite":
+        from utils.sqlite_storage import SQLiteStorage
+        return SQLiteStorage(os.getenv("SQLITE_PATH", "ronaldin.db"))
+    raise ValueError(f"DB_BACKEND desconhecido: {backend!r} (use 'mongo' ou 'sqlite').")
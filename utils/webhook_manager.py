@@ -1,14 +1,52 @@
 # utils/webhook_manager.py
+import time
 import discord
+from utils.metrics import metrics
+
+# Cache dos webhooks do bot por canal, para não listar os webhooks do canal a cada envio.
+_webhook_cache = {}  # {channel_id: discord.Webhook}
+_bot = None
+
+UNKNOWN_WEBHOOK = 10015
+
+async def setup_webhook_cache(bot):
+    """Liga o cache ao bot e recarrega os webhooks salvos no banco (sobrevive a reinícios)."""
+    global _bot
+    _bot = bot
+    try:
+        docs = await bot.db.get_webhooks()
+    except Exception as e:
+        print(f"Não foi possível carregar os webhooks salvos: {e}")
+        return
+    for doc in docs:
+        _webhook_cache[doc["channel_id"]] = discord.Webhook.partial(doc["webhook_id"], doc["token"], client=bot)
+    print(f"{len(_webhook_cache)} webhook(s) carregado(s) do banco.")
+
+def invalidate_webhook(channel_id: int):
+    """Esquece o webhook do canal; o próximo envio busca (ou cria) outro."""
+    _webhook_cache.pop(channel_id, None)
 
 async def _get_webhook(channel: discord.TextChannel, bot_user) -> discord.Webhook:
     """Busca ou cria um webhook para o bot no canal."""
+    webhook = _webhook_cache.get(channel.id)
+    if webhook is not None:
+        return webhook
+
     webhooks = await channel.webhooks()
     webhook = discord.utils.get(webhooks, user=bot_user)
     if webhook is None:
         webhook = await channel.create_webhook(name="Ronaldin Webhooks")
+    _webhook_cache[channel.id] = webhook
+    if _bot is not None and webhook.token:
+        await _bot.db.save_webhook(channel.id, webhook.id, webhook.token)
     return webhook
 
+async def _forget_webhook(channel_id: int):
+    """Remove um webhook que foi apagado no Discord do cache e do banco."""
+    invalidate_webhook(channel_id)
+    if _bot is not None:
+        await _bot.db.delete_webhook(channel_id)
+
 async def send_webhook(channel: discord.TextChannel, embed: discord.Embed, view: discord.ui.View = None, bot_user=None, avatar_url: str = None, content: str = None):
     """Envia uma mensagem estilizada via Webhook, com mais opções."""
     if bot_user is None: return None
@@ -16,10 +54,9 @@ async def send_webhook(channel: discord.TextChannel, embed: discord.Embed, view:
     # A cor padrão é amarela, mas pode ser sobrescrita no embed antes de chamar a função.
     if not embed.color:
         embed.color = discord.Color.gold()
-    
+
     embed.set_footer(text="Ronaldin Bot • Gerenciamento Esportivo", icon_url=bot_user.display_avatar.url)
 
-    webhook = await _get_webhook(channel, bot_user)
     final_avatar_url = avatar_url if avatar_url else bot_user.display_avatar.url
 
     kwargs = {
@@ -27,27 +64,46 @@ async def send_webhook(channel: discord.TextChannel, embed: discord.Embed, view:
     }
     if view: kwargs["view"] = view
     if content: kwargs["content"] = content
-        
-    message = await webhook.send(**kwargs)
-    return message
+
+    started = time.perf_counter()
+    try:
+        webhook = await _get_webhook(channel, bot_user)
+        try:
+            return await webhook.send(**kwargs)
+        except discord.NotFound as e:
+            # O webhook em cache foi apagado; busca outro e tenta de novo uma vez
+            if e.code != UNKNOWN_WEBHOOK: raise
+            await _forget_webhook(channel.id)
+            webhook = await _get_webhook(channel, bot_user)
+            return await webhook.send(**kwargs)
+    finally:
+        metrics.observe("webhook", time.perf_counter() - started, op="send")
 
 async def edit_webhook(channel: discord.TextChannel, message_id: int, embed: discord.Embed, view: discord.ui.View = None, bot_user=None):
     """Edita uma mensagem enviada anteriormente por um webhook."""
     if bot_user is None: return None
-    
+
     if not embed.color:
         embed.color = discord.Color.gold()
     embed.set_footer(text="Ronaldin Bot • Gerenciamento Esportivo", icon_url=bot_user.display_avatar.url)
-    
-    webhook = await _get_webhook(channel, bot_user)
-    
+
     kwargs = {"embed": embed}
-    if view is not None: 
+    if view is not None:
         kwargs["view"] = view
 
+    started = time.perf_counter()
     try:
-        await webhook.edit_message(message_id, **kwargs)
+        webhook = await _get_webhook(channel, bot_user)
+        try:
+            await webhook.edit_message(message_id, **kwargs)
+        except discord.NotFound as e:
+            if e.code != UNKNOWN_WEBHOOK: raise
+            await _forget_webhook(channel.id)
+            webhook = await _get_webhook(channel, bot_user)
+            await webhook.edit_message(message_id, **kwargs)
     except discord.NotFound:
         print(f"Webhook não conseguiu encontrar a mensagem com ID {message_id} para editar.")
     except Exception as e:
         print(f"Erro ao editar webhook: {e}")
+    finally:
+        metrics.observe("webhook", time.perf_counter() - started, op="edit")